@@ -0,0 +1,91 @@
+"""Micro-benchmarks for the per-webhook URL/text helpers in core.normalize.
+
+Compares each helper with the ad-hoc version it replaced (inline
+``re.search`` patterns, repeated parsing of the same Goofish URL).
+
+Run from the repository root::
+
+    python -m benchmarks.bench_normalize
+"""
+
+import re
+import timeit
+from typing import Any
+from urllib.parse import quote
+
+from core.normalize import (
+    DEFAULT_SUPERBUY_LINK_TEMPLATE,
+    contains_cjk,
+    parse_cny_amount,
+    parse_goofish_link,
+)
+
+_URL = "https://www.goofish.com/item?spm=a21ybx.search.searchFeedList.1.6b4f&id=812345678901"
+
+
+def _legacy_item_id(url: str) -> str:
+    match = re.search(r"[?&]id=(\d+)", url or "")
+    return match.group(1) if match else ""
+
+
+def _legacy_links(url: str) -> tuple[str, str, str]:
+    """Canonical, short and Superbuy URLs as derived before (one regex per URL)."""
+    canonical = f"https://www.goofish.com/item?id={_legacy_item_id(url)}"
+    bfp_json = f'{{"id":{_legacy_item_id(url)}}}'
+    short = (
+        "https://pages.goofish.com/sharexy"
+        "?loadingVisible=false&bft=item&bfs=idlepc.item&spm=a21ybx.item.0.0"
+        f"&bfp={quote(bfp_json)}"
+    )
+    superbuy = DEFAULT_SUPERBUY_LINK_TEMPLATE.replace(
+        "{url}", quote(f"https://www.goofish.com/item?id={_legacy_item_id(url)}", safe="")
+    )
+    return canonical, short, superbuy
+
+
+_LEGACY_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+
+def _legacy_contains_cjk(text: str) -> bool:
+    return bool(_LEGACY_CJK_RE.search(text or ""))
+
+
+def _legacy_parse_cny_amount(value: Any) -> float | None:
+    text = str(value).strip().replace(",", "").replace(" ", "")
+    text = text.replace("￥", "").replace("¥", "")
+    match = re.search(r"-?\d+(?:\.\d+)?", text)
+    return float(match.group(0)) if match else None
+
+
+def _bench(label: str, legacy: Any, current: Any, number: int = 100_000) -> None:
+    before = min(timeit.repeat(legacy, number=number, repeat=5)) / number * 1e9
+    after = min(timeit.repeat(current, number=number, repeat=5)) / number * 1e9
+    print(f"{label:<28} {before:9.0f} ns -> {after:7.0f} ns  ({before / after:4.1f}x)")
+
+
+def main() -> None:
+    english = "Nintendo Switch OLED, barely used, with box and two controllers"
+    _bench(
+        "goofish links (3 derived)",
+        lambda: _legacy_links(_URL),
+        lambda: parse_goofish_link(_URL),
+    )
+    _bench(
+        "contains_cjk (ASCII text)",
+        lambda: _legacy_contains_cjk(english),
+        lambda: contains_cjk(english),
+    )
+    _bench(
+        "parse_cny_amount ('1299.50')",
+        lambda: _legacy_parse_cny_amount("1299.50"),
+        lambda: parse_cny_amount("1299.50"),
+    )
+    _bench(
+        "parse_cny_amount ('¥1,299')",
+        lambda: _legacy_parse_cny_amount("¥1,299"),
+        lambda: parse_cny_amount("¥1,299"),
+    )
+
+
+if __name__ == "__main__":
+    main()
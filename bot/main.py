@@ -65,6 +65,8 @@ class GoofishBot(discord.Client):
             path=settings.webhook_path,
             secret=settings.webhook_secret,
         )
+        # Resolve alert recipients once so notifications skip the channel lookups.
+        await self.webhook_receiver.warm_up()
 
         await self.tree.sync()
         log.info("Commands synced")
@@ -74,7 +76,9 @@ class GoofishBot(discord.Client):
         log.info(f"Logged in as {self.user}")
 
     async def close(self) -> None:
-        """Gracefully shut down the webhook receiver, browser, and Discord client."""
+        """Gracefully shut down the webhook receiver, browser, and Discord client.
+
+        Stopping the receiver also closes its pooled outbound HTTP session."""
         if self.webhook_receiver:
             await self.webhook_receiver.stop()
         await goofish_client.close()
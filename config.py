@@ -6,6 +6,7 @@ This repo is intentionally kept small: it exists to
 """
 
 from pathlib import Path
+from typing import Any
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -23,19 +24,103 @@ class Settings(BaseSettings):
     # Discord
     discord_bot_token: str = ""
     discord_user_id: int = 0
+    # Routing rules as a JSON list; alerts matching no rule go to discord_user_id. Example:
+    # [{"recipients": ["channel:123", "user:456"], "keywords": ["switch"], "max_price": 800}]
+    discord_routes: list[dict[str, Any]] = Field(default_factory=list)
+    # Outgoing DMs are paced per destination with a token bucket; 429/5xx are retried.
+    discord_send_rate_per_second: float = 1.0
+    discord_send_burst: int = 5
+    discord_send_max_retries: int = 3
+    # Digest mode: buffer alerts and send up to 10 compact embeds per DM.
+    discord_digest_enabled: bool = False
+    discord_digest_window_seconds: float = 10.0
+    discord_digest_max_items: int = 10
+    # Converted prices are shown in this currency (any ECB reference currency, or CNY
+    # for none); override per recipient with e.g. {"user:123": "USD", "channel:456": "GBP"}.
+    discord_display_currency: str = "EUR"
+    discord_recipient_currencies: dict[str, str] = Field(default_factory=dict)
 
     # Goofish/Xianyu session
     goofish_cookies_json_path: Path = Field(default=Path("./cookies.json"))
+    # Auth checks and storage-state exports each check out a page from this pool;
+    # pages are replaced after browser_page_max_uses checkouts or when they crash.
+    browser_page_pool_size: int = 2
+    browser_page_max_uses: int = 50
 
     # Webhook receiver (ai-goofish-monitor -> Discord DM)
     webhook_host: str = "0.0.0.0"
     webhook_port: int = 8123
     webhook_path: str = "/webhook/ai-goofish-monitor"
     webhook_secret: str = ""
+    # Also accept the secret as ?secret=...; disable once senders use a header or signature.
+    webhook_allow_query_secret: bool = True
+    # Larger bodies are rejected with 413 before (or while) being read.
+    webhook_max_body_bytes: int = 1024 * 1024
+    # Extra endpoints as a JSON list, one per monitor instance, all on webhook_host/port.
+    # Each has a name and path; secret, recipients, routes, digest_*, dedupe_*, queue_size
+    # and workers default to the global settings. When set, webhook_path is not served.
+    # [{"name": "switch", "path": "/hooks/switch", "secret": "s1", "recipients": ["channel:1"]}]
+    webhook_endpoints: list[dict[str, Any]] = Field(default_factory=list)
+    # Unauthenticated GET route serving queue, Discord send, executor and circuit breaker
+    # metrics as JSON, e.g. "/health". Disabled unless set; only expose it on trusted networks.
+    webhook_health_path: str = ""
+    # Accepted webhooks are journaled to disk and drained by a fixed worker pool.
+    webhook_queue_size: int = 500
+    webhook_workers: int = 4
+    # Repeats of the same item + price (or Idempotency-Key) within this window are
+    # acknowledged without another DM. 0 disables duplicate suppression.
+    webhook_dedupe_window_seconds: int = 6 * 60 * 60
+    webhook_dedupe_max_entries: int = 20000
+
+    # Outbound HTTP (translation, listing previews, FX) shares one pooled session.
+    http_pool_size: int = 32
+    http_pool_per_host: int = 8
+    # Per-host circuit breakers: once this share of the recent calls failed or took
+    # longer than the slow-call threshold, the host is skipped (alerts go out
+    # untranslated/unenriched) until a probe call after the open period succeeds.
+    http_breaker_window: int = 20
+    http_breaker_min_calls: int = 5
+    http_breaker_failure_ratio: float = 0.5
+    http_breaker_slow_call_seconds: float = 3.0
+    http_breaker_open_seconds: float = 30.0
+
+    # Translation requests arriving within this window are sent as one batch.
+    translation_batch_window_ms: int = 30
+    # Translations are cached in memory (LRU) and persisted under data_dir.
+    translation_cache_max_entries: int = 5000
+    translation_cache_max_bytes: int = 4 * 1024 * 1024
+    # Failed translations are retried after this many seconds.
+    translation_negative_ttl_seconds: int = 300
+
+    # Listing page previews are cached per Goofish item ID.
+    preview_cache_ttl_seconds: int = 6 * 60 * 60
+    preview_cache_max_entries: int = 1000
+    preview_cache_persist: bool = True
+
+    # Image carousel buttons stay usable this long, across restarts.
+    carousel_ttl_seconds: int = 7 * 24 * 60 * 60
+    carousel_cache_max_entries: int = 500
+    carousel_store_max_entries: int = 20000
+
+    # Local state (delivery journal, caches)
+    data_dir: Path = Field(default=Path("./data"))
+    # Blocking disk work runs on small named thread pools (journal, translation, preview,
+    # carousel, fx, files) instead of the shared default executor. Override sizes with
+    # e.g. {"journal": 4}; calls beyond executor_max_queue waiting per pool are rejected.
+    executor_pool_sizes: dict[str, int] = Field(default_factory=dict)
+    executor_max_queue: int = 1000
 
     # Notification formatting
-    # Approx FX rate used for displaying converted EUR price in Discord embeds.
+    # Overall deadline for preview/translation/FX enrichment of one listing alert.
+    # When it passes, the DM is sent with whatever fields are ready.
+    enrichment_timeout_seconds: float = 5.0
+    # Approx FX rate used for displaying converted EUR price in Discord embeds
+    # until a live ECB rate has been fetched (or loaded from data_dir).
     cny_to_eur_rate: float = 0.13
+    # The live rate is refreshed in the background ahead of this age; failed
+    # refreshes are retried with exponential backoff up to fx_retry_max_seconds.
+    fx_rate_ttl_seconds: int = 6 * 60 * 60
+    fx_retry_max_seconds: int = 30 * 60
     # Template for generating a Superbuy-compatible link.
     # Must include `{url}` placeholder for the URL-encoded Goofish link.
     superbuy_link_template: str = "https://www.superbuy.com/en/page/buy/?url={url}"
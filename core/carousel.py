@@ -0,0 +1,250 @@
+"""Stateless image carousels for listing alerts.
+
+Prev/Next buttons are :class:`discord.ui.DynamicItem` instances whose
+``custom_id`` encodes the carousel key (the Goofish item ID and a digest) and
+the image index to show. One handler class is registered with the
+client, so no per-message View or timer lives in memory, and buttons
+keep working after a restart. The embed and image list behind each key
+are kept in a bounded LRU backed by SQLite.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, ClassVar
+
+import discord
+
+from core import jsoncodec
+from core.executors import CAROUSEL, run_blocking
+from core.kvstore import SqliteKVStore
+
+log = logging.getLogger(__name__)
+
+_CAROUSEL_KEY_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+@dataclass
+class CarouselState:
+    """Everything needed to render any page of a carousel.
+
+    ``images`` must already be validated and de-duplicated. Rendered pages
+    are memoized per index, so paging only costs a dictionary lookup."""
+
+    embed: dict[str, Any]
+    images: list[str]
+    links: list[tuple[str, str]] = field(default_factory=list)
+    _pages: dict[int, tuple[discord.Embed, discord.ui.View]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def page(self, key: str, index: int) -> tuple[discord.Embed, discord.ui.View]:
+        """Return the embed and view showing image ``index``, rendering them once.
+
+        The returned objects are shared between messages and must not be mutated."""
+        if self.images:
+            index %= len(self.images)
+        cached = self._pages.get(index)
+        if cached is None:
+            cached = (render_carousel_embed(self, index), build_carousel_view(key, self, index))
+            self._pages[index] = cached
+        return cached
+
+    def to_json(self) -> str:
+        return jsoncodec.dumps_text(
+            {"embed": self.embed, "images": self.images, "links": self.links}
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> "CarouselState":
+        data = jsoncodec.loads(raw)
+        return cls(
+            embed=dict(data["embed"]),
+            images=[str(url) for url in data["images"]],
+            links=[(str(label), str(url)) for label, url in data.get("links", [])],
+        )
+
+
+def carousel_key(item_id: str, state: CarouselState) -> str:
+    """Return the key a carousel is stored and addressed under.
+
+    The key is the Goofish item ID (when known) plus a short digest of the
+    rendered embed, images and links, so a later alert for the same item
+    (a price drop, another task or display currency) gets its own key
+    instead of replacing the carousel earlier messages page through."""
+    digest = hashlib.sha1(state.to_json().encode("utf-8")).hexdigest()
+    if item_id and _CAROUSEL_KEY_RE.match(f"{item_id}-{digest[:12]}"):
+        return f"{item_id}-{digest[:12]}"
+    return f"h{digest[:16]}"
+
+
+def render_carousel_embed(state: CarouselState, index: int) -> discord.Embed:
+    """Build the embed for one image of a carousel; see :meth:`CarouselState.page`."""
+    embed = discord.Embed.from_dict(state.embed)
+    if state.images:
+        index %= len(state.images)
+        embed.set_image(url=state.images[index])
+        if len(state.images) > 1:
+            embed.set_footer(text=f"Image {index + 1}/{len(state.images)}")
+    return embed
+
+
+class CarouselStore:
+    """Bounded LRU of carousel states with an optional SQLite tier.
+
+    Args:
+        store: Optional on-disk tier so carousels survive restarts.
+        ttl: Seconds a carousel stays browsable.
+        max_entries: Maximum number of carousels kept in memory.
+        max_stored: Maximum number of carousels kept on disk.
+    """
+
+    def __init__(
+        self,
+        store: SqliteKVStore | None = None,
+        ttl: float = 7 * 24 * 60 * 60,
+        max_entries: int = 500,
+        max_stored: int = 20000,
+    ) -> None:
+        self._store = store
+        self._ttl = max(0.0, ttl)
+        self._max_entries = max(1, max_entries)
+        self._max_stored = max(1, max_stored)
+        self._entries: OrderedDict[str, tuple[float, CarouselState]] = OrderedDict()
+        self._writes: set[asyncio.Task[None]] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, key: str, state: CarouselState) -> None:
+        """Remember a carousel, writing it through to disk in the background."""
+        expires_at = time.time() + self._ttl
+        self._put_memory(key, state, expires_at)
+        if self._store is not None:
+            self._spawn_write(self._store.put, key, state.to_json(), expires_at)
+
+    async def get(self, key: str) -> CarouselState | None:
+        """Return the carousel for key from memory or disk, or None if unknown or expired."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, state = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                return state
+            del self._entries[key]
+
+        if self._store is None:
+            return None
+        try:
+            raw = await run_blocking(CAROUSEL, self._store.get, key)
+        except Exception as e:
+            log.warning("Failed to read carousel %s: %s", key, e)
+            return None
+        if not raw:
+            return None
+        try:
+            state = CarouselState.from_json(raw)
+        except (ValueError, KeyError, TypeError):
+            return None
+        self._put_memory(key, state, time.time() + self._ttl)
+        return state
+
+    def _put_memory(self, key: str, state: CarouselState, expires_at: float) -> None:
+        """Insert a carousel, evicting the least recently used entry over capacity."""
+        self._entries[key] = (expires_at, state)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _spawn_write(self, func: Callable[..., None], *args: object) -> None:
+        """Run a blocking store write off-loop without making the caller wait."""
+        task = asyncio.create_task(run_blocking(CAROUSEL, func, *args))
+        self._writes.add(task)
+        task.add_done_callback(self._on_write_done)
+
+    def _on_write_done(self, task: asyncio.Task[None]) -> None:
+        self._writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("Failed to persist carousel: %s", task.exception())
+
+    async def close(self) -> None:
+        """Wait for pending writes, trim the disk tier and close it."""
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+        if self._store is not None:
+            await run_blocking(CAROUSEL, self._close_store, self._store)
+
+    def _close_store(self, store: SqliteKVStore) -> None:
+        """Drop expired and excess rows, then close the database."""
+        try:
+            store.prune(self._max_stored)
+        finally:
+            store.close()
+
+
+class CarouselButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"gw:car:(?P<key>[A-Za-z0-9_-]+):(?P<index>\d+):(?P<direction>[pn])",
+):
+    """Prev/Next button that shows image ``index`` of carousel ``key`` when clicked.
+
+    The class is registered once with ``Client.add_dynamic_items``; the
+    carousel states are looked up in :attr:`store`."""
+
+    store: ClassVar[CarouselStore | None] = None
+
+    def __init__(self, key: str, index: int, direction: str, disabled: bool = False) -> None:
+        previous = direction == "p"
+        super().__init__(
+            discord.ui.Button(
+                label="Prev" if previous else "Next",
+                style=discord.ButtonStyle.secondary if previous else discord.ButtonStyle.primary,
+                custom_id=f"gw:car:{key}:{index}:{direction}",
+                disabled=disabled,
+                row=0,
+            )
+        )
+        self.key = key
+        self.index = index
+
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction,
+        item: discord.ui.Button,
+        match: re.Match[str],
+    ) -> "CarouselButton":
+        return cls(match["key"], int(match["index"]), match["direction"])
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        state = await self.store.get(self.key) if self.store is not None else None
+        if state is None or not state.images:
+            await interaction.response.send_message(
+                "This listing's images are no longer available.", ephemeral=True
+            )
+            return
+        embed, view = state.page(self.key, self.index)
+        await interaction.response.edit_message(embed=embed, view=view)
+
+
+def build_carousel_view(key: str, state: CarouselState, index: int = 0) -> discord.ui.View:
+    """Build the persistent view for a carousel page.
+
+    Prev/Next point at the neighbouring indices and are disabled when
+    there is only one image; link buttons go on the second row."""
+    view = discord.ui.View(timeout=None)
+    count = len(state.images)
+    if count:
+        single = count <= 1
+        view.add_item(CarouselButton(key, (index - 1) % count, "p", disabled=single))
+        view.add_item(CarouselButton(key, (index + 1) % count, "n", disabled=single))
+    for label, url in state.links:
+        view.add_item(
+            discord.ui.Button(label=label, style=discord.ButtonStyle.link, url=url, row=1)
+        )
+    return view
@@ -0,0 +1,176 @@
+"""Circuit breakers for outbound enrichment upstreams.
+
+Each upstream host gets a breaker that tracks the outcome of its recent
+calls. Errors and calls slower than a latency threshold count as
+failures; once enough of the recent calls fail the breaker opens and
+calls are rejected immediately with :class:`CircuitOpenError`, so alerts
+go out untranslated or unenriched in milliseconds instead of waiting out
+a timeout. After a cool-down the breaker lets a probe call through
+(half-open) and closes again if it succeeds.
+"""
+
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+import aiohttp
+
+log = logging.getLogger(__name__)
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class BreakerState(Enum):
+    """Closed admits every call, open rejects them, half-open admits one probe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class BreakerCall:
+    """An admitted call.
+
+    ``epoch`` counts how often the breaker had opened when the call was
+    admitted, and ``probe`` marks the single half-open trial call."""
+
+    started_at: float
+    epoch: int
+    probe: bool = False
+
+
+class CircuitBreaker:
+    """Failure-rate and latency circuit breaker for one upstream.
+
+    Args:
+        name: Upstream name used in logs, usually the host.
+        window: Number of recent calls the failure ratio is computed over.
+        min_calls: Calls needed in the window before the breaker may open.
+        failure_ratio: Share of failed (or slow) calls that opens the breaker.
+        slow_call_seconds: Successful calls slower than this count as failures.
+        open_seconds: How long the breaker stays open before probing.
+        clock: Monotonic time source, replaceable in tests.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_ratio: float = 0.5,
+        slow_call_seconds: float = 3.0,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._outcomes: deque[bool] = deque(maxlen=max(1, window))
+        self._min_calls = max(1, min_calls)
+        self._failure_ratio = min(1.0, max(0.0, failure_ratio))
+        self._slow_call_seconds = slow_call_seconds
+        self._open_seconds = max(0.0, open_seconds)
+        self._monotonic = clock
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._epoch = 0
+
+    @property
+    def state(self) -> BreakerState:
+        """Current state; an open breaker reports half-open once its cool-down passed."""
+        if (
+            self._state is BreakerState.OPEN
+            and self._monotonic() - self._opened_at >= self._open_seconds
+        ):
+            return BreakerState.HALF_OPEN
+        return self._state
+
+    def before_call(self) -> BreakerCall:
+        """Admit a call, tagging it as the probe when the breaker is half-open.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a probe in flight.
+        """
+        state = self.state
+        if state is BreakerState.OPEN:
+            raise CircuitOpenError(f"circuit open for {self.name}")
+        if state is BreakerState.HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpenError(f"circuit half-open for {self.name}; probe in flight")
+            self._state = BreakerState.HALF_OPEN
+            self._probe_in_flight = True
+            return BreakerCall(self._monotonic(), self._epoch, probe=True)
+        return BreakerCall(self._monotonic(), self._epoch)
+
+    def record_success(self, call: BreakerCall) -> None:
+        """Record a completed call; slow calls are recorded as failures."""
+        if self._monotonic() - call.started_at > self._slow_call_seconds:
+            self._record(call, False, "slow call")
+        else:
+            self._record(call, True, "")
+
+    def record_failure(self, call: BreakerCall, reason: str = "error") -> None:
+        """Record a failed call."""
+        self._record(call, False, reason)
+
+    def record_cancelled(self, call: BreakerCall) -> None:
+        """Record a call cancelled by its caller: a failure if it was already slow."""
+        if self._monotonic() - call.started_at > self._slow_call_seconds:
+            self._record(call, False, "slow call cancelled")
+        elif call.probe:
+            self._probe_in_flight = False
+
+    def _record(self, call: BreakerCall, ok: bool, reason: str) -> None:
+        if call.epoch != self._epoch:
+            # Admitted before the breaker last opened; its late result is stale.
+            return
+        if self._state is BreakerState.HALF_OPEN:
+            self._probe_in_flight = False
+            if ok:
+                log.info("Circuit for %s closed after successful probe", self.name)
+                self._state = BreakerState.CLOSED
+                self._outcomes.clear()
+            else:
+                self._open(f"probe failed ({reason})")
+            return
+
+        self._outcomes.append(ok)
+        if self._state is BreakerState.CLOSED and len(self._outcomes) >= self._min_calls:
+            failures = self._outcomes.count(False)
+            if failures / len(self._outcomes) >= self._failure_ratio:
+                self._open(f"{failures}/{len(self._outcomes)} recent calls failed ({reason})")
+
+    def _open(self, why: str) -> None:
+        log.warning("Circuit for %s open for %.0fs: %s", self.name, self._open_seconds, why)
+        self._state = BreakerState.OPEN
+        self._opened_at = self._monotonic()
+        self._epoch += 1
+        self._outcomes.clear()
+
+
+class BreakerRegistry:
+    """Lazily created circuit breakers, one per upstream, sharing one configuration.
+
+    Keyword arguments are passed to every :class:`CircuitBreaker`."""
+
+    def __init__(self, **breaker_kwargs: Any) -> None:
+        self._kwargs = breaker_kwargs
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        """Return the breaker for an upstream, creating it on first use."""
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, **self._kwargs)
+            self._breakers[name] = breaker
+        return breaker
+
+    def states(self) -> dict[str, BreakerState]:
+        """Current state of every breaker created so far."""
+        return {name: breaker.state for name, breaker in self._breakers.items()}
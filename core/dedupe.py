@@ -0,0 +1,145 @@
+"""Time-windowed duplicate suppression for incoming webhooks.
+
+ai-goofish-monitor retries failed deliveries and several monitor tasks
+can match the same item. A webhook's idempotency header is claimed when
+it is accepted, and each recipient an item + price is delivered to is
+claimed after routing, so a second task matching the same item only
+reaches recipients that have not seen it yet. A webhook whose recipients
+were all notified within the window is acknowledged without being queued.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+from core.executors import JOURNAL, run_blocking
+from core.kvstore import SqliteKVStore
+
+log = logging.getLogger(__name__)
+
+
+class DedupeIndex:
+    """Memory-bounded TTL index of recently seen webhook keys.
+
+    Keys are written through to an optional SQLite store and loaded back
+    lazily on first use, so the window survives restarts.
+
+    Args:
+        store: Optional on-disk tier.
+        window: Seconds a claimed key suppresses duplicates. 0 disables dedupe.
+        max_entries: Maximum number of keys kept; the oldest are dropped first.
+    """
+
+    def __init__(
+        self,
+        store: SqliteKVStore | None = None,
+        window: float = 6 * 60 * 60,
+        max_entries: int = 20000,
+    ) -> None:
+        self._store = store
+        self._window = max(0.0, window)
+        self._max_entries = max(1, max_entries)
+        self._expiry: OrderedDict[str, float] = OrderedDict()
+        self._loaded = store is None
+        self._load_lock = asyncio.Lock()
+        self._writes: set[asyncio.Task[None]] = set()
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if duplicate suppression is active."""
+        return self._window > 0
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    async def _ensure_loaded(self) -> None:
+        """Load unexpired keys from disk once."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded or self._store is None:
+                return
+            try:
+                rows = await run_blocking(JOURNAL, self._load_from_store, self._store)
+            except Exception as e:
+                log.warning("Failed to load dedupe index: %s", e)
+                rows = []
+            now = time.time()
+            for key, _, expires_at in sorted(rows, key=lambda row: row[2] or 0.0):
+                if expires_at is not None and expires_at > now:
+                    self._expiry[key] = expires_at
+            self._loaded = True
+
+    def _load_from_store(self, store: SqliteKVStore) -> list[tuple[str, str, float | None]]:
+        """Read unexpired keys and trim the on-disk table to the entry limit."""
+        rows = store.load_recent(self._max_entries)
+        store.prune(self._max_entries)
+        return rows
+
+    def _evict(self, now: float) -> None:
+        """Drop expired keys and the oldest keys beyond the entry limit."""
+        while self._expiry:
+            key, expires_at = next(iter(self._expiry.items()))
+            if expires_at > now and len(self._expiry) <= self._max_entries:
+                break
+            del self._expiry[key]
+
+    async def claim(self, keys: Iterable[str]) -> bool:
+        """Claim keys for a new webhook.
+
+        Returns:
+            True if any key was already claimed within the window (a
+            duplicate); otherwise all keys are claimed and False is returned."""
+        keys = [key for key in keys if key]
+        if not keys or not self.enabled:
+            return False
+
+        await self._ensure_loaded()
+        now = time.time()
+        self._evict(now)
+        if any(self._expiry.get(key, 0.0) > now for key in keys):
+            return True
+
+        expires_at = now + self._window
+        for key in keys:
+            self._expiry[key] = expires_at
+            self._expiry.move_to_end(key)
+            if self._store is not None:
+                self._spawn_write(self._store.put, key, "1", expires_at)
+        self._evict(now)
+        return False
+
+    async def contains(self, keys: Iterable[str]) -> bool:
+        """Return True if every key (at least one) is claimed within the window."""
+        keys = [key for key in keys if key]
+        if not keys or not self.enabled:
+            return False
+        await self._ensure_loaded()
+        now = time.time()
+        return all(self._expiry.get(key, 0.0) > now for key in keys)
+
+    def release(self, keys: Iterable[str]) -> None:
+        """Forget keys claimed for a webhook that was not accepted after all."""
+        for key in keys:
+            if key and self._expiry.pop(key, None) is not None and self._store is not None:
+                self._spawn_write(self._store.delete, key)
+
+    def _spawn_write(self, func: Callable[..., None], *args: object) -> None:
+        """Run a blocking store write off-loop without making the caller wait."""
+        task = asyncio.create_task(run_blocking(JOURNAL, func, *args))
+        self._writes.add(task)
+        task.add_done_callback(self._on_write_done)
+
+    def _on_write_done(self, task: asyncio.Task[None]) -> None:
+        self._writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("Failed to persist dedupe key: %s", task.exception())
+
+    async def close(self) -> None:
+        """Wait for pending disk writes and close the store."""
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+        if self._store is not None:
+            await run_blocking(JOURNAL, self._store.close)
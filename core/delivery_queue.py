@@ -0,0 +1,276 @@
+"""Bounded, journaled delivery queue for accepted webhook notifications.
+
+Webhooks are written to an on-disk SQLite journal before they are
+acknowledged, then processed by a fixed pool of worker coroutines.
+Entries are only removed from the journal once a worker has handled
+them, so anything still pending at shutdown is replayed on the next start.
+A handler may also hand a job off (for example to a digest buffer) by
+returning a future; the job then stays journaled until that resolves.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from core import jsoncodec
+from core.executors import JOURNAL, run_blocking
+
+log = logging.getLogger(__name__)
+
+# How long stop() lets handed-off jobs whose future already resolved leave the journal.
+_HANDOFF_GRACE_SECONDS = 1.0
+
+
+@dataclass
+class DeliveryJob:
+    """A single accepted webhook waiting to be delivered."""
+
+    job_id: int
+    title: str
+    content: str
+    payload: Any
+    accepted_at: float
+
+
+class DeliveryJournal:
+    """Append-only SQLite journal of accepted, not yet delivered webhooks.
+
+    All methods are blocking and thread-safe; callers on the event loop
+    should run them off-loop.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the journal database lazily, creating the schema on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS deliveries ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " title TEXT NOT NULL,"
+                " content TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " accepted_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def append(self, title: str, content: str, payload: Any) -> DeliveryJob:
+        """Persist a webhook and return it as a job with its journal ID."""
+        accepted_at = time.time()
+        encoded = jsoncodec.dumps_text(payload, default=str)
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "INSERT INTO deliveries (title, content, payload, accepted_at) VALUES (?, ?, ?, ?)",
+                (title, content, encoded, accepted_at),
+            )
+            conn.commit()
+            job_id = int(cursor.lastrowid or 0)
+        return DeliveryJob(
+            job_id=job_id,
+            title=title,
+            content=content,
+            payload=payload,
+            accepted_at=accepted_at,
+        )
+
+    def remove(self, job_id: int) -> None:
+        """Delete a delivered job from the journal."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM deliveries WHERE id = ?", (job_id,))
+            conn.commit()
+
+    def pending(self) -> list[DeliveryJob]:
+        """Return all journaled jobs in acceptance order."""
+        query = "SELECT id, title, content, payload, accepted_at FROM deliveries ORDER BY id"
+        with self._lock:
+            rows = self._connect().execute(query).fetchall()
+
+        jobs: list[DeliveryJob] = []
+        for job_id, title, content, payload_text, accepted_at in rows:
+            try:
+                payload = jsoncodec.loads(payload_text)
+            except ValueError:
+                payload = payload_text
+            jobs.append(
+                DeliveryJob(
+                    job_id=int(job_id),
+                    title=title,
+                    content=content,
+                    payload=payload,
+                    accepted_at=float(accepted_at),
+                )
+            )
+        return jobs
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class QueueFullError(Exception):
+    """Raised when the delivery queue cannot accept more webhooks."""
+
+
+class DeliveryQueue:
+    """Bounded in-process queue drained by a fixed number of worker coroutines.
+
+    Args:
+        handler: Coroutine function that delivers a single job. It returns None
+            once the job is done, or a future that resolves when it is.
+        journal: On-disk journal used to survive restarts.
+        max_size: Maximum number of accepted but undelivered jobs.
+        workers: Number of concurrent worker coroutines.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[DeliveryJob], Awaitable[asyncio.Future[Any] | None]],
+        journal: DeliveryJournal,
+        max_size: int = 500,
+        workers: int = 4,
+    ) -> None:
+        self._handler = handler
+        self._journal = journal
+        self._max_size = max(1, max_size)
+        self._worker_count = max(1, workers)
+        self._queue: asyncio.Queue[DeliveryJob] = asyncio.Queue()
+        self._pending = 0
+        self._workers: list[asyncio.Task[None]] = []
+        self._handoffs: set[asyncio.Task[None]] = set()
+
+    @property
+    def depth(self) -> int:
+        """Number of accepted jobs not yet fully delivered."""
+        return self._pending
+
+    @property
+    def is_full(self) -> bool:
+        """Return True if no more jobs can be accepted."""
+        return self._pending >= self._max_size
+
+    async def start(self) -> None:
+        """Replay journaled jobs from a previous run and start the workers."""
+        if self._workers:
+            return
+
+        replayed = await run_blocking(JOURNAL, self._journal.pending)
+        for job in replayed:
+            self._pending += 1
+            self._queue.put_nowait(job)
+        if replayed:
+            log.info("Replaying %d journaled webhook deliveries", len(replayed))
+
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"webhook-delivery-{i}")
+            for i in range(self._worker_count)
+        ]
+
+    async def stop_workers(self) -> None:
+        """Cancel the workers so no further jobs are handled or handed off."""
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def stop(self) -> None:
+        """Cancel the workers and close the journal.
+
+        Handed-off jobs that complete within a short grace period leave the
+        journal; the rest, like other undelivered jobs, stay for replay."""
+        await self.stop_workers()
+        handoffs = set(self._handoffs)
+        if handoffs:
+            _, unfinished = await asyncio.wait(handoffs, timeout=_HANDOFF_GRACE_SECONDS)
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+        await run_blocking(JOURNAL, self._journal.close)
+
+    async def submit(self, title: str, content: str, payload: Any) -> DeliveryJob:
+        """Journal a webhook and queue it for delivery.
+
+        Raises:
+            QueueFullError: If the queue is already at capacity.
+        """
+        if self.is_full:
+            raise QueueFullError(f"delivery queue is full ({self._max_size} pending)")
+
+        # Reserve the slot before yielding so concurrent submits cannot overshoot.
+        self._pending += 1
+        try:
+            job = await run_blocking(JOURNAL, self._journal.append, title, content, payload)
+        except BaseException:
+            self._pending -= 1
+            raise
+
+        self._queue.put_nowait(job)
+        return job
+
+    async def join(self) -> None:
+        """Wait until every queued job has been handled and removed from the journal.
+
+        This includes handed-off jobs, so it waits for their futures too."""
+        await self._queue.join()
+        while self._handoffs:
+            await asyncio.gather(*self._handoffs, return_exceptions=True)
+
+    async def _worker(self) -> None:
+        """Deliver jobs one at a time until cancelled."""
+        while True:
+            job = await self._queue.get()
+            try:
+                handoff: asyncio.Future[Any] | None = None
+                try:
+                    handoff = await self._handler(job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    log.exception("Webhook delivery %d failed", job.job_id)
+
+                if handoff is None:
+                    await self._complete(job)
+                else:
+                    task = asyncio.create_task(self._complete_after(job, handoff))
+                    self._handoffs.add(task)
+                    task.add_done_callback(self._handoffs.discard)
+            finally:
+                self._queue.task_done()
+
+    async def _complete_after(self, job: DeliveryJob, handoff: asyncio.Future[Any]) -> None:
+        """Complete a handed-off job once its future resolves; cancellation keeps it journaled."""
+        try:
+            # Shielded: the future may be shared with other jobs (one digest flush).
+            await asyncio.shield(handoff)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("Webhook delivery %d failed", job.job_id)
+        await self._complete(job)
+
+    async def _complete(self, job: DeliveryJob) -> None:
+        """Release a job's queue slot and remove it from the journal."""
+        self._pending -= 1
+        try:
+            await run_blocking(JOURNAL, self._journal.remove, job.job_id)
+        except Exception as e:
+            log.warning("Failed to remove delivery %d from journal: %s", job.job_id, e)
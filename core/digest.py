@@ -0,0 +1,120 @@
+"""Digest mode: coalesce bursts of alerts into fewer Discord messages.
+
+Alerts are buffered per recipient until either the window elapses or
+enough items are collected, then handed to a flush callback. Packing
+respects Discord's per-message limits of 10 embeds and 6000 embed
+characters in total.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+log = logging.getLogger(__name__)
+
+DISCORD_MAX_EMBEDS_PER_MESSAGE = 10
+DISCORD_MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+T = TypeVar("T")
+
+
+def pack_by_size(
+    sizes: list[int],
+    max_items: int = DISCORD_MAX_EMBEDS_PER_MESSAGE,
+    max_chars: int = DISCORD_MAX_EMBED_CHARS_PER_MESSAGE,
+) -> list[list[int]]:
+    """Group item indices, in order, into messages within the item and character limits.
+
+    An item larger than ``max_chars`` on its own still gets a message of its own."""
+    groups: list[list[int]] = []
+    current: list[int] = []
+    current_chars = 0
+    for index, size in enumerate(sizes):
+        if current and (len(current) >= max_items or current_chars + size > max_chars):
+            groups.append(current)
+            current, current_chars = [], 0
+        current.append(index)
+        current_chars += size
+    if current:
+        groups.append(current)
+    return groups
+
+
+class DigestBuffer(Generic[T]):
+    """Per-key buffer that flushes after ``window`` seconds or ``max_items`` items.
+
+    Buffered items live in memory only. :meth:`add` returns a future that
+    resolves once the item has been flushed, so callers can keep their own
+    durable record until then; :meth:`close` flushes whatever is pending.
+
+    Args:
+        flush: Coroutine called with the key and the buffered items.
+        window: Seconds to wait after the first buffered item before flushing.
+        max_items: Flush immediately once this many items are buffered.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[str, list[T]], Awaitable[None]],
+        window: float = 10.0,
+        max_items: int = DISCORD_MAX_EMBEDS_PER_MESSAGE,
+    ) -> None:
+        self._flush = flush
+        self._window = max(0.0, window)
+        self._max_items = max(1, max_items)
+        self._pending: dict[str, list[T]] = {}
+        self._flushed: dict[str, asyncio.Future[None]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._pending.values())
+
+    async def add(self, key: str, item: T) -> asyncio.Future[None]:
+        """Buffer an item, flushing the key right away if it is full.
+
+        Returns:
+            A future resolved once the flush carrying this item has finished
+            (whether or not the flush callback succeeded)."""
+        pending = self._pending.setdefault(key, [])
+        pending.append(item)
+        flushed = self._flushed.get(key)
+        if flushed is None:
+            flushed = self._flushed[key] = asyncio.get_running_loop().create_future()
+        if len(pending) >= self._max_items:
+            await self._flush_key(key)
+        elif key not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[key] = loop.call_later(self._window, self._on_timer, key)
+        return flushed
+
+    def _on_timer(self, key: str) -> None:
+        """Flush a key whose window has elapsed."""
+        self._timers.pop(key, None)
+        task = asyncio.create_task(self._flush_key(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_key(self, key: str) -> None:
+        """Hand everything buffered for key to the flush callback."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(key, [])
+        flushed = self._flushed.pop(key, None)
+        if not items:
+            return
+        try:
+            await self._flush(key, items)
+        except Exception:
+            log.exception("Failed to flush digest of %d alerts for %s", len(items), key)
+        if flushed is not None and not flushed.done():
+            flushed.set_result(None)
+
+    async def close(self) -> None:
+        """Flush every pending key and wait for in-flight flushes."""
+        for key in list(self._pending):
+            await self._flush_key(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
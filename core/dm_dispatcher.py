@@ -0,0 +1,269 @@
+"""Rate-limit-aware dispatcher for outgoing Discord messages.
+
+Sends for each destination are serialised through one consumer
+coroutine, paced with a token bucket, and retried with jitter when
+Discord answers 429 or a server error. Callers await the sent message.
+Resolved recipient channels are cached so the hot path makes no lookup calls.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import discord
+
+from core.routing import Recipient
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket allowing ``burst`` sends, refilled at ``rate`` per second."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self._rate = max(0.01, rate)
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        self._refill()
+        while self._tokens < 1.0:
+            await asyncio.sleep((1.0 - self._tokens) / self._rate)
+            self._refill()
+        self._tokens -= 1.0
+
+
+@dataclass
+class DispatcherStats:
+    """Counters and timings for dispatched sends."""
+
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    queue_depth: int = 0
+    last_latency: float = 0.0
+    avg_latency: float = 0.0
+
+    def record_latency(self, latency: float) -> None:
+        """Update the last and exponentially weighted average send latency."""
+        self.last_latency = latency
+        if self.avg_latency == 0.0:
+            self.avg_latency = latency
+        else:
+            self.avg_latency = 0.8 * self.avg_latency + 0.2 * latency
+
+
+@dataclass
+class _SendRequest:
+    target: discord.abc.Messageable
+    kwargs: dict[str, Any]
+    future: asyncio.Future[discord.Message]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class _Route:
+    """Queue, pacing bucket and consumer task for one destination."""
+
+    def __init__(self, bucket: TokenBucket) -> None:
+        self.bucket = bucket
+        self.queue: asyncio.Queue[_SendRequest] = asyncio.Queue()
+        self.task: asyncio.Task[None] | None = None
+
+
+def _retry_after_seconds(error: discord.HTTPException) -> float | None:
+    """Read the Retry-After header from a failed Discord response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+class DMDispatcher:
+    """Serialised, paced sender of Discord messages, one route per destination.
+
+    Args:
+        rate: Sustained sends per second per route.
+        burst: Sends allowed back to back before pacing kicks in.
+        max_retries: Retries for 429 and 5xx responses before giving up.
+        base_backoff: Initial retry delay in seconds when Discord gives no hint.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 5,
+        max_retries: int = 3,
+        base_backoff: float = 1.0,
+    ) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._max_retries = max(0, max_retries)
+        self._base_backoff = max(0.0, base_backoff)
+        self._routes: dict[str, _Route] = {}
+        self.stats = DispatcherStats()
+
+    async def send(
+        self, route: str, target: discord.abc.Messageable, **kwargs: Any
+    ) -> discord.Message:
+        """Queue a message for target and wait until it has been sent.
+
+        Args:
+            route: Pacing key, usually the destination channel or user ID.
+            target: Destination to call ``send`` on.
+            **kwargs: Passed through to ``target.send``.
+
+        Raises:
+            discord.HTTPException: If the send failed permanently.
+        """
+        entry = self._routes.get(route)
+        if entry is None:
+            entry = _Route(TokenBucket(self._rate, self._burst))
+            self._routes[route] = entry
+        if entry.task is None or entry.task.done():
+            entry.task = asyncio.create_task(self._consume(entry), name=f"dm-dispatch-{route}")
+
+        future: asyncio.Future[discord.Message] = asyncio.get_running_loop().create_future()
+        entry.queue.put_nowait(_SendRequest(target=target, kwargs=kwargs, future=future))
+        self.stats.queue_depth += 1
+        return await future
+
+    async def _consume(self, route: _Route) -> None:
+        """Send queued messages for one route in order, honouring the bucket."""
+        while True:
+            request = await route.queue.get()
+            self.stats.queue_depth -= 1
+            if request.future.done():
+                # The caller gave up (e.g. shutdown); don't send on its behalf.
+                continue
+
+            await route.bucket.acquire()
+            try:
+                message = await self._send_with_retries(request)
+            except asyncio.CancelledError:
+                request.future.cancel()
+                raise
+            except Exception as e:
+                self.stats.failed += 1
+                if not request.future.done():
+                    request.future.set_exception(e)
+                continue
+
+            self.stats.sent += 1
+            latency = time.monotonic() - request.enqueued_at
+            self.stats.record_latency(latency)
+            log.debug(
+                "Dispatched Discord message in %.2fs (queue depth %d)",
+                latency,
+                self.stats.queue_depth,
+            )
+            if not request.future.done():
+                request.future.set_result(message)
+
+    async def _send_with_retries(self, request: _SendRequest) -> discord.Message:
+        """Send once, retrying 429 and 5xx responses with backoff and jitter."""
+        attempt = 0
+        while True:
+            error: discord.DiscordException
+            try:
+                return await request.target.send(**request.kwargs)
+            except discord.RateLimited as e:
+                error, delay = e, e.retry_after
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    delay = _retry_after_seconds(e) or self._base_backoff * (2**attempt)
+                elif e.status >= 500:
+                    delay = self._base_backoff * (2**attempt)
+                else:
+                    raise
+                error = e
+
+            if attempt >= self._max_retries:
+                raise error
+            attempt += 1
+            self.stats.retries += 1
+            delay += random.uniform(0, max(0.1, delay * 0.1))
+            log.warning("Discord send throttled; retrying in %.2fs (attempt %d)", delay, attempt)
+            await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        """Stop all route consumers and fail messages still waiting to be sent."""
+        routes, self._routes = list(self._routes.values()), {}
+        tasks = [route.task for route in routes if route.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for route in routes:
+            while not route.queue.empty():
+                request = route.queue.get_nowait()
+                self.stats.queue_depth -= 1
+                if not request.future.done():
+                    request.future.cancel()
+
+
+class RecipientCache:
+    """Process-lifetime cache of resolved destinations for recipients.
+
+    DM channels are resolved from the client's user cache, falling back to
+    a REST ``fetch_user`` on a miss; guild channels likewise prefer
+    ``get_channel`` over ``fetch_channel``. Entries are dropped with
+    :meth:`invalidate` when Discord reports the user or channel gone."""
+
+    def __init__(self, client: discord.Client) -> None:
+        self._client = client
+        self._channels: dict[Recipient, discord.abc.Messageable] = {}
+        self._locks: dict[Recipient, asyncio.Lock] = {}
+
+    async def resolve(self, recipient: Recipient) -> discord.abc.Messageable:
+        """Return the channel messages for a recipient are sent to, resolving it once."""
+        channel = self._channels.get(recipient)
+        if channel is not None:
+            return channel
+
+        lock = self._locks.setdefault(recipient, asyncio.Lock())
+        async with lock:
+            channel = self._channels.get(recipient)
+            if channel is None:
+                channel = await self._lookup(recipient)
+                self._channels[recipient] = channel
+                log.debug("Resolved %s to channel %s", recipient.key, getattr(channel, "id", "?"))
+            return channel
+
+    async def _lookup(self, recipient: Recipient) -> discord.abc.Messageable:
+        """Resolve a recipient through the client cache, then the REST API."""
+        if recipient.kind == "user":
+            user = self._client.get_user(recipient.id) or await self._client.fetch_user(
+                recipient.id
+            )
+            return user.dm_channel or await user.create_dm()
+
+        channel = self._client.get_channel(recipient.id) or await self._client.fetch_channel(
+            recipient.id
+        )
+        if not isinstance(channel, discord.abc.Messageable):
+            raise TypeError(f"Channel {recipient.id} cannot receive messages")
+        return channel
+
+    def invalidate(self, recipient: Recipient) -> None:
+        """Forget a cached channel so the next lookup resolves it again."""
+        self._channels.pop(recipient, None)
+
+    async def warm_up(self, recipients: list[Recipient]) -> None:
+        """Resolve recipients' channels ahead of the first notification."""
+        results = await asyncio.gather(
+            *(self.resolve(recipient) for recipient in recipients), return_exceptions=True
+        )
+        for recipient, result in zip(recipients, results):
+            if isinstance(result, Exception):
+                log.warning("Failed to resolve channel for %s: %s", recipient.key, result)
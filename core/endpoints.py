@@ -0,0 +1,130 @@
+"""Webhook endpoint definitions for serving several monitor instances.
+
+Each endpoint is a path on the shared webhook listener with its own
+secret, recipients, routing rules, digest and dedupe policy, and delivery
+queue. Any policy an endpoint leaves out is inherited from the global
+``WEBHOOK_*`` / ``DISCORD_*`` settings.
+"""
+
+import logging
+from typing import Any
+
+from pydantic import BaseModel, Field, field_validator
+
+from config import settings
+from core.fx import DisplayCurrencies, normalize_currency
+from core.routing import Recipient, Router, RoutingRule, parse_rules
+
+log = logging.getLogger(__name__)
+
+DEFAULT_ENDPOINT_NAME = "default"
+
+
+class EndpointConfig(BaseModel):
+    """One webhook endpoint and the policies applied to its notifications."""
+
+    name: str = Field(pattern=r"^[A-Za-z0-9_-]+$")
+    path: str
+    secret: str = ""
+    # Used when no routing rule matches.
+    recipients: list[str] = Field(default_factory=list)
+    routes: list[RoutingRule] = Field(default_factory=list)
+    # Currency prices are converted to, unless DISCORD_RECIPIENT_CURRENCIES overrides it.
+    display_currency: str = "EUR"
+    digest_enabled: bool = False
+    digest_window_seconds: float = 10.0
+    digest_max_items: int = 10
+    dedupe_window_seconds: int = 6 * 60 * 60
+    dedupe_max_entries: int = 20000
+    queue_size: int = 500
+    workers: int = 4
+
+    @field_validator("path")
+    @classmethod
+    def _validate_path(cls, value: str) -> str:
+        if not value.startswith("/"):
+            raise ValueError(f"Endpoint path must start with '/': {value!r}")
+        return value
+
+    @field_validator("display_currency")
+    @classmethod
+    def _validate_display_currency(cls, value: str) -> str:
+        return normalize_currency(value)
+
+    @field_validator("recipients")
+    @classmethod
+    def _validate_recipients(cls, value: list[str]) -> list[str]:
+        for recipient in value:
+            Recipient.parse(recipient)
+        return value
+
+    @property
+    def queue_filename(self) -> str:
+        """Journal/dedupe database file under data_dir for this endpoint."""
+        if self.name == DEFAULT_ENDPOINT_NAME:
+            return "webhook_queue.sqlite3"
+        return f"webhook_queue-{self.name}.sqlite3"
+
+    def build_router(self) -> Router:
+        """Build the router for this endpoint's rules and default recipients."""
+        return Router(self.routes, [Recipient.parse(r) for r in self.recipients])
+
+
+def _inherited_fields() -> dict[str, Any]:
+    """Endpoint fields taken from the global settings unless overridden."""
+    return {
+        "secret": settings.webhook_secret,
+        "recipients": [f"user:{settings.discord_user_id}"] if settings.discord_user_id else [],
+        # Validated here so an invalid global code falls back to EUR instead of
+        # invalidating every endpoint.
+        "display_currency": DisplayCurrencies.from_config(
+            settings.discord_display_currency, {}
+        ).default,
+        "digest_enabled": settings.discord_digest_enabled,
+        "digest_window_seconds": settings.discord_digest_window_seconds,
+        "digest_max_items": settings.discord_digest_max_items,
+        "dedupe_window_seconds": settings.webhook_dedupe_window_seconds,
+        "dedupe_max_entries": settings.webhook_dedupe_max_entries,
+        "queue_size": settings.webhook_queue_size,
+        "workers": settings.webhook_workers,
+    }
+
+
+def default_endpoint(path: str, secret: str) -> EndpointConfig:
+    """The single endpoint served when no ``WEBHOOK_ENDPOINTS`` are configured."""
+    return EndpointConfig.model_validate(
+        {
+            **_inherited_fields(),
+            "name": DEFAULT_ENDPOINT_NAME,
+            "path": path,
+            "secret": secret,
+            "routes": parse_rules(settings.discord_routes),
+        }
+    )
+
+
+def load_endpoints(raw_endpoints: list[dict[str, Any]]) -> list[EndpointConfig]:
+    """Build endpoints from raw dicts, skipping invalid ones and duplicate names or paths.
+
+    Endpoints without a ``routes`` key use ``DISCORD_ROUTES``. Invalid
+    routing rules are skipped the same way ``DISCORD_ROUTES`` rules are;
+    the rest of the endpoint still loads."""
+    endpoints: list[EndpointConfig] = []
+    names: set[str] = set()
+    paths: set[str] = set()
+    for raw in raw_endpoints:
+        try:
+            fields = {**_inherited_fields(), **raw}
+            raw_routes = raw["routes"] if "routes" in raw else settings.discord_routes
+            fields["routes"] = parse_rules(list(raw_routes or []))
+            endpoint = EndpointConfig.model_validate(fields)
+        except (ValueError, TypeError, AttributeError) as e:
+            log.error("Ignoring invalid webhook endpoint %r: %s", raw, e)
+            continue
+        if endpoint.name in names or endpoint.path in paths:
+            log.error("Ignoring webhook endpoint %r: duplicate name or path", endpoint.name)
+            continue
+        names.add(endpoint.name)
+        paths.add(endpoint.path)
+        endpoints.append(endpoint)
+    return endpoints
@@ -0,0 +1,218 @@
+"""Named, bounded thread pools for blocking work.
+
+``asyncio.to_thread`` shares the loop's default executor with discord.py
+and every other library, so one slow dependency (a busy SQLite file, a
+slow disk) could starve the rest. Blocking calls instead run on a small
+pool per workload class, each with a cap on queued calls and metrics for
+queue depth and how long calls waited for a thread.
+
+Pools are created lazily and are not bound to an event loop.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from config import settings
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Delivery journal and dedupe index of every webhook endpoint.
+JOURNAL = "journal"
+# On-disk cache tiers.
+TRANSLATION = "translation"
+PREVIEW = "preview"
+CAROUSEL = "carousel"
+FX = "fx"
+# Cookie and storage-state files written by the scanner.
+FILES = "files"
+
+DEFAULT_POOL_SIZES: dict[str, int] = {
+    JOURNAL: 2,
+    TRANSLATION: 2,
+    PREVIEW: 2,
+    CAROUSEL: 2,
+    FX: 1,
+    FILES: 2,
+}
+
+_SLOW_WAIT_LOG_INTERVAL_SECONDS = 60.0
+
+
+class ExecutorFullError(RuntimeError):
+    """Raised when a pool already has its maximum number of calls queued."""
+
+
+@dataclass(frozen=True)
+class ExecutorStats:
+    """Point-in-time metrics for one pool."""
+
+    name: str
+    max_workers: int
+    queued: int
+    running: int
+    completed: int
+    rejected: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        """Mean time completed and running calls waited for a thread."""
+        started = self.completed + self.running
+        return self.total_wait_seconds / started if started else 0.0
+
+
+@dataclass
+class _Ticket:
+    """Per-call state shared between the awaiting coroutine and the worker thread."""
+
+    submitted_at: float
+    started: bool = False
+    abandoned: bool = False
+
+
+class BoundedExecutor:
+    """Thread pool with a bounded queue and wait-time metrics.
+
+    Args:
+        name: Workload name, used for thread names, logs and metrics.
+        max_workers: Number of threads.
+        max_queue: Calls allowed to wait for a thread before new ones are rejected.
+        slow_wait_seconds: Waits longer than this are logged (at most once a minute).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int = 2,
+        max_queue: int = 1000,
+        slow_wait_seconds: float = 1.0,
+    ) -> None:
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._max_queue = max(1, max_queue)
+        self._slow_wait_seconds = slow_wait_seconds
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=f"goofish-{name}"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_slow_log = 0.0
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run func(*args, **kwargs) on this pool, propagating context like ``to_thread``.
+
+        Raises:
+            ExecutorFullError: If ``max_queue`` calls are already waiting.
+        """
+        with self._lock:
+            if self._queued >= self._max_queue:
+                self._rejected += 1
+                raise ExecutorFullError(f"{self.name} executor queue is full")
+            self._queued += 1
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        ticket = _Ticket(time.monotonic())
+        try:
+            return await loop.run_in_executor(self._pool, self._run_measured, call, ticket)
+        except BaseException:
+            with self._lock:
+                if not ticket.started:
+                    # Cancelled while queued: the thread will skip the call.
+                    ticket.abandoned = True
+                    self._queued -= 1
+            raise
+
+    def _run_measured(self, call: Callable[[], T], ticket: _Ticket) -> T:
+        submitted_at = ticket.submitted_at
+        waited = time.monotonic() - submitted_at
+        with self._lock:
+            if ticket.abandoned:
+                return None  # type: ignore[return-value]
+            ticket.started = True
+            self._queued -= 1
+            self._running += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            log_slow = (
+                waited > self._slow_wait_seconds
+                and submitted_at - self._last_slow_log > _SLOW_WAIT_LOG_INTERVAL_SECONDS
+            )
+            if log_slow:
+                self._last_slow_log = submitted_at
+        if log_slow:
+            log.warning(
+                "%s executor is saturated: call waited %.2fs for a thread (%d queued)",
+                self.name,
+                waited,
+                self._queued,
+            )
+        try:
+            return call()
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    def stats(self) -> ExecutorStats:
+        """Return current queue depth, throughput and wait-time metrics."""
+        with self._lock:
+            return ExecutorStats(
+                name=self.name,
+                max_workers=self.max_workers,
+                queued=self._queued,
+                running=self._running,
+                completed=self._completed,
+                rejected=self._rejected,
+                total_wait_seconds=self._total_wait,
+                max_wait_seconds=self._max_wait,
+            )
+
+    def shutdown(self) -> None:
+        """Stop accepting work; queued calls still run, threads exit when done."""
+        self._pool.shutdown(wait=False)
+
+
+_executors: dict[str, BoundedExecutor] = {}
+_registry_lock = threading.Lock()
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """Return the pool for a workload, creating it from settings on first use."""
+    executor = _executors.get(name)
+    if executor is None:
+        with _registry_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                size = settings.executor_pool_sizes.get(name, DEFAULT_POOL_SIZES.get(name, 2))
+                executor = BoundedExecutor(
+                    name, max_workers=size, max_queue=settings.executor_max_queue
+                )
+                _executors[name] = executor
+    return executor
+
+
+async def run_blocking(name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the named workload's pool."""
+    return await get_executor(name).run(func, *args, **kwargs)
+
+
+def executor_stats() -> list[ExecutorStats]:
+    """Metrics for every pool created so far."""
+    return [executor.stats() for executor in list(_executors.values())]
@@ -0,0 +1,264 @@
+"""Exchange rates from the ECB daily feed, kept fresh by a background task.
+
+Each download is parsed once into an immutable :class:`RateTable` with
+every cross rate precomputed, so converting a price is a dict lookup.
+Notifications read :attr:`FxRefresher.table`, which never waits on the
+network: it returns the last good table (even once stale) while a refresh
+runs in the background, or a CNY/EUR table built from the configured
+fallback rate before any rate is known. Refreshes start ahead of expiry,
+failures are retried with exponential backoff, and the last good table is
+persisted so a cold start has rates immediately.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import xml.etree.ElementTree as ET
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any
+
+from core import jsoncodec
+from core.executors import FX, run_blocking
+from core.http_client import HttpClient
+from core.kvstore import SqliteKVStore
+from core.routing import Recipient
+
+log = logging.getLogger(__name__)
+
+ECB_DAILY_URL = "https://www.ecb.europa.eu/stats/eurofxref/eurofxref-daily.xml"
+
+_ECB_NS = {"e": "http://www.ecb.int/vocabulary/2002-08-01/eurofxref"}
+_CURRENCY_RE = re.compile(r"^[A-Z]{3}$")
+_STORE_KEY = "ecb_rates"
+# Start refreshing once this fraction of the TTL has passed.
+_REFRESH_AHEAD_FRACTION = 0.8
+
+
+async def fetch_ecb_daily_xml(http: HttpClient) -> str:
+    """Fetch the ECB daily eurofxref XML feed."""
+    return await http.get_text(
+        ECB_DAILY_URL,
+        headers={"Accept": "application/xml,text/xml,*/*"},
+        timeout=8,
+    )
+
+
+def normalize_currency(code: str) -> str:
+    """Upper-case an ISO 4217 code.
+
+    Raises:
+        ValueError: If the code is not three letters.
+    """
+    normalized = str(code).strip().upper()
+    if not _CURRENCY_RE.match(normalized):
+        raise ValueError(f"Invalid currency code: {code!r}")
+    return normalized
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """Immutable snapshot of ECB reference rates with every cross rate precomputed.
+
+    ``per_eur`` maps currency codes to units per EUR (EUR itself is 1)."""
+
+    per_eur: Mapping[str, float]
+    as_of: str = ""
+    _cross: Mapping[str, Mapping[str, float]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        per_eur = {"EUR": 1.0, **self.per_eur}
+        cross = {
+            source: MappingProxyType(
+                {target: target_rate / source_rate for target, target_rate in per_eur.items()}
+            )
+            for source, source_rate in per_eur.items()
+        }
+        object.__setattr__(self, "per_eur", MappingProxyType(per_eur))
+        object.__setattr__(self, "_cross", MappingProxyType(cross))
+
+    @classmethod
+    def fallback(cls, cny_to_eur: float) -> "RateTable":
+        """A CNY/EUR-only table built from a configured EUR-per-CNY rate."""
+        return cls({"CNY": 1.0 / cny_to_eur})
+
+    def rate(self, source: str, target: str) -> float | None:
+        """Units of target per unit of source, or None if either is unknown."""
+        row = self._cross.get(source)
+        return row.get(target) if row is not None else None
+
+    def convert(self, amount: float, source: str, target: str) -> float | None:
+        """Convert amount between currencies, or None if either is unknown."""
+        rate = self.rate(source, target)
+        return amount * rate if rate is not None else None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialise for persistence."""
+        return {"as_of": self.as_of, "per_eur": dict(self.per_eur)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RateTable":
+        """Inverse of :meth:`to_dict`."""
+        per_eur = {str(k): float(v) for k, v in data["per_eur"].items() if float(v) > 0}
+        return cls(per_eur, as_of=str(data.get("as_of", "")))
+
+
+def parse_ecb_rates(xml_text: str) -> RateTable:
+    """Parse every currency in the ECB daily cube into a rate table.
+
+    Raises:
+        ValueError: If the feed holds no usable rates.
+    """
+    root = ET.fromstring(xml_text)
+    day = root.find(".//e:Cube[@time]", _ECB_NS)
+    per_eur: dict[str, float] = {}
+    for node in root.iterfind(".//e:Cube[@currency]", _ECB_NS):
+        try:
+            rate = float(node.attrib.get("rate", "0"))
+        except ValueError:
+            continue
+        if rate > 0:
+            per_eur[node.attrib["currency"].upper()] = rate
+    if not per_eur:
+        raise ValueError("No rates present in ECB feed")
+    return RateTable(per_eur, as_of=day.attrib["time"] if day is not None else "")
+
+
+class DisplayCurrencies:
+    """Which currency each recipient sees converted prices in.
+
+    Args:
+        default: Currency for recipients without an override.
+        overrides: Currency per recipient key (``user:<id>``/``channel:<id>``).
+    """
+
+    def __init__(self, default: str = "EUR", overrides: dict[str, str] | None = None) -> None:
+        self.default = default
+        self._overrides = dict(overrides or {})
+
+    @classmethod
+    def from_config(cls, default: str, raw_overrides: dict[str, str]) -> "DisplayCurrencies":
+        """Build from settings, skipping (and logging) invalid entries."""
+        try:
+            default = normalize_currency(default)
+        except ValueError as e:
+            log.error("Invalid display currency, using EUR: %s", e)
+            default = "EUR"
+        overrides: dict[str, str] = {}
+        for recipient, currency in raw_overrides.items():
+            try:
+                overrides[Recipient.parse(recipient).key] = normalize_currency(currency)
+            except ValueError as e:
+                log.error("Ignoring display currency for %r: %s", recipient, e)
+        return cls(default, overrides)
+
+    def for_recipient(self, recipient: Recipient) -> str:
+        """Return the display currency for a recipient."""
+        return self._overrides.get(recipient.key, self.default)
+
+
+class FxRefresher:
+    """Serve the ECB rate table and refresh it in the background.
+
+    Args:
+        http: Pooled client used for the ECB feed.
+        store: Optional on-disk tier holding the last good table.
+        fallback: EUR per CNY served until a live or persisted table is known.
+        ttl: Seconds a fetched table counts as fresh.
+        min_backoff: First retry delay after a failed refresh.
+        max_backoff: Upper bound for the doubling retry delay.
+    """
+
+    def __init__(
+        self,
+        http: HttpClient,
+        store: SqliteKVStore | None = None,
+        fallback: float = 0.13,
+        ttl: float = 6 * 60 * 60,
+        min_backoff: float = 30.0,
+        max_backoff: float = 30 * 60,
+    ) -> None:
+        self._http = http
+        self._store = store
+        self._fallback = RateTable.fallback(fallback if fallback > 0 else 0.13)
+        self._ttl = max(1.0, ttl)
+        self._min_backoff = max(0.1, min_backoff)
+        self._max_backoff = max(self._min_backoff, max_backoff)
+        self._table: RateTable | None = None
+        self._updated_at = 0.0
+        self._failures = 0
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def table(self) -> RateTable:
+        """The last good rate table, or the fallback if none has been fetched yet."""
+        return self._table if self._table is not None else self._fallback
+
+    async def start(self) -> None:
+        """Load the persisted rate and start the background refresh task."""
+        if self._task is not None:
+            return
+        if self._store is not None:
+            try:
+                raw = await run_blocking(FX, self._store.get, _STORE_KEY)
+                if raw is not None:
+                    data = jsoncodec.loads(raw)
+                    table = RateTable.from_dict(data["table"])
+                    if table.per_eur.keys() - {"EUR"}:
+                        self._table, self._updated_at = table, float(data["updated_at"])
+            except Exception as e:
+                log.warning("Failed to load persisted FX rates: %s", e)
+        self._task = asyncio.create_task(self._run(), name="fx-refresher")
+
+    async def close(self) -> None:
+        """Stop the refresh task and close the on-disk tier."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self._store is not None:
+            await run_blocking(FX, self._store.close)
+
+    async def refresh(self) -> RateTable:
+        """Download and parse the ECB feed now, persist the table and return it.
+
+        Raises:
+            Exception: Whatever the fetch or parse raised; the previous table is kept.
+        """
+        table = parse_ecb_rates(await fetch_ecb_daily_xml(self._http))
+        self._table, self._updated_at = table, time.time()
+        if self._store is not None:
+            encoded = jsoncodec.dumps_text(
+                {"table": table.to_dict(), "updated_at": self._updated_at}
+            )
+            try:
+                await run_blocking(FX, self._store.put, _STORE_KEY, encoded)
+            except Exception as e:
+                log.warning("Failed to persist FX rates: %s", e)
+        return table
+
+    def next_refresh_delay(self) -> float:
+        """Seconds until the next refresh: backoff after failures, else ahead of expiry."""
+        if self._failures:
+            # Capped so a long outage cannot overflow the float multiplication.
+            doublings = min(self._failures - 1, 20)
+            return min(self._max_backoff, self._min_backoff * 2**doublings)
+        due = self._updated_at + self._ttl * _REFRESH_AHEAD_FRACTION
+        return max(0.0, due - time.time())
+
+    async def _run(self) -> None:
+        """Refresh the rate whenever it is due until cancelled."""
+        while True:
+            await asyncio.sleep(self.next_refresh_delay())
+            try:
+                table = await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failures += 1
+                log.warning("FX refresh failed (attempt %d): %s", self._failures, e)
+            else:
+                self._failures = 0
+                log.debug("Refreshed %d FX rates as of %s", len(table.per_eur), table.as_of)
@@ -0,0 +1,161 @@
+"""Shared pooled HTTP client for outbound enrichment calls.
+
+One ``aiohttp.ClientSession`` is kept per process so translation, listing
+preview and FX requests reuse keep-alive connections and cached DNS
+lookups instead of paying a fresh TCP+TLS handshake per call. Calls go
+through a circuit breaker per host, so an upstream that keeps failing or
+stalling is skipped immediately until it recovers.
+"""
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from core.circuit_breaker import BreakerRegistry
+
+_DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+# Client errors that still mean the upstream is healthy and answering.
+_HEALTHY_STATUSES = range(400, 500)
+_UNHEALTHY_CLIENT_STATUSES = frozenset({403, 408, 429})
+
+
+def _is_upstream_failure(exc: BaseException) -> bool:
+    """Return True if an exception says the upstream is down, blocking or overloaded."""
+    if isinstance(exc, aiohttp.ClientResponseError) and exc.status in _HEALTHY_STATUSES:
+        return exc.status in _UNHEALTHY_CLIENT_STATUSES
+    return True
+
+
+class HttpClient:
+    """Lazily created, pooled ``aiohttp`` session with per-call timeouts.
+
+    Args:
+        limit: Total number of pooled connections.
+        limit_per_host: Maximum concurrent connections to a single host.
+        dns_cache_ttl: Seconds to cache DNS resolutions.
+        keepalive_timeout: Seconds an idle pooled connection is kept open.
+        default_timeout: Total timeout in seconds for calls that do not pass one.
+        breakers: Circuit breakers keyed by host; defaults to a fresh registry.
+    """
+
+    def __init__(
+        self,
+        limit: int = 32,
+        limit_per_host: int = 8,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+        default_timeout: float = 10.0,
+        breakers: BreakerRegistry | None = None,
+    ) -> None:
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._dns_cache_ttl = dns_cache_ttl
+        self._keepalive_timeout = keepalive_timeout
+        self._default_timeout = default_timeout
+        self.breakers = breakers if breakers is not None else BreakerRegistry()
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use.
+
+        Must be accessed from within the running event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                ttl_dns_cache=self._dns_cache_ttl,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=_DEFAULT_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self._default_timeout),
+                raise_for_status=True,
+            )
+        return self._session
+
+    def _timeout(self, timeout: float | None) -> aiohttp.ClientTimeout:
+        """Build a per-call timeout, falling back to the client default."""
+        return aiohttp.ClientTimeout(total=timeout or self._default_timeout)
+
+    @asynccontextmanager
+    async def _guard(self, url: str) -> AsyncIterator[None]:
+        """Run a call through the host's circuit breaker and record its outcome.
+
+        Raises:
+            CircuitOpenError: Without calling the upstream if its breaker is open.
+        """
+        breaker = self.breakers.get(urlsplit(url).hostname or "")
+        call = breaker.before_call()
+        try:
+            yield
+        except Exception as e:
+            if _is_upstream_failure(e):
+                breaker.record_failure(call, type(e).__name__)
+            else:
+                breaker.record_success(call)
+            raise
+        except BaseException:
+            breaker.record_cancelled(call)
+            raise
+        breaker.record_success(call)
+
+    async def get_text(
+        self,
+        url: str,
+        *,
+        params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> str:
+        """GET a URL and return the decoded body text.
+
+        The charset is taken from the response ``Content-Type`` and
+        undecodable bytes are dropped."""
+        async with self._guard(url), self.session.get(
+            url, params=params, headers=headers, timeout=self._timeout(timeout)
+        ) as response:
+            return await response.text(errors="ignore")
+
+    async def get_json(
+        self,
+        url: str,
+        *,
+        params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> Any:
+        """GET a URL and decode the body as JSON regardless of its content type."""
+        async with self._guard(url), self.session.get(
+            url, params=params, headers=headers, timeout=self._timeout(timeout)
+        ) as response:
+            return await response.json(content_type=None)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Start a GET and yield the response without reading the body.
+
+        Use as ``async with http.stream(url) as response`` and read
+        ``response.content`` incrementally; leaving the block early
+        discards the rest of the body. Reading the body counts towards
+        the host's circuit breaker latency."""
+        async with self._guard(url), self.session.get(
+            url, headers=headers, timeout=self._timeout(timeout)
+        ) as response:
+            yield response
+
+    async def close(self) -> None:
+        """Close the session and release all pooled connections."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
@@ -0,0 +1,109 @@
+"""Pluggable JSON codec with optional fast backends.
+
+Uses orjson when installed, then msgspec, and falls back to the standard
+library otherwise (``pip install .[fast]`` pulls in orjson). Every
+backend produces the same data: UTF-8 output without ASCII escaping,
+compact unless ``indent`` is requested, and decode errors raised as
+``ValueError``.
+"""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on installed extras
+    msgspec = None  # type: ignore[assignment]
+
+JSONInput = bytes | bytearray | memoryview | str
+Default = Callable[[Any], Any] | None
+
+
+def _stdlib_loads(data: JSONInput) -> Any:
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj: Any, indent: bool, default: Default) -> bytes:
+    text = json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        default=default,
+    )
+    return text.encode("utf-8")
+
+
+def _orjson_loads(data: JSONInput) -> Any:
+    return orjson.loads(data)
+
+
+def _orjson_dumps(obj: Any, indent: bool, default: Default) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    try:
+        return orjson.dumps(obj, default=default, option=option)
+    except TypeError:
+        # e.g. integers beyond 64 bits, which the stdlib encoder still handles.
+        return _stdlib_dumps(obj, indent, default)
+
+
+_MSGSPEC_DECODER = msgspec.json.Decoder() if msgspec is not None else None
+
+
+def _msgspec_loads(data: JSONInput) -> Any:
+    try:
+        return _MSGSPEC_DECODER.decode(data)  # type: ignore[union-attr]
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
+
+
+def _msgspec_dumps(obj: Any, indent: bool, default: Default) -> bytes:
+    try:
+        encoded = msgspec.json.encode(obj, enc_hook=default)
+    except (TypeError, msgspec.EncodeError):
+        return _stdlib_dumps(obj, indent, default)
+    return msgspec.json.format(encoded, indent=2) if indent else encoded
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+    _loads, _dumps = _orjson_loads, _orjson_dumps
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _loads, _dumps = _msgspec_loads, _msgspec_dumps
+else:
+    BACKEND = "json"
+    _loads, _dumps = _stdlib_loads, _stdlib_dumps
+
+
+def loads(data: JSONInput) -> Any:
+    """Decode a JSON document.
+
+    Raises:
+        ValueError: If the document is not valid JSON.
+    """
+    return _loads(data)
+
+
+def dumps(obj: Any, *, indent: bool = False, default: Default = None) -> bytes:
+    """Encode obj as UTF-8 JSON bytes, compact unless indent is set.
+
+    Args:
+        obj: Value to encode; non-string dict keys are converted to strings.
+        indent: Pretty-print with two-space indentation.
+        default: Called for values the encoder does not support natively.
+    """
+    return _dumps(obj, indent, default)
+
+
+def dumps_text(obj: Any, *, indent: bool = False, default: Default = None) -> str:
+    """Encode obj as a JSON string; see :func:`dumps`."""
+    return _dumps(obj, indent, default).decode("utf-8")
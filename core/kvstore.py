@@ -0,0 +1,117 @@
+"""Small SQLite-backed key/value store used by the on-disk cache tiers.
+
+All methods are blocking and thread-safe; callers on the event loop
+should run them off-loop.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_TABLE_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class SqliteKVStore:
+    """String key/value table with an update timestamp and optional expiry per row.
+
+    Args:
+        path: SQLite database file; parent directories are created on demand.
+        table: Table name, so several stores can share one database file.
+    """
+
+    def __init__(self, path: Path, table: str = "kv") -> None:
+        if not _TABLE_NAME_RE.match(table):
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.path = Path(path)
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database lazily, creating the table on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " expires_at REAL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> str | None:
+        """Return the stored value for key, or None if missing or expired."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,))
+                .fetchone()
+            )
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return value
+
+    def put(self, key: str, value: str, expires_at: float | None = None) -> None:
+        """Insert or replace a value, stamping it with the current time."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, updated_at, expires_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, time.time(), expires_at),
+            )
+            conn.commit()
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            conn.commit()
+
+    def load_recent(self, limit: int) -> list[tuple[str, str, float | None]]:
+        """Return up to limit unexpired rows as (key, value, expires_at), newest first."""
+        with self._lock:
+            return (
+                self._connect()
+                .execute(
+                    f"SELECT key, value, expires_at FROM {self.table}"
+                    " WHERE expires_at IS NULL OR expires_at > ?"
+                    " ORDER BY updated_at DESC LIMIT ?",
+                    (time.time(), limit),
+                )
+                .fetchall()
+            )
+
+    def prune(self, keep: int) -> None:
+        """Delete expired rows and everything beyond the keep newest rows."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key NOT IN"
+                f" (SELECT key FROM {self.table} ORDER BY updated_at DESC LIMIT ?)",
+                (keep,),
+            )
+            conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,147 @@
+"""URL and text normalisation helpers used on every webhook.
+
+Goofish links are parsed once into a cached :class:`GoofishLink` holding
+the item ID and every derived URL (canonical PC, mobile share, Superbuy),
+so the several call sites that need them per listing share one parse.
+All patterns are compiled at import time and the common inputs (plain
+ASCII text, plain numbers) take ``str`` method fast paths before any regex.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+from urllib.parse import quote
+
+DISCORD_MAX_BUTTON_URL_LEN = 512
+DEFAULT_SUPERBUY_LINK_TEMPLATE = "https://www.superbuy.com/en/page/buy/?url={url}"
+
+_ITEM_ID_RE = re.compile(r"[?&]id=(\d+)")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+_SHORT_URL_PREFIX = (
+    "https://pages.goofish.com/sharexy"
+    "?loadingVisible=false&bft=item&bfs=idlepc.item&spm=a21ybx.item.0.0"
+    "&bfp="
+)
+
+
+def extract_goofish_item_id(url: str) -> str:
+    """Extract the numeric Goofish item ID from a URL query string, or ''."""
+    if not url or "id=" not in url:
+        return ""
+    match = _ITEM_ID_RE.search(url)
+    return match.group(1) if match else ""
+
+
+@dataclass(frozen=True)
+class GoofishLink:
+    """A Goofish link parsed once, with every URL derived from it.
+
+    Without an item ID the derived URLs fall back to the source link."""
+
+    source: str
+    item_id: str
+    canonical_url: str
+    short_url: str
+    superbuy_url: str
+
+
+def _superbuy_url(canonical_url: str, short_url: str, template: str) -> str:
+    """Fill the Superbuy template, preferring the canonical URL if it fits in a button."""
+    template = template.strip() or DEFAULT_SUPERBUY_LINK_TEMPLATE
+    if "{url}" not in template:
+        return template
+
+    primary = template.replace("{url}", quote(canonical_url, safe=""))
+    if len(primary) <= DISCORD_MAX_BUTTON_URL_LEN:
+        return primary
+    secondary = template.replace("{url}", quote(short_url, safe=""))
+    if len(secondary) <= DISCORD_MAX_BUTTON_URL_LEN:
+        return secondary
+    # Keep a non-empty URL even if too long for button; field can still show fallback text.
+    return primary
+
+
+@lru_cache(maxsize=4096)
+def parse_goofish_link(
+    url: str, superbuy_template: str = DEFAULT_SUPERBUY_LINK_TEMPLATE
+) -> GoofishLink:
+    """Parse a Goofish link into its item ID and derived URLs (memoized)."""
+    if not url:
+        return GoofishLink("", "", "", "", "")
+    item_id = extract_goofish_item_id(url)
+    if not item_id:
+        canonical_url, short_url = url.strip(), url
+    else:
+        canonical_url = f"https://www.goofish.com/item?id={item_id}"
+        short_url = _SHORT_URL_PREFIX + quote(f'{{"id":{item_id}}}')
+    return GoofishLink(
+        source=url,
+        item_id=item_id,
+        canonical_url=canonical_url,
+        short_url=short_url,
+        superbuy_url=_superbuy_url(canonical_url, short_url, superbuy_template),
+    )
+
+
+def fit_discord_button_url(url: str) -> str:
+    """Shorten a URL to fit the Discord button URL length limit (512 chars).
+
+    Tries the original, canonical PC URL, and short URL in order."""
+    candidate = (url or "").strip()
+    if not candidate:
+        return ""
+    if len(candidate) <= DISCORD_MAX_BUTTON_URL_LEN:
+        return candidate
+
+    link = parse_goofish_link(candidate)
+    if len(link.canonical_url) <= DISCORD_MAX_BUTTON_URL_LEN:
+        return link.canonical_url
+    if len(link.short_url) <= DISCORD_MAX_BUTTON_URL_LEN:
+        return link.short_url
+    return ""
+
+
+def contains_cjk(text: str) -> bool:
+    """Return True if text contains CJK ideograph characters."""
+    if not text or text.isascii():
+        return False
+    return _CJK_RE.search(text) is not None
+
+
+def parse_cny_amount(value: Any) -> float | None:
+    """Parse a CNY price value from various formats (string, number, wan).
+
+    Returns:
+        Float amount, or None if parsing fails."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).strip()
+    if not text:
+        return None
+
+    # Fast path for plain numbers such as "1299" or "1299.50".
+    if text[:1].isdigit() and text.isascii() and text.replace(".", "", 1).isdigit():
+        return float(text)
+
+    # Chained replace() beats str.translate() for these short strings.
+    text = text.replace(",", "").replace(" ", "").replace("￥", "").replace("¥", "")
+
+    if "万" in text:
+        try:
+            return float(text.replace("万", "")) * 10000.0
+        except ValueError:
+            return None
+
+    match = _NUMBER_RE.search(text)
+    if not match:
+        return None
+    try:
+        return float(match.group(0))
+    except ValueError:
+        return None
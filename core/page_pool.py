@@ -0,0 +1,150 @@
+"""Bounded pool of reusable browser pages.
+
+Auth checks and storage-state exports each check out their own page, so
+concurrent commands run in parallel instead of racing on one shared page.
+Pages are health-checked on checkout and recycled after a number of uses,
+after an error, or once they crash or close. The pool only relies on
+``is_closed()`` and ``close()``, so it does not import Playwright.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Generic, Protocol, TypeVar
+
+log = logging.getLogger(__name__)
+
+
+class PoolablePage(Protocol):
+    def is_closed(self) -> bool: ...
+
+    def close(self) -> Awaitable[None]: ...
+
+
+P = TypeVar("P", bound=PoolablePage)
+
+
+@dataclass
+class _Slot(Generic[P]):
+    page: P
+    generation: int
+    uses: int = 0
+
+
+class PagePool(Generic[P]):
+    """Checkout/checkin pool holding at most ``size`` pages.
+
+    Args:
+        factory: Coroutine creating a new page.
+        size: Maximum number of pages, idle or checked out.
+        max_uses: Checkouts after which a page is closed and replaced.
+        health_check: Optional coroutine returning False for a page that
+            should be replaced; pages that are closed always are.
+        health_check_timeout: Seconds before a hanging health check counts as failed.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Awaitable[P]],
+        size: int = 2,
+        max_uses: int = 50,
+        health_check: Callable[[P], Awaitable[bool]] | None = None,
+        health_check_timeout: float = 5.0,
+    ) -> None:
+        self._factory = factory
+        self.size = max(1, size)
+        self._max_uses = max(1, max_uses)
+        self._health_check = health_check
+        self._health_check_timeout = health_check_timeout
+        self._idle: list[_Slot[P]] = []
+        self._checked_out: dict[int, _Slot[P]] = {}
+        self._capacity = asyncio.Semaphore(self.size)
+        self._generation = 0
+
+    @property
+    def idle(self) -> int:
+        """Number of healthy pages waiting to be checked out."""
+        return len(self._idle)
+
+    @property
+    def in_use(self) -> int:
+        """Number of pages currently checked out."""
+        return len(self._checked_out)
+
+    async def checkout(self) -> P:
+        """Return a healthy page, waiting while ``size`` pages are checked out."""
+        await self._capacity.acquire()
+        try:
+            while self._idle:
+                slot = self._idle.pop()
+                if await self._is_healthy(slot):
+                    break
+                await self._discard(slot, "failed health check")
+            else:
+                slot = _Slot(await self._factory(), self._generation)
+        except BaseException:
+            self._capacity.release()
+            raise
+        slot.uses += 1
+        self._checked_out[id(slot.page)] = slot
+        return slot.page
+
+    async def checkin(self, page: P, *, broken: bool = False) -> None:
+        """Return a page to the pool, or close it if broken, worn out, closed or stale."""
+        slot = self._checked_out.pop(id(page), None)
+        if slot is None:
+            raise ValueError("page was not checked out from this pool")
+        try:
+            if broken:
+                await self._discard(slot, "error while in use")
+            elif slot.uses >= self._max_uses:
+                await self._discard(slot, f"reached {self._max_uses} uses")
+            elif page.is_closed() or slot.generation != self._generation:
+                await self._discard(slot, "closed or from a previous browser context")
+            else:
+                self._idle.append(slot)
+        finally:
+            self._capacity.release()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[P]:
+        """Check out a page for the block; it is recycled if the block raises."""
+        page = await self.checkout()
+        broken = True
+        try:
+            yield page
+            broken = False
+        finally:
+            await self.checkin(page, broken=broken)
+
+    async def reset(self) -> None:
+        """Close idle pages and retire checked-out ones when they come back.
+
+        Call this when the browser context the pages belong to goes away."""
+        self._generation += 1
+        idle, self._idle = self._idle, []
+        for slot in idle:
+            await self._discard(slot, "pool reset")
+
+    async def _is_healthy(self, slot: _Slot[P]) -> bool:
+        if slot.generation != self._generation or slot.page.is_closed():
+            return False
+        if self._health_check is None:
+            return True
+        try:
+            return await asyncio.wait_for(
+                self._health_check(slot.page), timeout=self._health_check_timeout
+            )
+        except Exception:
+            return False
+
+    async def _discard(self, slot: _Slot[P], reason: str) -> None:
+        log.debug("Recycling pooled page after %d uses: %s", slot.uses, reason)
+        if slot.page.is_closed():
+            return
+        try:
+            await slot.page.close()
+        except Exception as e:
+            log.debug("Failed to close pooled page: %s", e)
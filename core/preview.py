@@ -0,0 +1,225 @@
+"""Listing page previews: streaming og/twitter meta extraction and caching.
+
+Listing pages are read in chunks and parsed incrementally; reading stops
+as soon as ``</head>`` arrives or every wanted meta key has been found.
+
+ai-goofish-monitor frequently re-notifies the same item (price drops,
+overlapping tasks), so fetched page previews are cached in memory with a
+TTL, optionally backed by SQLite, and concurrent lookups for the same
+item share a single in-flight fetch.
+"""
+
+import asyncio
+import codecs
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from html.parser import HTMLParser
+
+from core import jsoncodec
+from core.executors import PREVIEW, run_blocking
+from core.http_client import HttpClient
+from core.kvstore import SqliteKVStore
+
+log = logging.getLogger(__name__)
+
+Preview = dict[str, str]
+
+# Preview field -> meta property/name keys; the first matching tag in document order wins.
+PREVIEW_META_KEYS: dict[str, tuple[str, ...]] = {
+    "title": ("og:title", "twitter:title"),
+    "description": ("og:description", "description", "twitter:description"),
+    "image": ("og:image", "twitter:image"),
+}
+
+_PREVIEW_CHUNK_SIZE = 16 * 1024
+_PREVIEW_MAX_BYTES = 2 * 1024 * 1024
+
+
+class HeadMetaParser(HTMLParser):
+    """Incremental parser that collects preview fields from ``<meta>`` tags.
+
+    Feed it decoded chunks and stop once ``done`` is set, which happens at
+    ``</head>``, at ``<body>``, or when every field has a value."""
+
+    def __init__(self, field_keys: dict[str, tuple[str, ...]] = PREVIEW_META_KEYS) -> None:
+        super().__init__(convert_charrefs=True)
+        self._key_to_field = {
+            key: field_name for field_name, keys in field_keys.items() for key in keys
+        }
+        self._field_count = len(field_keys)
+        self.values: dict[str, str] = {}
+        self.done = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.done:
+            return
+        if tag == "body":
+            self.done = True
+            return
+        if tag != "meta":
+            return
+
+        attr_map = {name: (value or "") for name, value in attrs}
+        key = (attr_map.get("property") or attr_map.get("name") or "").strip().lower()
+        field_name = self._key_to_field.get(key)
+        if field_name is None or field_name in self.values:
+            return
+
+        content = attr_map.get("content", "").strip()
+        if content:
+            self.values[field_name] = content
+            if len(self.values) == self._field_count:
+                self.done = True
+
+    handle_startendtag = handle_starttag
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head":
+            self.done = True
+
+
+def extract_preview_meta(document: str) -> Preview:
+    """Extract the preview fields from an already downloaded HTML document."""
+    parser = HeadMetaParser()
+    parser.feed(document)
+    return {field_name: parser.values.get(field_name, "") for field_name in PREVIEW_META_KEYS}
+
+
+async def fetch_listing_preview(url: str, http: HttpClient) -> Preview:
+    """Stream a Goofish listing page and extract og:title, og:description, og:image.
+
+    Only the document head is read; the connection is dropped as soon as
+    the parser is done or ``_PREVIEW_MAX_BYTES`` have been received."""
+    parser = HeadMetaParser()
+    async with http.stream(
+        url,
+        headers={"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"},
+        timeout=8,
+    ) as response:
+        try:
+            decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="ignore")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+
+        received = 0
+        async for chunk in response.content.iter_chunked(_PREVIEW_CHUNK_SIZE):
+            received += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if parser.done or received >= _PREVIEW_MAX_BYTES:
+                break
+
+    return {field_name: parser.values.get(field_name, "") for field_name in PREVIEW_META_KEYS}
+
+
+class PreviewCache:
+    """TTL + LRU cache of listing previews with single-flight fetching.
+
+    Args:
+        store: Optional on-disk tier shared across restarts.
+        ttl: Seconds a fetched preview stays valid.
+        max_entries: Maximum number of previews kept in memory.
+    """
+
+    def __init__(
+        self,
+        store: SqliteKVStore | None = None,
+        ttl: float = 6 * 60 * 60,
+        max_entries: int = 1000,
+    ) -> None:
+        self._store = store
+        self._ttl = max(0.0, ttl)
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, tuple[float, Preview]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[Preview]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Preview]]) -> Preview:
+        """Return the cached preview for key, fetching it at most once concurrently.
+
+        Empty previews (failed fetches) are returned but not cached. An
+        empty key bypasses the cache entirely."""
+        if not key:
+            return await fetch()
+
+        cached = self._get_memory(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so a caller hitting its deadline does not abort the shared fetch.
+        return await asyncio.shield(task)
+
+    def _get_memory(self, key: str) -> Preview | None:
+        """Return an unexpired in-memory preview and mark it recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, preview = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return preview
+
+    def _put_memory(self, key: str, preview: Preview, expires_at: float) -> None:
+        """Insert a preview, evicting the least recently used entry over capacity."""
+        self._entries[key] = (expires_at, preview)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load(self, key: str, fetch: Callable[[], Awaitable[Preview]]) -> Preview:
+        """Resolve a preview from the disk tier or the network and cache it."""
+        if self._store is not None:
+            try:
+                raw = await run_blocking(PREVIEW, self._store.get, key)
+            except Exception as e:
+                log.warning("Failed to read preview cache for %s: %s", key, e)
+                raw = None
+            if raw:
+                try:
+                    payload = jsoncodec.loads(raw)
+                    preview = dict(payload["preview"])
+                    self._put_memory(key, preview, float(payload["expires_at"]))
+                    return preview
+                except (ValueError, KeyError, TypeError):
+                    pass
+
+        preview = await fetch()
+        if not preview or not any(preview.values()):
+            return preview
+
+        expires_at = time.time() + self._ttl
+        self._put_memory(key, preview, expires_at)
+        if self._store is not None:
+            encoded = jsoncodec.dumps_text({"preview": preview, "expires_at": expires_at})
+            try:
+                await run_blocking(PREVIEW, self._store.put, key, encoded, expires_at)
+            except Exception as e:
+                log.warning("Failed to persist preview for %s: %s", key, e)
+        return preview
+
+    async def close(self) -> None:
+        """Cancel in-flight fetches, trim the disk tier and close it."""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._store is not None:
+            await run_blocking(PREVIEW, self._close_store, self._store)
+
+    def _close_store(self, store: SqliteKVStore) -> None:
+        """Drop expired and excess rows, then close the database."""
+        try:
+            store.prune(self._max_entries)
+        finally:
+            store.close()
@@ -0,0 +1,148 @@
+"""Routing rules that map webhook fields to Discord recipients.
+
+A rule matches on task name, keyword, price range and/or item ID; every
+criterion a rule specifies must match, and any value within a criterion
+may. Recipients of all matching rules are notified; if no rule matches,
+the default recipients are used.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, field_validator
+
+log = logging.getLogger(__name__)
+
+RecipientKind = Literal["user", "channel"]
+
+
+@dataclass(frozen=True)
+class Recipient:
+    """A Discord user (DM) or channel that receives alerts."""
+
+    kind: RecipientKind
+    id: int
+
+    @property
+    def key(self) -> str:
+        """Stable string form, e.g. ``user:123``; also used as the pacing route."""
+        return f"{self.kind}:{self.id}"
+
+    @classmethod
+    def parse(cls, value: str | int) -> "Recipient":
+        """Parse ``user:<id>``, ``channel:<id>`` or a bare user ID.
+
+        Raises:
+            ValueError: If the value is not a valid recipient.
+        """
+        text = str(value).strip()
+        kind, _, raw_id = text.rpartition(":")
+        kind = kind.strip().lower() or "user"
+        if kind not in ("user", "channel"):
+            raise ValueError(f"Unknown recipient kind: {text!r}")
+        recipient_id = int(raw_id)
+        if recipient_id <= 0:
+            raise ValueError(f"Invalid recipient ID: {text!r}")
+        return cls(kind=kind, id=recipient_id)  # type: ignore[arg-type]
+
+
+@dataclass(frozen=True)
+class RoutingContext:
+    """Webhook fields that routing rules can match on."""
+
+    task_name: str = ""
+    keyword: str = ""
+    item_id: str = ""
+    price_cny: float | None = None
+
+
+class RoutingRule(BaseModel):
+    """One routing rule; empty criteria match everything."""
+
+    recipients: list[str]
+    task_names: list[str] = Field(default_factory=list)
+    keywords: list[str] = Field(default_factory=list)
+    item_ids: list[str] = Field(default_factory=list)
+    min_price: float | None = None
+    max_price: float | None = None
+
+    @field_validator("recipients")
+    @classmethod
+    def _validate_recipients(cls, value: list[str]) -> list[str]:
+        for recipient in value:
+            Recipient.parse(recipient)
+        return value
+
+    def matches(self, context: RoutingContext) -> bool:
+        """Return True if every criterion set on this rule matches the context."""
+        if self.task_names:
+            task_name = context.task_name.strip().lower()
+            if task_name not in {name.strip().lower() for name in self.task_names}:
+                return False
+        if self.keywords:
+            keyword = context.keyword.lower()
+            if not keyword or not any(k.lower() in keyword for k in self.keywords):
+                return False
+        if self.item_ids and context.item_id not in self.item_ids:
+            return False
+        if self.min_price is not None or self.max_price is not None:
+            if context.price_cny is None:
+                return False
+            if self.min_price is not None and context.price_cny < self.min_price:
+                return False
+            if self.max_price is not None and context.price_cny > self.max_price:
+                return False
+        return True
+
+
+def parse_rules(raw_rules: list[Any]) -> list[RoutingRule]:
+    """Validate raw rule dicts, logging and skipping invalid ones."""
+    rules: list[RoutingRule] = []
+    for raw in raw_rules:
+        try:
+            rules.append(RoutingRule.model_validate(raw))
+        except ValueError as e:
+            log.error("Ignoring invalid routing rule %r: %s", raw, e)
+    return rules
+
+
+class Router:
+    """Resolve the recipients for a webhook from a list of rules.
+
+    Args:
+        rules: Rules evaluated in order.
+        default_recipients: Used when no rule matches.
+    """
+
+    def __init__(self, rules: list[RoutingRule], default_recipients: list[Recipient]) -> None:
+        self._rules = [
+            (rule, [Recipient.parse(r) for r in rule.recipients]) for rule in rules
+        ]
+        self._default = list(default_recipients)
+
+    @classmethod
+    def from_config(cls, raw_rules: list[dict[str, Any]], default_user_id: int) -> "Router":
+        """Build a router from raw rule dicts, skipping invalid rules."""
+        default = [Recipient("user", default_user_id)] if default_user_id else []
+        return cls(parse_rules(raw_rules), default)
+
+    @property
+    def all_recipients(self) -> list[Recipient]:
+        """Every recipient any rule or the default could route to."""
+        seen: dict[str, Recipient] = {r.key: r for r in self._default}
+        for _, recipients in self._rules:
+            for recipient in recipients:
+                seen.setdefault(recipient.key, recipient)
+        return list(seen.values())
+
+    def route(self, context: RoutingContext) -> list[Recipient]:
+        """Return the de-duplicated recipients for a webhook."""
+        matched: dict[str, Recipient] = {}
+        for rule, recipients in self._rules:
+            if rule.matches(context):
+                for recipient in recipients:
+                    matched.setdefault(recipient.key, recipient)
+        if not matched:
+            return list(self._default)
+        return list(matched.values())
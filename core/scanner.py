@@ -1,5 +1,4 @@
 import asyncio
-import json
 import logging
 import os
 import shutil
@@ -7,9 +6,12 @@ import time
 from pathlib import Path
 from typing import Any, cast
 
-from playwright.async_api import Browser, BrowserContext, async_playwright
+from playwright.async_api import Browser, BrowserContext, Page, async_playwright
 
 from config import settings
+from core import jsoncodec
+from core.executors import FILES, run_blocking
+from core.page_pool import PagePool
 
 log = logging.getLogger(__name__)
 
@@ -73,18 +75,31 @@ def _detect_chrome_channel() -> str | None:
     return None
 
 
+async def _page_responds(page: Page) -> bool:
+    """Health check for pooled pages: a crashed or hung renderer fails to evaluate."""
+    return bool(await page.evaluate("() => true"))
+
+
 class GoofishClient:
     """Playwright-based client for Goofish/Xianyu web interactions.
 
     Manages a persistent browser context for cookie-based auth,
     QR-code login flow, session export, and auth verification.
+    Auth checks and exports each check out a page from a pool on that
+    context, so concurrent commands do not share a page.
     """
     def __init__(self) -> None:
-        """Initialise client paths and async locks."""
+        """Initialise client paths, async locks and the page pool."""
         self.cookies_path = str(settings.goofish_cookies_json_path)
         self._playwright = None
         self._context: BrowserContext | None = None
         self._lock = asyncio.Lock()
+        self._pages: PagePool[Page] = PagePool(
+            self._new_page,
+            size=settings.browser_page_pool_size,
+            max_uses=settings.browser_page_max_uses,
+            health_check=_page_responds,
+        )
 
         # QR login resources (kept separate from main persistent context)
         self._qr_playwright = None
@@ -144,7 +159,7 @@ class GoofishClient:
                     user_agent=user_agent,
                 )
 
-            cookies = self._load_cookies()
+            cookies = await run_blocking(FILES, self._load_cookies)
             if cookies:
                 await self._context.add_cookies(cookies)  # type: ignore[arg-type]
                 log.info(f"Loaded {len(cookies)} auth cookies")
@@ -153,8 +168,14 @@ class GoofishClient:
             page = await self._context.new_page()
             await page.goto(BASE_URL, wait_until="domcontentloaded", timeout=30000)
             await asyncio.sleep(2)
+            await page.close()
             return self._context
 
+    async def _new_page(self) -> Page:
+        """Open a page on the persistent context for the page pool."""
+        context = await self._ensure_browser()
+        return await context.new_page()
+
     def _load_cookies(self) -> list[dict[str, Any]]:
         """Load cookies from the configured JSON file.
 
@@ -169,7 +190,7 @@ class GoofishClient:
             return []
 
         try:
-            data = json.loads(cookies_path.read_text(encoding="utf-8"))
+            data = jsoncodec.loads(cookies_path.read_bytes())
 
             # Support Cookie-Editor export format: {"url": "...", "cookies": [...]}
             if isinstance(data, dict) and isinstance(data.get("cookies"), list):
@@ -247,6 +268,7 @@ class GoofishClient:
 
     async def close(self) -> None:
         """Shut down all browser resources (main context + QR login session)."""
+        await self._pages.reset()
         if self._context:
             await self._context.close()
             self._context = None
@@ -263,16 +285,15 @@ class GoofishClient:
 
         # Ensure at least one navigation so storage state is populated.
         try:
-            page = context.pages[0] if context.pages else await context.new_page()
-            await page.goto(BASE_URL, wait_until="domcontentloaded", timeout=30000)
-            await asyncio.sleep(2)
+            async with self._pages.page() as page:
+                await page.goto(BASE_URL, wait_until="domcontentloaded", timeout=30000)
+                await asyncio.sleep(2)
         except Exception:
             pass
 
         state = cast(dict[str, Any], await context.storage_state())
-        Path(output_path).write_text(
-            json.dumps(state, indent=2, ensure_ascii=False), encoding="utf-8"
-        )
+        # Compact output: ai-goofish-monitor only parses it, and large states shrink a lot.
+        await run_blocking(FILES, Path(output_path).write_bytes, jsoncodec.dumps(state))
         return state
 
     async def check_auth(self) -> bool:
@@ -285,43 +306,46 @@ class GoofishClient:
             True if the session appears valid, False otherwise.
         """
         try:
-            context = await self._ensure_browser()
-            page = context.pages[0] if context.pages else await context.new_page()
-            await page.goto(BASE_URL, wait_until="domcontentloaded", timeout=20000)
-            await asyncio.sleep(3)
-
-            login_markers = [
-                "短信登录",
-                "密码登录",
-                "手机扫码安全登录",
-                "闲鱼APP扫码",
-                "立即登录",
-            ]
+            async with self._pages.page() as page:
+                return await self._page_is_authenticated(page)
+        except Exception as e:
+            log.error(f"Auth check failed: {e}")
+            return False
 
-            for frame in page.frames:
-                try:
-                    if "passport.goofish.com" in (frame.url or ""):
-                        return False
-                except Exception:
-                    pass
+    async def _page_is_authenticated(self, page: Page) -> bool:
+        """Load the homepage in page and look for login, CAPTCHA or block markers."""
+        await page.goto(BASE_URL, wait_until="domcontentloaded", timeout=20000)
+        await asyncio.sleep(3)
 
-                try:
-                    text = await frame.inner_text("body")
-                except Exception:
-                    continue
+        login_markers = [
+            "短信登录",
+            "密码登录",
+            "手机扫码安全登录",
+            "闲鱼APP扫码",
+            "立即登录",
+        ]
 
-                lowered = text.lower()
-                if "punish" in lowered or "captcha" in lowered:
-                    return False
-                if "非法访问" in text:
-                    return False
-                if any(m in text for m in login_markers):
+        for frame in page.frames:
+            try:
+                if "passport.goofish.com" in (frame.url or ""):
                     return False
+            except Exception:
+                pass
 
-            return True
-        except Exception as e:
-            log.error(f"Auth check failed: {e}")
-            return False
+            try:
+                text = await frame.inner_text("body")
+            except Exception:
+                continue
+
+            lowered = text.lower()
+            if "punish" in lowered or "captcha" in lowered:
+                return False
+            if "非法访问" in text:
+                return False
+            if any(m in text for m in login_markers):
+                return False
+
+        return True
 
     async def qr_login_start(self, keyword: str = "iphone") -> dict:
         """Start QR login and return QR screenshot bytes (PNG)."""
@@ -543,15 +567,15 @@ class GoofishClient:
                         }
 
                     try:
-                        Path(self.cookies_path).write_text(
-                            json.dumps(cookies_now, indent=2, ensure_ascii=False),
-                            encoding="utf-8",
+                        await run_blocking(
+                            FILES, Path(self.cookies_path).write_bytes, jsoncodec.dumps(cookies_now)
                         )
                         log.info(f"Saved {len(cookies_now)} cookies to {self.cookies_path}")
                     except Exception as e:
                         log.warning(f"Failed to save cookies after QR login: {e}")
 
                     # Reset main context so next usage reloads cookies.
+                    await self._pages.reset()
                     if self._context:
                         try:
                             await self._context.close()
@@ -0,0 +1,372 @@
+"""Chinese to English translation via the Google Translate ``gtx`` endpoint.
+
+Strings requested within a short window are coalesced into as few
+upstream requests as possible: they are joined with a delimiter that
+survives translation, sent as one query, and split back per caller.
+Results are kept in a bounded LRU cache that is persisted to SQLite.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from urllib.parse import quote
+
+from core.circuit_breaker import CircuitOpenError
+from core.executors import TRANSLATION, run_blocking
+from core.http_client import HttpClient
+from core.kvstore import SqliteKVStore
+from core.normalize import contains_cjk
+
+log = logging.getLogger(__name__)
+
+_TRANSLATE_URL = "https://translate.googleapis.com/translate_a/single"
+
+_BATCH_DELIMITER = "\n@@@\n"
+_BATCH_SPLIT_RE = re.compile(r"\s*@\s*@\s*@\s*")
+
+
+def _parse_translation_payload(payload: object) -> str:
+    """Join the translated segments of a ``translate_a/single`` response."""
+    if not isinstance(payload, list) or not payload:
+        return ""
+
+    segments = payload[0]
+    if not isinstance(segments, list):
+        return ""
+
+    translated_parts: list[str] = []
+    for segment in segments:
+        if isinstance(segment, list) and segment:
+            first = segment[0]
+            if isinstance(first, str):
+                translated_parts.append(first)
+
+    return "".join(translated_parts).strip()
+
+
+async def fetch_translation(http: HttpClient, text: str) -> str:
+    """Translate one string to English. Returns an empty string if nothing came back."""
+    payload = await http.get_json(
+        _TRANSLATE_URL,
+        params={"client": "gtx", "sl": "auto", "tl": "en", "dt": "t", "q": text},
+        headers={"Accept": "application/json,text/plain,*/*"},
+        timeout=6,
+    )
+    return _parse_translation_payload(payload)
+
+
+def _plan_batches(sources: list[str], max_query_chars: int) -> list[list[str]]:
+    """Group sources into batches whose URL-encoded joined query fits the limit.
+
+    Sources that are too long on their own, or that already contain the
+    delimiter marker, are sent in a batch of one."""
+    batches: list[list[str]] = []
+    current: list[str] = []
+    current_len = 0
+    delimiter_len = len(quote(_BATCH_DELIMITER, safe=""))
+
+    for source in sources:
+        encoded_len = len(quote(source, safe=""))
+        if encoded_len >= max_query_chars or "@@@" in source:
+            batches.append([source])
+            continue
+
+        added = encoded_len if not current else encoded_len + delimiter_len
+        if current and current_len + added > max_query_chars:
+            batches.append(current)
+            current, current_len = [], 0
+            added = encoded_len
+        current.append(source)
+        current_len += added
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+class TranslationBatcher:
+    """Coalesce concurrent translation requests into batched upstream calls.
+
+    Args:
+        http: Shared HTTP client used for upstream requests.
+        window_seconds: How long to collect strings before sending a batch.
+        max_query_chars: Upper bound for the URL-encoded query of one request.
+    """
+
+    def __init__(
+        self,
+        http: HttpClient,
+        window_seconds: float = 0.03,
+        max_query_chars: int = 4000,
+    ) -> None:
+        self._http = http
+        self._window_seconds = max(0.0, window_seconds)
+        self._max_query_chars = max(200, max_query_chars)
+        self._pending: list[str] = []
+        self._inflight: dict[str, asyncio.Future[str | None]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def translate(self, text: str) -> str | None:
+        """Translate text to English.
+
+        Text without CJK characters is returned unchanged without a request.
+
+        Returns:
+            The translation, or None if the upstream request failed."""
+        source = (text or "").strip()
+        if not source or not contains_cjk(source):
+            return source
+
+        future = self._inflight.get(source)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._inflight[source] = future
+            self._pending.append(source)
+            if self._flush_handle is None:
+                self._flush_handle = loop.call_later(self._window_seconds, self._flush)
+
+        # Shield so a cancelled caller does not cancel the result shared with others.
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        """Send everything collected during the current window."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        for batch in _plan_batches(pending, self._max_query_chars):
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list[str]) -> None:
+        """Translate one batch and resolve the waiting callers."""
+        results: list[str | None]
+        try:
+            results = await self._translate_batch(batch)
+        except CircuitOpenError:
+            # Upstream known bad; already logged once when the circuit opened.
+            results = [None] * len(batch)
+        except Exception as e:
+            log.warning("Translation batch of %d strings failed: %s", len(batch), e)
+            results = [None] * len(batch)
+
+        for source, result in zip(batch, results, strict=True):
+            future = self._inflight.pop(source, None)
+            if future is not None and not future.done():
+                future.set_result(result)
+
+    async def _translate_batch(self, batch: list[str]) -> list[str | None]:
+        """Translate a batch with one request, falling back to one request per string
+        if the delimiter did not survive translation.
+
+        Empty translations come back as None, so they are retried like failures
+        instead of being cached as the untranslated source."""
+        if len(batch) == 1:
+            return [await fetch_translation(self._http, batch[0]) or None]
+
+        joined = await fetch_translation(self._http, _BATCH_DELIMITER.join(batch))
+        parts = _BATCH_SPLIT_RE.split(joined.strip()) if joined else []
+        if len(parts) == len(batch):
+            return [part.strip() or None for part in parts]
+
+        log.debug("Translation batch split mismatch (%d != %d)", len(parts), len(batch))
+        results = await asyncio.gather(
+            *(fetch_translation(self._http, source) for source in batch),
+            return_exceptions=True,
+        )
+        return [
+            None if isinstance(result, BaseException) else (result or None) for result in results
+        ]
+
+    async def close(self) -> None:
+        """Cancel the pending flush and any batches still in flight."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for future in self._inflight.values():
+            if not future.done():
+                future.set_result(None)
+        self._inflight.clear()
+        self._pending.clear()
+
+
+def _entry_size(source: str, translation: str) -> int:
+    """Approximate memory cost of a cache entry in bytes."""
+    return len(source.encode("utf-8")) + len(translation.encode("utf-8"))
+
+
+class TranslationCache:
+    """LRU cache of translations bounded by entry count and total size.
+
+    Successful translations are written through to an optional SQLite
+    store and loaded back lazily on first use, so they survive restarts.
+    Failures are remembered only for ``negative_ttl`` seconds and then
+    retried.
+
+    Args:
+        store: Optional on-disk tier.
+        max_entries: Maximum number of cached translations.
+        max_bytes: Maximum total UTF-8 size of cached sources and translations.
+        negative_ttl: Seconds to serve the untranslated source after a failure.
+    """
+
+    def __init__(
+        self,
+        store: SqliteKVStore | None = None,
+        max_entries: int = 5000,
+        max_bytes: int = 4 * 1024 * 1024,
+        negative_ttl: float = 300.0,
+    ) -> None:
+        self._store = store
+        self._max_entries = max(1, max_entries)
+        self._max_bytes = max(1, max_bytes)
+        self._negative_ttl = max(0.0, negative_ttl)
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._negative: OrderedDict[str, float] = OrderedDict()
+        self._bytes = 0
+        self._loaded = store is None
+        self._load_lock = asyncio.Lock()
+        self._writes: set[asyncio.Task[None]] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total UTF-8 size of cached sources and translations."""
+        return self._bytes
+
+    async def ensure_loaded(self) -> None:
+        """Load the most recently used translations from disk once."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded or self._store is None:
+                return
+            try:
+                rows = await run_blocking(TRANSLATION, self._load_from_store, self._store)
+            except Exception as e:
+                log.warning("Failed to load translation cache: %s", e)
+                rows = []
+            # Rows come newest first; insert oldest first so the newest end up most recent.
+            for source, translation, _ in reversed(rows):
+                self._insert(source, translation)
+            self._loaded = True
+            if rows:
+                log.info("Loaded %d cached translations", len(rows))
+
+    def _load_from_store(self, store: SqliteKVStore) -> list[tuple[str, str, float | None]]:
+        """Read recent rows and trim the on-disk table to the entry limit."""
+        rows = store.load_recent(self._max_entries)
+        store.prune(self._max_entries)
+        return rows
+
+    def get(self, source: str) -> str | None:
+        """Return the cached translation, the source during a negative TTL, or None."""
+        translation = self._entries.get(source)
+        if translation is not None:
+            self._entries.move_to_end(source)
+            return translation
+
+        retry_at = self._negative.get(source)
+        if retry_at is not None:
+            if retry_at > time.monotonic():
+                return source
+            del self._negative[source]
+        return None
+
+    def put(self, source: str, translation: str) -> None:
+        """Cache a successful translation in memory and on disk."""
+        self._negative.pop(source, None)
+        self._insert(source, translation)
+        if self._store is not None:
+            self._spawn_write(self._store.put, source, translation)
+
+    def put_failure(self, source: str) -> None:
+        """Remember a failed translation for the negative TTL."""
+        if self._negative_ttl <= 0:
+            return
+        self._negative[source] = time.monotonic() + self._negative_ttl
+        self._negative.move_to_end(source)
+        while len(self._negative) > self._max_entries:
+            self._negative.popitem(last=False)
+
+    def _insert(self, source: str, translation: str) -> None:
+        """Insert or refresh an entry, evicting least recently used ones over budget."""
+        previous = self._entries.pop(source, None)
+        if previous is not None:
+            self._bytes -= _entry_size(source, previous)
+
+        size = _entry_size(source, translation)
+        if size > self._max_bytes:
+            return
+        self._entries[source] = translation
+        self._bytes += size
+
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            evicted_source, evicted = self._entries.popitem(last=False)
+            self._bytes -= _entry_size(evicted_source, evicted)
+
+    def _spawn_write(self, func: Callable[..., None], *args: object) -> None:
+        """Run a blocking store write off-loop without making the caller wait."""
+        task = asyncio.create_task(run_blocking(TRANSLATION, func, *args))
+        self._writes.add(task)
+        task.add_done_callback(self._on_write_done)
+
+    def _on_write_done(self, task: asyncio.Task[None]) -> None:
+        self._writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("Failed to persist translation: %s", task.exception())
+
+    async def close(self) -> None:
+        """Wait for pending disk writes and close the store."""
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+        if self._store is not None:
+            await run_blocking(TRANSLATION, self._store.close)
+
+
+class Translator:
+    """Cached, batched Chinese to English translator.
+
+    Never raises: if translation fails the source text is returned and
+    retried once the cache's negative TTL expires."""
+
+    def __init__(self, batcher: TranslationBatcher, cache: TranslationCache) -> None:
+        self.batcher = batcher
+        self.cache = cache
+
+    async def translate(self, text: str) -> str:
+        """Translate text to English, returning the source on failure."""
+        source = (text or "").strip()
+        if not source or not contains_cjk(source):
+            return source
+
+        await self.cache.ensure_loaded()
+        cached = self.cache.get(source)
+        if cached is not None:
+            return cached
+
+        try:
+            translated = await self.batcher.translate(source)
+        except Exception:
+            translated = None
+
+        if translated is None:
+            self.cache.put_failure(source)
+            return source
+
+        self.cache.put(source, translated)
+        return translated
+
+    async def close(self) -> None:
+        """Stop pending batches and flush the cache to disk."""
+        await self.batcher.close()
+        await self.cache.close()
@@ -1,21 +1,45 @@
 import asyncio
-import html
-import json
+import hashlib
+import hmac
 import logging
 import re
-import time
-import urllib.error
-import urllib.parse
-import urllib.request
-import xml.etree.ElementTree as ET
-from dataclasses import dataclass, replace
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field, replace
 from typing import Any
-from urllib.parse import quote
+from urllib.parse import parse_qsl
 
+import aiohttp
 import discord
 from aiohttp import web
 
 from config import settings
+from core import jsoncodec
+from core.carousel import (
+    CarouselButton,
+    CarouselState,
+    CarouselStore,
+    build_carousel_view,
+    carousel_key,
+)
+from core.circuit_breaker import BreakerRegistry
+from core.dedupe import DedupeIndex
+from core.delivery_queue import DeliveryJob, DeliveryJournal, DeliveryQueue, QueueFullError
+from core.digest import DigestBuffer, pack_by_size
+from core.dm_dispatcher import DMDispatcher, RecipientCache
+from core.endpoints import EndpointConfig, default_endpoint, load_endpoints
+from core.executors import executor_stats
+from core.fx import DisplayCurrencies, FxRefresher, RateTable
+from core.http_client import HttpClient
+from core.kvstore import SqliteKVStore
+from core.normalize import (
+    GoofishLink,
+    fit_discord_button_url,
+    parse_cny_amount,
+    parse_goofish_link,
+)
+from core.preview import PreviewCache, fetch_listing_preview
+from core.routing import Recipient, Router, RoutingContext
+from core.translation import TranslationBatcher, TranslationCache, Translator
 
 log = logging.getLogger(__name__)
 
@@ -26,14 +50,17 @@ _AUTH_EXPIRED_MESSAGE_PATTERNS = (
 
 _URL_RE = re.compile(r"https?://[^\s)]+")
 
-_FX_CACHE: dict[str, float] = {"value": 0.0, "updated_at": 0.0}
-_FX_CACHE_TTL_SECONDS = 6 * 60 * 60
-_FX_LOCK = asyncio.Lock()
 
-_TRANSLATION_CACHE: dict[str, str] = {}
-_TRANSLATION_CACHE_MAX = 200
+_DISCORD_MAX_EMBED_URL_LEN = 2048
+
+_IDEMPOTENCY_HEADERS = ("Idempotency-Key", "X-Idempotency-Key")
+_SECRET_HEADER = "X-Webhook-Secret"
+_SIGNATURE_HEADER = "X-Webhook-Signature"
 
-_DISCORD_MAX_BUTTON_URL_LEN = 512
+
+def _goofish_link(url: str) -> GoofishLink:
+    """Return the cached parse of a Goofish link using the configured Superbuy template."""
+    return parse_goofish_link(url or "", settings.superbuy_link_template)
 
 
 def _extract_goofish_item_id(url: str) -> str:
@@ -44,42 +71,30 @@ def _extract_goofish_item_id(url: str) -> str:
 
     Returns:
         The numeric item ID string, or empty string if not found."""
-    match = re.search(r"[?&]id=(\d+)", url or "")
-    return match.group(1) if match else ""
-
+    return _goofish_link(url).item_id
 
-def _canonical_goofish_pc_url(url: str) -> str:
-    """Build a canonical desktop Goofish item URL from any Goofish link."""
-    item_id = _extract_goofish_item_id(url)
-    if not item_id:
-        return (url or "").strip()
-    return f"https://www.goofish.com/item?id={item_id}"
 
+def _normalize_image_url(url: Any) -> str:
+    """Return an image URL usable in a Discord embed, or empty string if it is not.
 
-def _fit_discord_button_url(url: str) -> str:
-    """Shorten a URL to fit the Discord button URL length limit (512 chars).
-
-    Tries the original, canonical PC URL, and short URL in order."""
-    candidate = (url or "").strip()
-    if not candidate:
+    Protocol-relative CDN links get ``https:``; other schemes, embedded
+    whitespace and URLs over Discord's 2048-character limit are rejected."""
+    candidate = str(url or "").strip()
+    if candidate.startswith("//"):
+        candidate = f"https:{candidate}"
+    if not candidate.lower().startswith(("https://", "http://")):
         return ""
-    if len(candidate) <= _DISCORD_MAX_BUTTON_URL_LEN:
-        return candidate
-
-    canonical = _canonical_goofish_pc_url(candidate)
-    if len(canonical) <= _DISCORD_MAX_BUTTON_URL_LEN:
-        return canonical
-
-    short_candidate = _convert_goofish_short_url(candidate)
-    if len(short_candidate) <= _DISCORD_MAX_BUTTON_URL_LEN:
-        return short_candidate
-
-    return ""
+    if len(candidate) > _DISCORD_MAX_EMBED_URL_LEN or any(ch.isspace() for ch in candidate):
+        return ""
+    return candidate
 
 
 @dataclass
 class ListingNotification:
-    """Parsed listing notification data for Discord delivery."""
+    """Parsed listing notification data for Discord delivery.
+
+    ``image_urls`` is normalised and de-duplicated at parse time, with
+    ``image_url`` (the main image) first when there is one."""
     listing_title: str
     reason: str
     description: str
@@ -90,13 +105,89 @@ class ListingNotification:
     superbuy_url: str
     image_url: str
     image_urls: list[str]
+    task_name: str = ""
+    keyword: str = ""
 
 
 @dataclass
 class DiscordNotificationPayload:
-    """Container for Discord embeds and interactive view components."""
+    """Container for Discord embeds and interactive view components.
+
+    ``digest_embed`` and ``links`` are the compact rendering used when
+    several alerts are packed into one digest message. ``routing`` holds
+    the webhook fields recipients are selected by, and ``carousel`` the
+    key and state the view's Prev/Next buttons refer to. ``listing`` and
+    ``currency`` let the payload be re-rendered for another display currency."""
     embeds: list[discord.Embed]
     view: discord.ui.View | None
+    digest_embed: discord.Embed | None = None
+    links: list[tuple[str, str]] = field(default_factory=list)
+    routing: RoutingContext = field(default_factory=RoutingContext)
+    carousel: tuple[str, CarouselState] | None = None
+    title: str = ""
+    listing: ListingNotification | None = None
+    currency: str = ""
+
+
+@dataclass
+class EnrichmentServices:
+    """Shared outbound clients used while enriching listing notifications."""
+    http: HttpClient
+    translator: Translator
+    previews: PreviewCache
+    fx: FxRefresher
+
+    @classmethod
+    def from_settings(cls) -> "EnrichmentServices":
+        """Build the pooled HTTP client and cached translator from settings."""
+        http = HttpClient(
+            limit=settings.http_pool_size,
+            limit_per_host=settings.http_pool_per_host,
+            breakers=BreakerRegistry(
+                window=settings.http_breaker_window,
+                min_calls=settings.http_breaker_min_calls,
+                failure_ratio=settings.http_breaker_failure_ratio,
+                slow_call_seconds=settings.http_breaker_slow_call_seconds,
+                open_seconds=settings.http_breaker_open_seconds,
+            ),
+        )
+        translator = Translator(
+            TranslationBatcher(http, window_seconds=settings.translation_batch_window_ms / 1000),
+            TranslationCache(
+                SqliteKVStore(settings.data_dir / "cache.sqlite3", table="translations"),
+                max_entries=settings.translation_cache_max_entries,
+                max_bytes=settings.translation_cache_max_bytes,
+                negative_ttl=settings.translation_negative_ttl_seconds,
+            ),
+        )
+        previews = PreviewCache(
+            (
+                SqliteKVStore(settings.data_dir / "cache.sqlite3", table="previews")
+                if settings.preview_cache_persist
+                else None
+            ),
+            ttl=settings.preview_cache_ttl_seconds,
+            max_entries=settings.preview_cache_max_entries,
+        )
+        fx = FxRefresher(
+            http,
+            SqliteKVStore(settings.data_dir / "cache.sqlite3", table="fx"),
+            fallback=settings.cny_to_eur_rate,
+            ttl=settings.fx_rate_ttl_seconds,
+            max_backoff=settings.fx_retry_max_seconds,
+        )
+        return cls(http=http, translator=translator, previews=previews, fx=fx)
+
+    async def start(self) -> None:
+        """Start background work: loading and refreshing the FX rate."""
+        await self.fx.start()
+
+    async def close(self) -> None:
+        """Stop the FX refresher, flush the caches and close the HTTP session."""
+        await self.fx.close()
+        await self.translator.close()
+        await self.previews.close()
+        await self.http.close()
 
 
 def _dedupe_urls(urls: list[str]) -> list[str]:
@@ -112,87 +203,6 @@ def _dedupe_urls(urls: list[str]) -> list[str]:
     return result
 
 
-class ListingCarouselView(discord.ui.View):
-    """Discord UI view with Prev/Next buttons for browsing listing images."""
-    def __init__(
-        self,
-        base_embed: discord.Embed,
-        image_urls: list[str],
-        goofish_url: str,
-        superbuy_url: str,
-    ) -> None:
-        super().__init__(timeout=60 * 60)
-        self._base_embed_dict = base_embed.to_dict()
-        self._image_urls = _dedupe_urls(image_urls)
-        self._index = 0
-        self._message: discord.Message | None = None
-
-        if goofish_url:
-            self.add_item(
-                discord.ui.Button(
-                    label="Goofish",
-                    style=discord.ButtonStyle.link,
-                    url=goofish_url,
-                    row=1,
-                )
-            )
-        if superbuy_url:
-            self.add_item(
-                discord.ui.Button(
-                    label="Superbuy",
-                    style=discord.ButtonStyle.link,
-                    url=superbuy_url,
-                    row=1,
-                )
-            )
-
-        self._sync_nav_state()
-
-    def bind_message(self, message: discord.Message) -> None:
-        """Bind a Discord message to this view for in-place editing on timeout."""
-        self._message = message
-
-    def _build_embed(self) -> discord.Embed:
-        """Rebuild the embed with the current image index."""
-        embed = discord.Embed.from_dict(self._base_embed_dict)
-        if self._image_urls:
-            embed.set_image(url=self._image_urls[self._index])
-            if len(self._image_urls) > 1:
-                embed.set_footer(text=f"Image {self._index + 1}/{len(self._image_urls)}")
-        return embed
-
-    def _sync_nav_state(self) -> None:
-        """Enable or disable Prev/Next based on image count."""
-        has_multi = len(self._image_urls) > 1
-        self.prev_button.disabled = not has_multi
-        self.next_button.disabled = not has_multi
-
-    async def on_timeout(self) -> None:
-        self.prev_button.disabled = True
-        self.next_button.disabled = True
-        if self._message is not None:
-            try:
-                await self._message.edit(view=self)
-            except Exception:
-                pass
-
-    @discord.ui.button(label="Prev", style=discord.ButtonStyle.secondary, row=0)
-    async def prev_button(self, interaction: discord.Interaction, _: discord.ui.Button) -> None:
-        if not self._image_urls:
-            await interaction.response.defer()
-            return
-        self._index = (self._index - 1) % len(self._image_urls)
-        await interaction.response.edit_message(embed=self._build_embed(), view=self)
-
-    @discord.ui.button(label="Next", style=discord.ButtonStyle.primary, row=0)
-    async def next_button(self, interaction: discord.Interaction, _: discord.ui.Button) -> None:
-        if not self._image_urls:
-            await interaction.response.defer()
-            return
-        self._index = (self._index + 1) % len(self._image_urls)
-        await interaction.response.edit_message(embed=self._build_embed(), view=self)
-
-
 def _truncate(text: str, limit: int = 1800) -> str:
     """Truncate text to limit characters with ellipsis suffix."""
     if len(text) <= limit:
@@ -222,287 +232,79 @@ def _extract_title_content(payload: Any) -> tuple[str, str]:
     return "Goofish Monitor", str(payload)
 
 
-def _should_drop_notification(title: str, content: str) -> bool:
-    """Return True if the notification is an auth-expiry advisory to suppress."""
-    normalized_title = (title or "").strip().lower()
-    normalized_content = (content or "").strip().lower()
-    combined = f"{normalized_title}\n{normalized_content}"
-    return any(pattern in combined for pattern in _AUTH_EXPIRED_MESSAGE_PATTERNS)
-
-
-def _extract_urls(text: str) -> list[str]:
-    """Extract all HTTP(S) URLs from free-form text."""
-    return [m.group(0).strip().rstrip(".,") for m in _URL_RE.finditer(text or "")]
-
-
-def _extract_value_by_labels(content: str, labels: tuple[str, ...]) -> str:
-    """Find the first line starting with any of labels and return its value."""
-    for line in (content or "").splitlines():
-        line = line.strip()
-        lowered = line.lower()
-        for label in labels:
-            if lowered.startswith(label.lower()):
-                return line[len(label) :].strip()
-    return ""
-
-
-def _parse_cny_amount(value: Any) -> float | None:
-    """Parse a CNY price value from various formats (string, number, wan).
-
-    Returns:
-        Float amount, or None if parsing fails."""
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
-
-    text = str(value).strip()
-    if not text:
-        return None
-
-    text = text.replace(",", "").replace(" ", "")
-    text = text.replace("￥", "").replace("¥", "")
-
-    if "万" in text:
-        try:
-            return float(text.replace("万", "")) * 10000.0
-        except ValueError:
-            return None
-
-    match = re.search(r"-?\d+(?:\.\d+)?", text)
-    if not match:
-        return None
-
-    try:
-        return float(match.group(0))
-    except ValueError:
-        return None
-
-
-def _contains_cjk(text: str) -> bool:
-    """Return True if text contains CJK ideograph characters."""
-    return bool(re.search(r"[\u4e00-\u9fff]", text or ""))
-
+@dataclass(frozen=True, slots=True)
+class MonitorPayload:
+    """A decoded ai-goofish-monitor webhook body.
 
-def _translate_to_english_sync(text: str) -> str:
-    """Synchronously translate Chinese text to English via Google Translate API."""
-    source = (text or "").strip()
-    if not source or not _contains_cjk(source):
-        return source
+    ``data`` is the decoded JSON/form mapping, or the raw text for
+    plain-text bodies; it is what gets journaled and parsed for listing
+    fields later."""
+    title: str
+    content: str
+    data: Any
 
-    query = urllib.parse.urlencode(
-        {
-            "client": "gtx",
-            "sl": "auto",
-            "tl": "en",
-            "dt": "t",
-            "q": source,
-        }
-    )
-    url = f"https://translate.googleapis.com/translate_a/single?{query}"
-    request = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": "Mozilla/5.0",
-            "Accept": "application/json,text/plain,*/*",
-        },
-    )
+    @classmethod
+    def from_data(cls, data: Any) -> "MonitorPayload":
+        """Wrap decoded webhook data, resolving its title and content."""
+        title, content = _extract_title_content(data)
+        return cls(title=title, content=content, data=data)
 
-    with urllib.request.urlopen(request, timeout=6) as response:
-        body = response.read().decode("utf-8", errors="ignore")
+    @classmethod
+    def from_json(cls, body: bytes | str) -> "MonitorPayload":
+        """Decode a JSON body with the fastest available codec.
 
-    payload = json.loads(body)
-    if not isinstance(payload, list) or not payload:
-        return source
+        Raises:
+            ValueError: If the body is not valid JSON."""
+        return cls.from_data(jsoncodec.loads(body))
 
-    segments = payload[0]
-    if not isinstance(segments, list):
-        return source
 
-    translated_parts: list[str] = []
-    for segment in segments:
-        if isinstance(segment, list) and segment:
-            first = segment[0]
-            if isinstance(first, str):
-                translated_parts.append(first)
+def _secret_matches(provided: str, secret: str) -> bool:
+    """Compare a presented shared secret in constant time."""
+    return hmac.compare_digest(provided.encode("utf-8"), secret.encode("utf-8"))
 
-    translated = "".join(translated_parts).strip()
-    return translated or source
 
+def _signature_matches(signature: str, secret: str, body: bytes) -> bool:
+    """Check an HMAC-SHA256 signature of the raw body, as ``sha256=<hex>`` or bare hex."""
+    scheme, sep, digest = signature.strip().partition("=")
+    if not sep:
+        scheme, digest = "sha256", scheme
+    if scheme.lower() != "sha256" or not digest:
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected.encode("ascii"), digest.strip().lower().encode("utf-8"))
 
-async def _translate_to_english(text: str) -> str:
-    """Async wrapper around the sync translator with simple LRU cache."""
-    source = (text or "").strip()
-    if not source:
-        return ""
-    if not _contains_cjk(source):
-        return source
-
-    cached = _TRANSLATION_CACHE.get(source)
-    if cached:
-        return cached
-
-    try:
-        translated = await asyncio.to_thread(_translate_to_english_sync, source)
-    except Exception:
-        translated = source
-
-    if len(_TRANSLATION_CACHE) >= _TRANSLATION_CACHE_MAX:
-        _TRANSLATION_CACHE.pop(next(iter(_TRANSLATION_CACHE)))
-    _TRANSLATION_CACHE[source] = translated
-    return translated
-
-
-def _extract_meta_content(document: str, keys: tuple[str, ...]) -> str:
-    """Extract content attribute from HTML meta tags matching any of keys."""
-    lowered_keys = {k.lower() for k in keys}
-
-    for tag in re.finditer(r"<meta\s+[^>]*>", document, flags=re.IGNORECASE):
-        raw_tag = tag.group(0)
-        attrs = dict(
-            (m.group(1).lower(), html.unescape(m.group(2)).strip())
-            for m in re.finditer(r"([a-zA-Z_:][\w:.-]*)\s*=\s*[\"']([^\"']*)[\"']", raw_tag)
-        )
-        key = (attrs.get("property") or attrs.get("name") or "").lower().strip()
-        if key in lowered_keys:
-            content = attrs.get("content", "").strip()
-            if content:
-                return content
-    return ""
-
-
-def _fetch_listing_preview_sync(url: str) -> dict[str, str]:
-    """Fetch a Goofish listing page and extract og:title, og:description, og:image."""
-    request = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": "Mozilla/5.0",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        },
-    )
 
-    with urllib.request.urlopen(request, timeout=8) as response:
-        content_type = response.headers.get("Content-Type", "")
-        charset = "utf-8"
-        if "charset=" in content_type:
-            charset = content_type.split("charset=", 1)[1].split(";", 1)[0].strip() or "utf-8"
-        body = response.read().decode(charset, errors="ignore")
-
-    title = _extract_meta_content(body, ("og:title", "twitter:title"))
-    description = _extract_meta_content(
-        body, ("og:description", "description", "twitter:description")
-    )
-    image = _extract_meta_content(body, ("og:image", "twitter:image"))
-
-    return {
-        "title": title,
-        "description": description,
-        "image": image,
-    }
-
-
-async def _get_cny_to_eur_rate() -> float:
-    """Return the current CNY to EUR exchange rate, cached for 6 hours.
-
-    Falls back to settings.cny_to_eur_rate on API failure."""
-    fallback = settings.cny_to_eur_rate if settings.cny_to_eur_rate > 0 else 0.13
-    now = time.time()
-
-    if _FX_CACHE["value"] > 0 and (now - _FX_CACHE["updated_at"] < _FX_CACHE_TTL_SECONDS):
-        return _FX_CACHE["value"]
-
-    async with _FX_LOCK:
-        if _FX_CACHE["value"] > 0 and (
-            time.time() - _FX_CACHE["updated_at"] < _FX_CACHE_TTL_SECONDS
-        ):
-            return _FX_CACHE["value"]
+def _decode_webhook_body(content_type: str, charset: str | None, body: bytes) -> MonitorPayload:
+    """Decode an already read JSON, form-urlencoded or text webhook body.
 
+    Raises:
+        ValueError: If a body declared as JSON or form-urlencoded does not parse."""
+    text_encoding = charset or "utf-8"
+    if "json" in content_type:
+        return MonitorPayload.from_json(body)
+    if "application/x-www-form-urlencoded" in content_type:
         try:
-            xml_text = await asyncio.to_thread(_fetch_ecb_daily_xml)
-            rate = _parse_cny_to_eur_from_ecb(xml_text)
-            if rate and rate > 0:
-                _FX_CACHE["value"] = rate
-                _FX_CACHE["updated_at"] = time.time()
-                return rate
-        except Exception as e:
-            log.warning("Failed to fetch live FX rate, using fallback: %s", e)
-
-        _FX_CACHE["value"] = fallback
-        _FX_CACHE["updated_at"] = time.time()
-        return fallback
-
-
-def _fetch_ecb_daily_xml() -> str:
-    """Fetch the ECB daily eurofxref XML feed."""
-    request = urllib.request.Request(
-        "https://www.ecb.europa.eu/stats/eurofxref/eurofxref-daily.xml",
-        headers={"User-Agent": "Mozilla/5.0", "Accept": "application/xml,text/xml,*/*"},
-    )
-    with urllib.request.urlopen(request, timeout=8) as response:
-        return response.read().decode("utf-8", errors="ignore")
-
-
-def _parse_cny_to_eur_from_ecb(xml_text: str) -> float:
-    """Parse the CNY rate from the ECB XML and convert to EUR per CNY."""
-    root = ET.fromstring(xml_text)
-    ns = {
-        "gesmes": "http://www.gesmes.org/xml/2002-08-01",
-        "e": "http://www.ecb.int/vocabulary/2002-08-01/eurofxref",
-    }
-    cube_nodes = root.findall(".//e:Cube[@currency='CNY']", ns)
-    if not cube_nodes:
-        raise ValueError("CNY rate not present in ECB feed")
-    cny_per_eur = float(cube_nodes[0].attrib.get("rate", "0"))
-    if cny_per_eur <= 0:
-        raise ValueError("Invalid CNY rate in ECB feed")
-    return 1.0 / cny_per_eur
-
-
-def _convert_goofish_short_url(url: str) -> str:
-    """Build a Goofish mobile share URL from a desktop item URL."""
-    if not url:
-        return ""
-    match = re.search(r"[?&]id=(\d+)", url)
-    if not match:
-        return url
-    item_id = match.group(1)
-    bfp_json = f'{{"id":{item_id}}}'
-    encoded = quote(bfp_json)
-    return (
-        "https://pages.goofish.com/sharexy"
-        "?loadingVisible=false&bft=item&bfs=idlepc.item&spm=a21ybx.item.0.0"
-        f"&bfp={encoded}"
-    )
-
-
-def _build_superbuy_url(goofish_url: str) -> str:
-    """Build a Superbuy proxy-buy link from a Goofish item URL.
-
-    Uses the configured superbuy_link_template and prefers the
-    canonical PC URL; falls back to the short mobile URL if too long."""
-    if not goofish_url:
-        return ""
-
-    primary_source = _canonical_goofish_pc_url(goofish_url)
-    secondary_source = _convert_goofish_short_url(goofish_url)
-
-    template = settings.superbuy_link_template.strip() or ""
-    if not template:
-        template = "https://www.superbuy.com/en/page/buy/?url={url}"
-
-    if "{url}" in template:
-        candidate_primary = template.replace("{url}", quote(primary_source, safe=""))
-        if len(candidate_primary) <= _DISCORD_MAX_BUTTON_URL_LEN:
-            return candidate_primary
-
-        candidate_secondary = template.replace("{url}", quote(secondary_source, safe=""))
-        if len(candidate_secondary) <= _DISCORD_MAX_BUTTON_URL_LEN:
-            return candidate_secondary
+            form: dict[str, str] = {}
+            for key, value in parse_qsl(
+                body.decode(text_encoding), keep_blank_values=True, encoding=text_encoding
+            ):
+                # Like aiohttp's form parsing, the first value of a repeated key wins.
+                form.setdefault(key, value)
+        except LookupError as e:
+            raise ValueError(f"unknown charset {text_encoding!r}") from e
+        return MonitorPayload.from_data(form)
+    try:
+        return MonitorPayload.from_data(body.decode(text_encoding, errors="replace"))
+    except LookupError:
+        return MonitorPayload.from_data(body.decode("utf-8", errors="replace"))
 
-        # Keep a non-empty URL even if too long for button; field can still show fallback text.
-        return candidate_primary
 
-    return template
+def _should_drop_notification(title: str, content: str) -> bool:
+    """Return True if the notification is an auth-expiry advisory to suppress."""
+    normalized_title = (title or "").strip().lower()
+    normalized_content = (content or "").strip().lower()
+    combined = f"{normalized_title}\n{normalized_content}"
+    return any(pattern in combined for pattern in _AUTH_EXPIRED_MESSAGE_PATTERNS)
 
 
 def _first_non_empty(values: list[Any]) -> str:
@@ -516,90 +318,185 @@ def _first_non_empty(values: list[Any]) -> str:
     return ""
 
 
-def _extract_listing_notification(payload: Any, content: str) -> ListingNotification | None:
-    """Parse a webhook payload into a ListingNotification.
+# Listing field -> payload keys in priority order. For each key the top-level
+# value is preferred over the meta value; the first non-empty value wins.
+_LISTING_FIELD_KEYS: dict[str, tuple[str, ...]] = {
+    "listing_title": ("listing_title_en", "listing_title", "item_title", "product_title"),
+    "reason": ("reason_en", "reason", "ai_reason"),
+    "description": (
+        "listing_description_en",
+        "description_en",
+        "listing_description",
+        "description",
+    ),
+    "price_raw": ("price_cny_text", "listing_price_cny", "price", "listing_price"),
+    "goofish_url": ("goofish_pc_url", "listing_link_pc", "goofish_link", "link"),
+    "goofish_short_url": ("goofish_short_url", "listing_link_mobile", "mobile_link"),
+    "superbuy_url": ("superbuy_url",),
+    "image_url": ("listing_main_image", "main_image", "image"),
+    "task_name": ("task_name", "task", "monitor_task"),
+    "keyword": ("keyword", "search_keyword", "keywords"),
+}
+# Non-text payload keys read as-is (top-level first, then meta).
+_LISTING_RAW_KEYS = ("listing_images", "price_cny_value")
+# Content line labels used for fields the payload does not provide.
+_LISTING_CONTENT_LABELS: dict[str, tuple[str, ...]] = {
+    "reason": ("Reason:", "AI Reason:", "原因:"),
+    "description": ("Description:", "描述:"),
+    "price_raw": ("Price:", "价格:"),
+}
+
+# Compiled from the specs above: payload key -> (field, rank); lower ranks win.
+_LISTING_KEY_RANKS: dict[str, tuple[str, int]] = {
+    key: (field_name, rank)
+    for field_name, keys in _LISTING_FIELD_KEYS.items()
+    for rank, key in enumerate(keys)
+}
+_LISTING_WANTED_KEYS = frozenset(_LISTING_KEY_RANKS) | frozenset(_LISTING_RAW_KEYS)
+_LISTING_LABELS_LOWER: tuple[tuple[str, tuple[tuple[str, int], ...]], ...] = tuple(
+    (field_name, tuple((label.lower(), len(label)) for label in labels))
+    for field_name, labels in _LISTING_CONTENT_LABELS.items()
+)
+_LISTING_LABEL_FIRST_CHARS = frozenset(
+    label[0] for _, labels in _LISTING_LABELS_LOWER for label, _ in labels
+)
 
-    Handles both JSON and form-encoded payloads with meta_ prefixed fields."""
-    payload_dict = payload if isinstance(payload, dict) else {}
-    raw_meta = payload_dict.get("meta")
-    meta: dict[str, Any] = dict(raw_meta) if isinstance(raw_meta, dict) else {}
 
-    # Support form-encoded fallback shape: meta_<field>=...
+def _decode_form_meta_value(value: Any) -> Any:
+    """Decode a JSON list/object sent as a form-encoded ``meta_<field>`` value."""
+    if isinstance(value, str):
+        stripped = value.strip()
+        if (stripped.startswith("[") and stripped.endswith("]")) or (
+            stripped.startswith("{") and stripped.endswith("}")
+        ):
+            try:
+                return jsoncodec.loads(stripped)
+            except Exception:
+                pass
+    return value
+
+
+def _collect_listing_values(payload_dict: dict[Any, Any]) -> tuple[dict[str, str], dict[str, Any]]:
+    """Resolve every listing field from the payload and its meta in one pass.
+
+    Returns:
+        The non-empty text fields, and the raw values of ``_LISTING_RAW_KEYS``."""
+    top: dict[str, Any] = {}
+    meta: dict[str, Any] = {}
+    form_meta: dict[str, Any] = {}
+    raw_meta: Any = None
     for key, value in payload_dict.items():
-        if not isinstance(key, str) or not key.startswith("meta_"):
-            continue
-        meta_key = key[5:]
-        if not meta_key:
+        if not isinstance(key, str):
             continue
-        if isinstance(value, str):
-            stripped = value.strip()
-            if (stripped.startswith("[") and stripped.endswith("]")) or (
-                stripped.startswith("{") and stripped.endswith("}")
-            ):
-                try:
-                    meta[meta_key] = json.loads(stripped)
+        if key in _LISTING_WANTED_KEYS:
+            top[key] = value
+        elif key == "meta":
+            raw_meta = value
+        elif key.startswith("meta_") and key[5:] in _LISTING_WANTED_KEYS:
+            # Support form-encoded fallback shape: meta_<field>=...
+            form_meta[key[5:]] = _decode_form_meta_value(value)
+    if isinstance(raw_meta, dict):
+        for key, value in raw_meta.items():
+            if key in _LISTING_WANTED_KEYS:
+                meta[key] = value
+    meta.update(form_meta)
+
+    best: dict[str, tuple[int, str]] = {}
+    for source_rank, values in ((0, top), (1, meta)):
+        for key, value in values.items():
+            spec = _LISTING_KEY_RANKS.get(key)
+            if spec is None or value is None:
+                continue
+            field_name, key_rank = spec
+            rank = key_rank * 2 + source_rank
+            current = best.get(field_name)
+            if current is not None and current[0] < rank:
+                continue
+            text = str(value).strip()
+            if text:
+                best[field_name] = (rank, text)
+
+    raw_images = top.get("listing_images")
+    if not isinstance(raw_images, list):
+        raw_images = meta.get("listing_images")
+    raw_price_value = top.get("price_cny_value")
+    if raw_price_value is None:
+        raw_price_value = meta.get("price_cny_value")
+    raw_values = {"listing_images": raw_images, "price_cny_value": raw_price_value}
+    return {field_name: text for field_name, (_, text) in best.items()}, raw_values
+
+
+def _scan_listing_content(content: str, want_labels: set[str], want_url: bool) -> dict[str, str]:
+    """Fill labelled fields and the last Goofish URL from content in one line scan."""
+    found: dict[str, str] = {}
+    if not content or (not want_labels and not want_url):
+        return found
+    for line in content.splitlines():
+        line_stripped = line.strip()
+        # Cheap first-character check skips the lowercasing for unlabelled lines.
+        if want_labels and line_stripped[:1].lower() in _LISTING_LABEL_FIRST_CHARS:
+            lowered = line_stripped.lower()
+            for field_name, labels in _LISTING_LABELS_LOWER:
+                if field_name not in want_labels:
                     continue
-                except Exception:
-                    pass
-        meta[meta_key] = value
-
-    def pick(*keys: str) -> str:
-        values: list[Any] = []
-        for key in keys:
-            values.append(payload_dict.get(key))
-            values.append(meta.get(key))
-        return _first_non_empty(values)
-
-    listing_title = pick("listing_title_en", "listing_title", "item_title", "product_title")
-    reason = pick("reason_en", "reason", "ai_reason")
-    description = pick(
-        "listing_description_en", "description_en", "listing_description", "description"
-    )
-    price_raw = pick("price_cny_text", "listing_price_cny", "price", "listing_price")
+                for label, label_len in labels:
+                    if lowered.startswith(label):
+                        found[field_name] = line_stripped[label_len:].strip()
+                        want_labels.discard(field_name)
+                        break
+        if want_url and "goofish.com" in line:
+            for match in _URL_RE.finditer(line):
+                url = match.group(0).strip().rstrip(".,")
+                if "goofish.com" in url:
+                    found["goofish_url"] = url
+    return found
 
-    goofish_url = pick("goofish_pc_url", "listing_link_pc", "goofish_link", "link")
-    goofish_short_url = pick("goofish_short_url", "listing_link_mobile", "mobile_link")
-    superbuy_url = pick("superbuy_url")
 
-    image_url = pick("listing_main_image", "main_image", "image")
-    raw_images = payload_dict.get("listing_images")
-    if not isinstance(raw_images, list):
-        raw_images = meta.get("listing_images")
-    image_urls = [str(u).strip() for u in (raw_images or []) if str(u).strip()]
+def _extract_listing_notification(payload: Any, content: str) -> ListingNotification | None:
+    """Parse a webhook payload into a ListingNotification.
 
-    if not reason:
-        reason = _extract_value_by_labels(content, ("Reason:", "AI Reason:", "原因:"))
-    if not description:
-        description = _extract_value_by_labels(content, ("Description:", "描述:"))
-    if not price_raw:
-        price_raw = _extract_value_by_labels(content, ("Price:", "价格:"))
+    Handles both JSON and form-encoded payloads with meta_ prefixed fields.
+    Payload fields are resolved in one pass using the compiled field spec;
+    anything still missing is filled from one line scan of the content."""
+    payload_dict = payload if isinstance(payload, dict) else {}
+    fields, raw_values = _collect_listing_values(payload_dict)
+
+    want_labels = {name for name in _LISTING_CONTENT_LABELS if name not in fields}
+    fields.update(_scan_listing_content(content, want_labels, "goofish_url" not in fields))
 
-    if not goofish_url:
-        urls = _extract_urls(content)
-        goofish_candidates = [u for u in urls if "goofish.com" in u]
-        if goofish_candidates:
-            goofish_url = goofish_candidates[-1]
+    listing_title = fields.get("listing_title", "")
+    reason = fields.get("reason", "")
+    description = fields.get("description", "")
+    price_raw = fields.get("price_raw", "")
+    goofish_url = fields.get("goofish_url", "")
+    goofish_short_url = fields.get("goofish_short_url", "")
+    superbuy_url = fields.get("superbuy_url", "")
+
+    image_url = _normalize_image_url(fields.get("image_url", ""))
+    raw_images = raw_values["listing_images"]
+    if not isinstance(raw_images, list):
+        raw_images = []
+    image_urls = _dedupe_urls([image_url, *(_normalize_image_url(u) for u in raw_images)])
 
+    link = _goofish_link(goofish_url)
     if not goofish_short_url and goofish_url:
-        goofish_short_url = _convert_goofish_short_url(goofish_url)
+        goofish_short_url = link.short_url
     if not superbuy_url and goofish_url:
-        superbuy_url = _build_superbuy_url(goofish_url)
+        superbuy_url = link.superbuy_url
 
-    goofish_url = _canonical_goofish_pc_url(goofish_url)
-    goofish_short_url = _fit_discord_button_url(goofish_short_url)
-    superbuy_url = _fit_discord_button_url(superbuy_url)
+    goofish_url = link.canonical_url
+    goofish_short_url = fit_discord_button_url(goofish_short_url)
+    superbuy_url = fit_discord_button_url(superbuy_url)
 
     if not image_url and image_urls:
         image_url = image_urls[0]
 
     price_cny: float | None = None
-    raw_price_value = payload_dict.get("price_cny_value")
-    if raw_price_value is None:
-        raw_price_value = meta.get("price_cny_value")
+    raw_price_value = raw_values["price_cny_value"]
     if raw_price_value is not None:
-        price_cny = _parse_cny_amount(raw_price_value)
+        price_cny = parse_cny_amount(raw_price_value)
     if price_cny is None:
-        price_cny = _parse_cny_amount(price_raw)
+        price_cny = parse_cny_amount(price_raw)
 
     has_listing_signal = any(
         [
@@ -627,56 +524,163 @@ def _extract_listing_notification(payload: Any, content: str) -> ListingNotifica
         superbuy_url=superbuy_url,
         image_url=image_url,
         image_urls=image_urls,
+        task_name=fields.get("task_name", ""),
+        keyword=fields.get("keyword", ""),
     )
 
 
-async def _enrich_listing_notification(listing: ListingNotification) -> ListingNotification:
-    """Enrich a listing notification with fetched preview data and English translation."""
-    enriched = listing
+def _dedupe_keys(payload: Any, content: str, idempotency_key: str = "") -> list[str]:
+    """Build the duplicate-suppression keys for a webhook.
+
+    Uses the idempotency header when present, plus the Goofish item ID
+    combined with the listed price so price drops are still delivered."""
+    keys: list[str] = []
+    if idempotency_key.strip():
+        keys.append(f"idem:{idempotency_key.strip()}")
+
+    listing = _extract_listing_notification(payload, content)
+    if listing is not None:
+        item_id = _extract_goofish_item_id(listing.goofish_url)
+        if item_id:
+            if listing.price_cny is not None:
+                price = f"{listing.price_cny:.2f}"
+            else:
+                price = listing.price_raw.strip()
+            keys.append(f"item:{item_id}:{price}")
+    return keys
+
+
+def _recipient_dedupe_keys(item_keys: list[str], recipients: list[Recipient]) -> list[str]:
+    """Per-recipient forms of item + price keys, claimed once an alert is routed."""
+    return [f"{key}:{recipient.key}" for key in item_keys for recipient in recipients]
 
+
+def _routing_context(raw: Any, listing: ListingNotification | None) -> RoutingContext:
+    """Collect the fields routing rules match on from a parsed webhook."""
+    if listing is None:
+        payload_dict = raw if isinstance(raw, dict) else {}
+        return RoutingContext(
+            task_name=_first_non_empty([payload_dict.get("task_name"), payload_dict.get("task")]),
+            keyword=_first_non_empty([payload_dict.get("keyword")]),
+        )
+    return RoutingContext(
+        task_name=listing.task_name,
+        keyword=listing.keyword,
+        item_id=_extract_goofish_item_id(listing.goofish_url),
+        price_cny=listing.price_cny,
+    )
+
+
+async def _fetch_listing_preview_safe(url: str, http: HttpClient) -> dict[str, str]:
+    """Fetch a listing preview, returning an empty dict on any failure."""
+    try:
+        return await fetch_listing_preview(url, http)
+    except Exception:
+        return {}
+
+
+def _merge_listing_preview(
+    listing: ListingNotification, preview: dict[str, str]
+) -> ListingNotification:
+    """Fill missing title, description and image fields from a listing preview."""
+    preview_title = str(preview.get("title", "")).strip()
+    preview_description = str(preview.get("description", "")).strip()
+    preview_image = _normalize_image_url(preview.get("image", ""))
+    image_url = listing.image_url or preview_image
+
+    return replace(
+        listing,
+        listing_title=listing.listing_title or preview_title,
+        description=listing.description or preview_description,
+        image_url=image_url,
+        image_urls=_dedupe_urls([image_url, preview_image, *listing.image_urls]),
+    )
+
+
+def _completed_result(task: asyncio.Task[Any] | None) -> Any:
+    """Return a finished task's result, or None if it is pending, cancelled or failed."""
+    if task is None or not task.done() or task.cancelled() or task.exception() is not None:
+        return None
+    return task.result()
+
+
+async def _enrich_listing_notification(
+    listing: ListingNotification, services: EnrichmentServices, timeout: float | None = None
+) -> ListingNotification:
+    """Enrich a listing notification with fetched preview data and English translation.
+
+    The preview fetch and the translations run concurrently; only fields
+    that are missing from the webhook wait for the preview before being
+    translated. Steps still running after ``timeout`` seconds are cancelled
+    and their fields keep whatever value is already available."""
+    preview_task: asyncio.Task[dict[str, str]] | None = None
     if listing.goofish_url and (
         not listing.image_url or not listing.description or not listing.listing_title
     ):
-        try:
-            preview = await asyncio.to_thread(_fetch_listing_preview_sync, listing.goofish_url)
-        except (urllib.error.URLError, TimeoutError, ValueError):
-            preview = {}
-        except Exception:
-            preview = {}
-
-        preview_title = str(preview.get("title", "")).strip()
-        preview_description = str(preview.get("description", "")).strip()
-        preview_image = str(preview.get("image", "")).strip()
-
-        image_urls = list(listing.image_urls)
-        if preview_image and preview_image not in image_urls:
-            image_urls.insert(0, preview_image)
-
-        enriched = replace(
-            enriched,
-            listing_title=listing.listing_title or preview_title,
-            description=listing.description or preview_description,
-            image_url=listing.image_url or preview_image,
-            image_urls=image_urls,
+        url = listing.goofish_url
+        preview_task = asyncio.create_task(
+            services.previews.get_or_fetch(
+                _extract_goofish_item_id(url),
+                lambda: _fetch_listing_preview_safe(url, services.http),
+            )
         )
 
-    title_en = await _translate_to_english(enriched.listing_title)
-    reason_en = await _translate_to_english(enriched.reason)
-    description_en = await _translate_to_english(enriched.description)
+    async def translate_field(field_name: str) -> str:
+        value = getattr(listing, field_name)
+        if not value and preview_task is not None:
+            value = getattr(_merge_listing_preview(listing, await preview_task), field_name)
+        return await services.translator.translate(value)
 
-    return replace(
-        enriched,
-        listing_title=title_en or enriched.listing_title,
-        reason=reason_en or enriched.reason,
-        description=description_en or enriched.description,
-    )
+    translation_tasks = {
+        field_name: asyncio.create_task(translate_field(field_name))
+        for field_name in ("listing_title", "reason", "description")
+    }
+    tasks: set[asyncio.Task[Any]] = set(translation_tasks.values())
+    if preview_task is not None:
+        tasks.add(preview_task)
 
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        log.info("Listing enrichment hit its deadline; sending with partial fields")
+        await asyncio.gather(*pending, return_exceptions=True)
 
-async def _build_discord_payload(title: str, content: str, raw: Any) -> DiscordNotificationPayload:
+    enriched = listing
+    preview = _completed_result(preview_task)
+    if preview:
+        enriched = _merge_listing_preview(listing, preview)
+
+    translated: dict[str, str] = {}
+    for field_name, task in translation_tasks.items():
+        value = _completed_result(task)
+        if value:
+            translated[field_name] = value
+
+    return replace(enriched, **translated)
+
+
+def _format_price(listing: ListingNotification, currency: str, rates: RateTable) -> str:
+    """Render the CNY price with its converted amount, e.g. ``¥1,299.00 (~EUR 168.87)``."""
+    if listing.price_cny is None:
+        return listing.price_raw or "N/A"
+    price_display = f"¥{listing.price_cny:,.2f}"
+    if currency != "CNY":
+        converted = rates.convert(listing.price_cny, "CNY", currency)
+        if converted is not None:
+            price_display += f" (~{currency} {converted:,.2f})"
+    return price_display
+
+
+async def _build_discord_payload(
+    title: str, content: str, raw: Any, services: EnrichmentServices, currency: str
+) -> DiscordNotificationPayload:
     """Build Discord embeds and views from a raw webhook payload.
 
     If the payload contains listing data, creates a rich embed with price,
-    description, links, and an image carousel. Otherwise creates a plain embed."""
+    description, links, and an image carousel. Otherwise creates a plain embed.
+    Prices are converted to currency, the endpoint's validated default
+    display currency; see :func:`_localize_payload` for other recipients."""
     listing = _extract_listing_notification(raw, content)
     if listing is None:
         fallback = discord.Embed(
@@ -686,17 +690,47 @@ async def _build_discord_payload(title: str, content: str, raw: Any) -> DiscordN
         )
         if raw is not None and raw != "":
             try:
-                raw_text = json.dumps(raw, ensure_ascii=False, indent=2)
+                raw_text = jsoncodec.dumps_text(raw, indent=True)
             except Exception:
                 raw_text = str(raw)
             fallback.add_field(
                 name="Raw", value=f"```json\n{_truncate(raw_text, 900)}\n```", inline=False
             )
-        return DiscordNotificationPayload(embeds=[fallback], view=None)
+        return DiscordNotificationPayload(
+            embeds=[fallback],
+            view=None,
+            digest_embed=fallback,
+            routing=_routing_context(raw, None),
+        )
+
+    routing = _routing_context(raw, listing)
 
-    listing = await _enrich_listing_notification(listing)
-    fx_rate = await _get_cny_to_eur_rate()
+    listing = await _enrich_listing_notification(
+        listing, services, timeout=settings.enrichment_timeout_seconds
+    )
+    # Refreshed in the background; never waits on the ECB feed.
+    return _render_listing_payload(title, listing, routing, currency, services.fx.table)
+
+
+def _localize_payload(
+    payload: DiscordNotificationPayload, currency: str, services: EnrichmentServices
+) -> DiscordNotificationPayload:
+    """Return the payload with prices in currency, re-rendering only if it differs."""
+    if payload.listing is None or payload.currency == currency:
+        return payload
+    return _render_listing_payload(
+        payload.title, payload.listing, payload.routing, currency, services.fx.table
+    )
 
+
+def _render_listing_payload(
+    title: str,
+    listing: ListingNotification,
+    routing: RoutingContext,
+    currency: str,
+    rates: RateTable,
+) -> DiscordNotificationPayload:
+    """Render an enriched listing into embeds and views with prices in currency."""
     listing_title = listing.listing_title or title or "Goofish listing alert"
     embed = discord.Embed(
         title=_truncate(listing_title, 256),
@@ -704,14 +738,10 @@ async def _build_discord_payload(title: str, content: str, raw: Any) -> DiscordN
         color=discord.Color.green(),
     )
 
-    price_display = listing.price_raw or "N/A"
-    if listing.price_cny is not None:
-        price_display = f"¥{listing.price_cny:,.2f}"
-        eur = listing.price_cny * fx_rate
-        price_display += f" (~EUR {eur:,.2f})"
+    price_display = _format_price(listing, currency, rates)
     embed.add_field(name="Price", value=price_display, inline=False)
 
-    reason = listing.reason or _extract_value_by_labels(content, ("Reason:", "AI Reason:", "原因:"))
+    reason = listing.reason
     embed.add_field(name="Why it is valid", value=_truncate(reason or "N/A", 1000), inline=False)
 
     if listing.description:
@@ -732,76 +762,235 @@ async def _build_discord_payload(title: str, content: str, raw: Any) -> DiscordN
             links_text = _truncate(links_text, 1000)
         embed.add_field(name="Links", value=links_text, inline=False)
 
-    image_candidates: list[str] = []
-    if listing.image_url:
-        image_candidates.append(listing.image_url)
-    image_candidates.extend(listing.image_urls)
-    image_urls = _dedupe_urls(image_candidates)
-    if image_urls:
-        embed.set_image(url=image_urls[0])
-        if len(image_urls) > 1:
-            embed.set_footer(text=f"Image 1/{len(image_urls)}")
+    image_urls = listing.image_urls
 
-    view: discord.ui.View | None = None
-    if image_urls or listing.goofish_url or listing.superbuy_url:
-        view = ListingCarouselView(
-            base_embed=embed,
-            image_urls=image_urls,
-            goofish_url=listing.goofish_url,
-            superbuy_url=listing.superbuy_url,
-        )
+    links: list[tuple[str, str]] = []
+    if listing.goofish_url:
+        links.append(("Goofish", listing.goofish_url))
+    if listing.superbuy_url:
+        links.append(("Superbuy", listing.superbuy_url))
 
-    return DiscordNotificationPayload(embeds=[embed], view=view)
+    view: discord.ui.View | None = None
+    carousel: tuple[str, CarouselState] | None = None
+    state = CarouselState(embed=embed.to_dict(), images=image_urls, links=links)
+    if image_urls:
+        key = carousel_key(routing.item_id, state)
+        carousel = (key, state)
+        embed, view = state.page(key, 0)
+    elif links:
+        view = build_carousel_view("", state)
+
+    digest_embed = discord.Embed(
+        title=_truncate(listing_title, 200),
+        url=listing.goofish_url or None,
+        description=_truncate(f"{price_display}\n{reason or ''}".strip(), 300),
+        color=discord.Color.green(),
+    )
+    if image_urls:
+        digest_embed.set_thumbnail(url=image_urls[0])
+
+    return DiscordNotificationPayload(
+        embeds=[embed],
+        view=view,
+        digest_embed=digest_embed,
+        links=links,
+        routing=routing,
+        carousel=carousel,
+        title=title,
+        listing=listing,
+        currency=currency,
+    )
 
 
-async def _send_discord_dm(bot: discord.Client, title: str, content: str, raw: Any) -> None:
-    """Deliver a webhook notification as a Discord DM to the configured user."""
-    user_id = settings.discord_user_id
-    if not user_id:
-        log.warning("DISCORD_USER_ID not set; dropping webhook notification")
-        return
+def _build_digest_messages(
+    payloads: list[DiscordNotificationPayload],
+) -> list[tuple[list[discord.Embed], discord.ui.View | None]]:
+    """Pack compact alert embeds into as few messages as Discord allows.
+
+    Each message carries up to 10 embeds within the 6000-character limit,
+    with numbered link buttons for every listing in it."""
+    embeds = [p.digest_embed or p.embeds[0] for p in payloads]
+    messages: list[tuple[list[discord.Embed], discord.ui.View | None]] = []
+    for group in pack_by_size([len(embed) + 4 for embed in embeds]):
+        group_embeds: list[discord.Embed] = []
+        view = discord.ui.View(timeout=None)
+        for number, index in enumerate(group, start=1):
+            embed = embeds[index].copy()
+            embed.title = _truncate(f"{number}. {embed.title or 'Goofish alert'}", 256)
+            group_embeds.append(embed)
+            for label, url in payloads[index].links:
+                if len(view.children) < 25:
+                    view.add_item(
+                        discord.ui.Button(
+                            label=f"{number}. {label}", style=discord.ButtonStyle.link, url=url
+                        )
+                    )
+        messages.append((group_embeds, view if view.children else None))
+    return messages
+
+
+async def _send_to_recipient(
+    recipients: RecipientCache,
+    dispatcher: DMDispatcher,
+    recipient: Recipient,
+    embeds: list[discord.Embed],
+    view: discord.ui.View | None,
+) -> discord.Message | None:
+    """Send embeds (and an optional view) to a user's DMs or a channel.
+
+    The destination comes from the recipient cache and is resolved again
+    once if Discord reports it missing or forbidden. The send goes
+    through the dispatcher, which paces and retries it per recipient.
 
+    Returns:
+        The sent message, or None if delivery failed (already logged)."""
     try:
-        user = await bot.fetch_user(user_id)
+        channel = await recipients.resolve(recipient)
     except Exception as e:
-        log.error(f"Failed to fetch Discord user {user_id}: {e}")
-        return
+        log.error(f"Failed to resolve Discord {recipient.kind} {recipient.id}: {e}")
+        return None
 
-    payload = await _build_discord_payload(title, content, raw)
+    kwargs: dict[str, Any] = {"embeds": embeds}
+    if view is not None:
+        kwargs["view"] = view
 
-    try:
-        if payload.view is None:
-            sent = await user.send(embeds=payload.embeds)
-        else:
-            sent = await user.send(embeds=payload.embeds, view=payload.view)
-        if isinstance(payload.view, ListingCarouselView):
-            payload.view.bind_message(sent)
-    except discord.Forbidden:
-        log.error("Cannot send DM to user (DMs disabled?)")
-    except discord.HTTPException as e:
-        log.error(f"Failed to send DM: {e}")
+    for attempt in range(2):
+        try:
+            return await dispatcher.send(recipient.key, channel, **kwargs)
+        except (discord.NotFound, discord.Forbidden) as e:
+            if attempt == 0:
+                recipients.invalidate(recipient)
+                try:
+                    channel = await recipients.resolve(recipient)
+                    continue
+                except Exception as resolve_error:
+                    log.error(
+                        f"Failed to resolve Discord {recipient.kind} {recipient.id}: "
+                        f"{resolve_error}"
+                    )
+                    return None
+            if isinstance(e, discord.Forbidden):
+                log.error(f"Cannot send to {recipient.key} (DMs disabled or missing access?)")
+            else:
+                log.error(f"Failed to send to {recipient.key}: {e}")
+        except discord.DiscordException as e:
+            log.error(f"Failed to send to {recipient.key}: {e}")
+            return None
+    return None
+
+
+@dataclass
+class WebhookEndpoint:
+    """A served webhook path with its own router, dedupe index, digest and queue."""
+    config: EndpointConfig
+    router: Router
+    currencies: DisplayCurrencies = field(init=False)
+    queue: DeliveryQueue | None = None
+    dedupe: DedupeIndex | None = None
+    digest: DigestBuffer[DiscordNotificationPayload] | None = None
+
+    def __post_init__(self) -> None:
+        self.currencies = DisplayCurrencies.from_config(
+            self.config.display_currency, settings.discord_recipient_currencies
+        )
+
+    @property
+    def name(self) -> str:
+        """Endpoint name used in logs and its queue file name."""
+        return self.config.name
 
 
 @dataclass
 class WebhookReceiver:
-    """HTTP webhook receiver that forwards ai-goofish-monitor events to Discord DMs."""
+    """HTTP webhook receiver that forwards ai-goofish-monitor events to Discord.
+
+    Serves one endpoint per configured monitor instance on a single site;
+    the enrichment services, dispatcher and recipient cache are shared.
+    Each webhook is enriched once and the rendered payload is sent to
+    every recipient its endpoint's routing rules select."""
     bot: discord.Client
+    services: EnrichmentServices = field(default_factory=EnrichmentServices.from_settings)
+    recipients: RecipientCache = field(init=False)
+    dispatcher: DMDispatcher = field(
+        default_factory=lambda: DMDispatcher(
+            rate=settings.discord_send_rate_per_second,
+            burst=settings.discord_send_burst,
+            max_retries=settings.discord_send_max_retries,
+        )
+    )
+    router: Router = field(
+        default_factory=lambda: Router.from_config(
+            settings.discord_routes, settings.discord_user_id
+        )
+    )
+    # Extra endpoints; when empty, start() serves a single one from its arguments.
+    endpoint_configs: list[EndpointConfig] = field(
+        default_factory=lambda: load_endpoints(settings.webhook_endpoints)
+    )
+    carousels: CarouselStore = field(
+        default_factory=lambda: CarouselStore(
+            SqliteKVStore(settings.data_dir / "cache.sqlite3", table="carousels"),
+            ttl=settings.carousel_ttl_seconds,
+            max_entries=settings.carousel_cache_max_entries,
+            max_stored=settings.carousel_store_max_entries,
+        )
+    )
 
     _runner: web.AppRunner | None = None
     _site: web.TCPSite | None = None
-    _secret: str = ""
-    _path: str = "/webhook/ai-goofish-monitor"
+    _endpoints: list[WebhookEndpoint] = field(default_factory=list)
+    _endpoint_by_resource: dict[web.AbstractResource, WebhookEndpoint] = field(
+        default_factory=dict
+    )
+    _max_body_bytes: int = 1024 * 1024
+
+    def __post_init__(self) -> None:
+        self.recipients = RecipientCache(self.bot)
+
+    async def warm_up(self) -> None:
+        """Resolve every routable recipient's channel before the first webhook arrives."""
+        routers = [endpoint.router for endpoint in self._endpoints] or [self.router]
+        seen: dict[str, Recipient] = {}
+        for router in routers:
+            for recipient in router.all_recipients:
+                seen.setdefault(recipient.key, recipient)
+        await self.recipients.warm_up(list(seen.values()))
 
     async def start(self, host: str, port: int, path: str, secret: str) -> None:
-        """Start the aiohttp webhook HTTP server on the given host and port."""
+        """Start the aiohttp webhook HTTP server on the given host and port.
+
+        Serves every configured endpoint, or a single endpoint at ``path``
+        guarded by ``secret`` and routed by :attr:`router` if none are."""
         if self._runner:
             return
 
-        self._secret = secret or ""
-        self._path = path or "/webhook/ai-goofish-monitor"
-
-        app = web.Application()
-        app.router.add_route("*", self._path, self._handle)
+        if self.endpoint_configs:
+            endpoints = [
+                WebhookEndpoint(config, config.build_router()) for config in self.endpoint_configs
+            ]
+        else:
+            config = default_endpoint(path or "/webhook/ai-goofish-monitor", secret or "")
+            endpoints = [WebhookEndpoint(config, self.router)]
+
+        # One handler serves every carousel button, including ones sent before a restart.
+        CarouselButton.store = self.carousels
+        self.bot.add_dynamic_items(CarouselButton)
+        await self.services.start()
+
+        self._max_body_bytes = max(1024, settings.webhook_max_body_bytes)
+        # aiohttp enforces client_max_size while reading, so chunked bodies are cut off too.
+        app = web.Application(
+            client_max_size=self._max_body_bytes, middlewares=[self._auth_middleware]
+        )
+        for endpoint in endpoints:
+            await self._open_endpoint(endpoint)
+            self._endpoints.append(endpoint)
+            route = app.router.add_route("*", endpoint.config.path, self._handler_for(endpoint))
+            if route.resource is not None:
+                self._endpoint_by_resource[route.resource] = endpoint
+        health_path = settings.webhook_health_path
+        if health_path and all(e.config.path != health_path for e in endpoints):
+            app.router.add_get(health_path, self._handle_health)
 
         self._runner = web.AppRunner(app)
         await self._runner.setup()
@@ -809,50 +998,326 @@ class WebhookReceiver:
         self._site = web.TCPSite(self._runner, host=host, port=port)
         await self._site.start()
 
-        log.info(f"Webhook receiver listening on http://{host}:{port}{self._path}")
+        for endpoint in endpoints:
+            log.info(
+                "Webhook endpoint %r listening on http://%s:%s%s",
+                endpoint.name,
+                host,
+                port,
+                endpoint.config.path,
+            )
+
+    async def _open_endpoint(self, endpoint: WebhookEndpoint) -> None:
+        """Start the delivery queue and open the dedupe index and digest of one endpoint."""
+        config = endpoint.config
+        db_path = settings.data_dir / config.queue_filename
+
+        async def deliver(job: DeliveryJob) -> asyncio.Future[Any] | None:
+            return await self._deliver(endpoint, job)
+
+        endpoint.queue = DeliveryQueue(
+            deliver,
+            DeliveryJournal(db_path),
+            max_size=config.queue_size,
+            workers=config.workers,
+        )
+        await endpoint.queue.start()
+
+        endpoint.dedupe = DedupeIndex(
+            SqliteKVStore(db_path, table="dedupe"),
+            window=config.dedupe_window_seconds,
+            max_entries=config.dedupe_max_entries,
+        )
+
+        if config.digest_enabled:
+            endpoint.digest = DigestBuffer(
+                self._flush_digest,
+                window=config.digest_window_seconds,
+                max_items=config.digest_max_items,
+            )
+
+    async def _close_endpoint(self, endpoint: WebhookEndpoint) -> None:
+        """Stop an endpoint's workers, flush its digest and close its journal.
+
+        Workers stop first so nothing new reaches the digest; alerts it
+        flushes then leave the journal before it is closed."""
+        if endpoint.queue is not None:
+            await endpoint.queue.stop_workers()
+        if endpoint.digest is not None:
+            await endpoint.digest.close()
+            endpoint.digest = None
+        if endpoint.queue is not None:
+            await endpoint.queue.stop()
+            endpoint.queue = None
+
+    def _handler_for(
+        self, endpoint: WebhookEndpoint
+    ) -> Callable[[web.Request], Awaitable[web.StreamResponse]]:
+        """Bind the request handler to one endpoint."""
+
+        async def handle(request: web.Request) -> web.StreamResponse:
+            return await self._handle(endpoint, request)
+
+        return handle
 
     async def stop(self) -> None:
-        """Gracefully shut down the HTTP server."""
+        """Gracefully shut down the HTTP server, delivery workers and HTTP client."""
         if not self._runner:
+            await self.services.close()
             return
 
+        log.info("Webhook receiver metrics at shutdown: %s", jsoncodec.dumps_text(self.metrics()))
         try:
             await self._runner.cleanup()
         finally:
             self._runner = None
             self._site = None
+            endpoints, self._endpoints = self._endpoints, []
+            self._endpoint_by_resource.clear()
+            # Digests flush through the dispatcher, so close them before it.
+            for endpoint in endpoints:
+                await self._close_endpoint(endpoint)
+            await self.dispatcher.close()
+            for endpoint in endpoints:
+                if endpoint.dedupe is not None:
+                    await endpoint.dedupe.close()
+                    endpoint.dedupe = None
+            await self.carousels.close()
+            await self.services.close()
+
+    def metrics(self) -> dict[str, Any]:
+        """Queue depths, Discord send stats, executor pools and circuit breaker states."""
+        return {
+            "endpoints": {
+                endpoint.name: {
+                    "queue_depth": endpoint.queue.depth if endpoint.queue is not None else 0,
+                    "digest_buffered": len(endpoint.digest) if endpoint.digest is not None else 0,
+                }
+                for endpoint in self._endpoints
+            },
+            "discord": asdict(self.dispatcher.stats),
+            "executors": {
+                stats.name: {**asdict(stats), "avg_wait_seconds": stats.avg_wait_seconds}
+                for stats in executor_stats()
+            },
+            "breakers": {
+                host: state.value for host, state in self.services.http.breakers.states().items()
+            },
+        }
 
-    async def _handle(self, request: web.Request) -> web.StreamResponse:
-        """Handle an incoming webhook request.
+    async def _handle_health(self, request: web.Request) -> web.StreamResponse:
+        """Serve :meth:`metrics` as JSON; the route carries no secret."""
+        return web.json_response({"ok": True, **self.metrics()}, dumps=jsoncodec.dumps_text)
+
+    async def _deliver(
+        self, endpoint: WebhookEndpoint, job: DeliveryJob
+    ) -> asyncio.Future[Any] | None:
+        """Deliver a queued webhook to its recipients, or add it to their digests.
+
+        In digest mode the returned future resolves once every digest holding
+        the alert has been sent, so the job stays journaled until then."""
+        if not endpoint.router.all_recipients:
+            log.warning(
+                "No recipients configured for endpoint %r; dropping webhook notification",
+                endpoint.name,
+            )
+            return None
 
-        Validates the shared secret, parses JSON or form data,
-        filters auth-expiry noise, and dispatches a Discord DM."""
-        if self._secret:
-            header_secret = request.headers.get("x-webhook-secret") or request.headers.get(
-                "X-Webhook-Secret"
+        payload = await _build_discord_payload(
+            job.title, job.content, job.payload, self.services, endpoint.currencies.default
+        )
+        targets = endpoint.router.route(payload.routing)
+        if not targets:
+            log.warning(
+                "No routing rule or default recipient matched webhook for endpoint %r; "
+                "dropping webhook notification",
+                endpoint.name,
             )
-            query_secret = request.query.get("secret")
-            if (header_secret or query_secret) != self._secret:
-                return web.json_response({"ok": False, "error": "unauthorized"}, status=401)
+            return None
+        targets = await self._claim_recipients(endpoint, job, targets)
+        # Enriched once; recipients with another display currency get a re-rendered copy.
+        localized: dict[str, DiscordNotificationPayload] = {}
+        sends: list[tuple[Recipient, DiscordNotificationPayload]] = []
+        for target in targets:
+            currency = endpoint.currencies.for_recipient(target)
+            if currency not in localized:
+                localized[currency] = _localize_payload(payload, currency, self.services)
+            sends.append((target, localized[currency]))
+
+        if endpoint.digest is not None:
+            flushed = [
+                await endpoint.digest.add(target.key, target_payload)
+                for target, target_payload in sends
+            ]
+            return asyncio.gather(*flushed)
+
+        for variant in localized.values():
+            if variant.carousel is not None:
+                self.carousels.put(*variant.carousel)
+        # Views are stateless, so recipients with the same currency share one.
+        results = await asyncio.gather(
+            *(
+                _send_to_recipient(self.recipients, self.dispatcher, target, p.embeds, p.view)
+                for target, p in sends
+            ),
+            return_exceptions=True,
+        )
+        # One recipient failing must not fail (and re-send) the job for the others.
+        for (target, _), result in zip(sends, results, strict=True):
+            if isinstance(result, Exception):
+                log.error("Failed to send to %s: %s", target.key, result)
+            elif isinstance(result, BaseException):
+                raise result
+        return None
+
+    async def _claim_recipients(
+        self, endpoint: WebhookEndpoint, job: DeliveryJob, targets: list[Recipient]
+    ) -> list[Recipient]:
+        """Claim the item + price per recipient, dropping recipients that already got it.
+
+        Several monitor tasks may match one item; each recipient gets it once."""
+        dedupe = endpoint.dedupe
+        if dedupe is None:
+            return targets
+        keys = _dedupe_keys(job.payload, job.content)
+        item_keys = [key for key in keys if key.startswith("item:")]
+        if not item_keys:
+            return targets
+        unclaimed: list[Recipient] = []
+        for target in targets:
+            if await dedupe.claim(_recipient_dedupe_keys(item_keys, [target])):
+                log.info("Suppressed duplicate alert %s for %s", item_keys[0], target.key)
+            else:
+                unclaimed.append(target)
+        return unclaimed
+
+    async def _flush_digest(self, key: str, payloads: list[DiscordNotificationPayload]) -> None:
+        """Send buffered alerts for one recipient as packed multi-embed messages."""
+        recipient = Recipient.parse(key)
+        messages = _build_digest_messages(payloads)
+        log.info(
+            "Sending digest of %d alerts to %s in %d messages",
+            len(payloads),
+            recipient.key,
+            len(messages),
+        )
+        for embeds, view in messages:
+            await _send_to_recipient(self.recipients, self.dispatcher, recipient, embeds, view)
 
-        payload: Any
+    @web.middleware
+    async def _auth_middleware(
+        self,
+        request: web.Request,
+        handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+    ) -> web.StreamResponse:
+        """Reject unauthenticated requests before any body is read or parsed.
+
+        Accepts the shared secret in the ``X-Webhook-Secret`` header (or the
+        ``secret`` query parameter unless disabled), or an HMAC-SHA256
+        signature of the raw body in ``X-Webhook-Signature``. Only the
+        signature path reads the body, which the handler then reuses.
+        Each endpoint is checked against its own secret."""
+        endpoint = self._endpoint_by_resource.get(request.match_info.route.resource)
+        secret = endpoint.config.secret if endpoint is not None else ""
+        if not secret:
+            return await handler(request)
+
+        provided = request.headers.get(_SECRET_HEADER)
+        if provided is None and settings.webhook_allow_query_secret:
+            provided = request.query.get("secret")
+        if provided is not None:
+            if _secret_matches(provided, secret):
+                return await handler(request)
+            return web.json_response({"ok": False, "error": "unauthorized"}, status=401)
+
+        signature = request.headers.get(_SIGNATURE_HEADER)
+        if signature is None:
+            return web.json_response({"ok": False, "error": "unauthorized"}, status=401)
+        if "multipart/form-data" in (request.content_type or "").lower():
+            # The multipart parser needs the unread stream, so it cannot be signed.
+            return web.json_response(
+                {"ok": False, "error": "signed multipart bodies are not supported"}, status=415
+            )
+        content_length = request.content_length
+        if content_length is not None and content_length > self._max_body_bytes:
+            return web.json_response({"ok": False, "error": "payload too large"}, status=413)
+        try:
+            body = await request.read()
+        except web.HTTPRequestEntityTooLarge:
+            return web.json_response({"ok": False, "error": "payload too large"}, status=413)
+        if not _signature_matches(signature, secret, body):
+            return web.json_response({"ok": False, "error": "bad signature"}, status=401)
+        return await handler(request)
+
+    async def _handle(
+        self, endpoint: WebhookEndpoint, request: web.Request
+    ) -> web.StreamResponse:
+        """Handle an incoming webhook request for one endpoint.
+
+        Parses JSON or form data (auth already passed in the middleware),
+        filters auth-expiry noise and duplicates, and queues the notification
+        for delivery. Responds with 503 once the delivery queue is full."""
+        content_length = request.content_length
+        if content_length is not None and content_length > self._max_body_bytes:
+            return web.json_response({"ok": False, "error": "payload too large"}, status=413)
+
+        monitor: MonitorPayload
         ctype = (request.content_type or "").lower()
         try:
-            if "json" in ctype:
-                payload = await request.json()
-            elif "application/x-www-form-urlencoded" in ctype or "multipart/form-data" in ctype:
+            if "multipart/form-data" in ctype:
                 form = await request.post()
-                payload = dict(form)
+                monitor = MonitorPayload.from_data(dict(form))
             else:
-                payload = await request.text()
-        except Exception:
-            payload = await request.text()
+                # Read once; every parsing attempt works on the same bytes.
+                body = await request.read()
+                monitor = _decode_webhook_body(ctype, request.charset, body)
+        except web.HTTPRequestEntityTooLarge:
+            return web.json_response({"ok": False, "error": "payload too large"}, status=413)
+        except (ValueError, aiohttp.ClientError) as e:
+            log.info("Rejected malformed webhook body: %s", e)
+            return web.json_response({"ok": False, "error": "malformed body"}, status=400)
 
-        title, content = _extract_title_content(payload)
+        title, content, payload = monitor.title, monitor.content, monitor.data
 
         if _should_drop_notification(title, content):
             log.info("Dropped auth-expired webhook notification: %s", _truncate(content, 200))
             return web.json_response({"ok": True, "dropped": True})
 
-        asyncio.create_task(_send_discord_dm(self.bot, title, content, payload))
+        queue, dedupe = endpoint.queue, endpoint.dedupe
+        if queue is None or dedupe is None:
+            return web.json_response({"ok": False, "error": "not running"}, status=503)
+
+        idempotency_key = next(
+            (request.headers[h] for h in _IDEMPOTENCY_HEADERS if h in request.headers), ""
+        )
+        dedupe_keys = _dedupe_keys(payload, content, idempotency_key)
+        item_keys = [key for key in dedupe_keys if key.startswith("item:")]
+        if item_keys:
+            # An item is a duplicate once every recipient it routes to has received it;
+            # per-recipient keys are claimed in _deliver.
+            listing = _extract_listing_notification(payload, content)
+            targets = endpoint.router.route(_routing_context(payload, listing))
+            if await dedupe.contains(_recipient_dedupe_keys(item_keys, targets)):
+                log.info("Suppressed duplicate webhook notification: %s", item_keys)
+                return web.json_response({"ok": True, "duplicate": True})
+        dedupe_keys = [key for key in dedupe_keys if key not in item_keys]
+        if await dedupe.claim(dedupe_keys):
+            log.info("Suppressed duplicate webhook notification: %s", dedupe_keys)
+            return web.json_response({"ok": True, "duplicate": True})
+
+        try:
+            await queue.submit(title, content, payload)
+        except QueueFullError:
+            dedupe.release(dedupe_keys)
+            log.warning("Delivery queue for %r full; rejecting webhook with 503", endpoint.name)
+            return web.json_response(
+                {"ok": False, "error": "queue full"},
+                status=503,
+                headers={"Retry-After": "30"},
+            )
+        except Exception as e:
+            dedupe.release(dedupe_keys)
+            log.error("Failed to journal webhook: %s", e)
+            return web.json_response({"ok": False, "error": "journal error"}, status=503)
+
         return web.json_response({"ok": True})
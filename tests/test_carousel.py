@@ -0,0 +1,110 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, cast
+
+import discord
+
+from core.carousel import (
+    CarouselButton,
+    CarouselState,
+    CarouselStore,
+    build_carousel_view,
+    carousel_key,
+    render_carousel_embed,
+)
+from core.kvstore import SqliteKVStore
+
+
+def _state(count: int = 3) -> CarouselState:
+    return CarouselState(
+        embed=discord.Embed(title="Switch OLED").to_dict(),
+        images=[f"https://img.example/{i}.jpg" for i in range(count)],
+        links=[("Goofish", "https://www.goofish.com/item?id=1")],
+    )
+
+
+def test_carousel_view_encodes_neighbour_indices() -> None:
+    view = build_carousel_view("123", _state(), index=0)
+    custom_ids = [getattr(item, "custom_id", None) for item in view.children]
+    assert custom_ids[:2] == ["gw:car:123:2:p", "gw:car:123:1:n"]
+    assert view.timeout is None
+    assert len(view.children) == 3
+
+    single = build_carousel_view("123", _state(1))
+    assert all(cast(CarouselButton, item).item.disabled for item in single.children[:2])
+
+    embed = render_carousel_embed(_state(), 4)
+    assert embed.image.url == "https://img.example/1.jpg"
+    assert embed.footer.text == "Image 2/3"
+
+
+def test_carousel_pages_are_rendered_once() -> None:
+    state = _state()
+    first = state.page("123", 1)
+    assert state.page("123", 4) is first
+    assert first[0].image.url == "https://img.example/1.jpg"
+    assert state.page("123", 0) is not first
+
+
+def test_carousel_key_is_unique_per_notification() -> None:
+    key = carousel_key("123", _state())
+    assert key.startswith("123-")
+    assert carousel_key("123", _state()) == key
+    price_drop = _state()
+    price_drop.embed = {**price_drop.embed, "description": "cheaper"}
+    assert carousel_key("123", price_drop) != key
+    assert carousel_key("", _state()).startswith("h")
+    assert carousel_key("9" * 60, _state()).startswith("h")
+
+
+def test_carousel_store_evicts_to_disk_and_reloads(tmp_path: Path) -> None:
+    async def scenario() -> tuple[int, CarouselState | None, CarouselState | None]:
+        store = CarouselStore(
+            SqliteKVStore(tmp_path / "cache.sqlite3", table="carousels"), max_entries=1
+        )
+        store.put("1", _state())
+        store.put("2", _state(2))
+        await store.close()
+
+        reopened = CarouselStore(
+            SqliteKVStore(tmp_path / "cache.sqlite3", table="carousels"), max_entries=1
+        )
+        first = await reopened.get("1")
+        missing = await reopened.get("404")
+        size = len(reopened)
+        await reopened.close()
+        return size, first, missing
+
+    size, first, missing = asyncio.run(scenario())
+    assert size == 1
+    assert first == _state()
+    assert missing is None
+
+
+def test_carousel_button_click_edits_to_requested_image() -> None:
+    edits: list[dict[str, Any]] = []
+
+    async def edit_message(**kwargs: Any) -> None:
+        edits.append(kwargs)
+
+    interaction = SimpleNamespace(response=SimpleNamespace(edit_message=edit_message))
+
+    async def scenario() -> None:
+        store = CarouselStore(None)
+        store.put("123", _state())
+        CarouselButton.store = store
+        try:
+            match = CarouselButton.__discord_ui_compiled_template__.fullmatch("gw:car:123:2:n")
+            assert match is not None
+            button = await CarouselButton.from_custom_id(
+                cast(Any, interaction), cast(Any, None), match
+            )
+            await button.callback(cast(Any, interaction))
+        finally:
+            CarouselButton.store = None
+
+    asyncio.run(scenario())
+    assert edits[0]["embed"].image.url == "https://img.example/2.jpg"
+    next_button = edits[0]["view"].children[1]
+    assert next_button.custom_id == "gw:car:123:0:n"
@@ -0,0 +1,69 @@
+import pytest
+
+from core.circuit_breaker import BreakerRegistry, BreakerState, CircuitBreaker, CircuitOpenError
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_on_failures_and_slow_calls_then_probes() -> None:
+    clock = _Clock()
+    breaker = CircuitBreaker(
+        "translate", window=4, min_calls=4, slow_call_seconds=1.0, open_seconds=30, clock=clock
+    )
+    for _ in range(2):
+        breaker.record_success(breaker.before_call())
+    breaker.record_failure(breaker.before_call())
+    started = breaker.before_call()
+    clock.now += 2.0
+    breaker.record_success(started)
+    assert breaker.state is BreakerState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 30
+    assert breaker.state is BreakerState.HALF_OPEN
+    probe = breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure(probe)
+    assert breaker.state is BreakerState.OPEN
+
+    clock.now += 30
+    breaker.record_success(breaker.before_call())
+    assert breaker.state is BreakerState.CLOSED
+
+
+def test_cancelled_fast_call_releases_the_probe() -> None:
+    clock = _Clock()
+    breaker = BreakerRegistry(min_calls=1, open_seconds=0, clock=clock).get("goofish.com")
+    breaker.record_failure(breaker.before_call())
+    started = breaker.before_call()
+    breaker.record_cancelled(started)
+    assert breaker.state is BreakerState.HALF_OPEN
+    breaker.record_success(breaker.before_call())
+    assert breaker.state is BreakerState.CLOSED
+
+
+def test_only_the_probe_moves_the_breaker_out_of_half_open() -> None:
+    clock = _Clock()
+    breaker = CircuitBreaker("goofish.com", min_calls=1, open_seconds=30, clock=clock)
+    late_success, late_failure = breaker.before_call(), breaker.before_call()
+    breaker.record_failure(breaker.before_call())
+    assert breaker.state is BreakerState.OPEN
+
+    clock.now += 30
+    probe = breaker.before_call()
+    assert probe.probe
+    # Calls admitted before the breaker opened finish late and are ignored.
+    breaker.record_success(late_success)
+    assert breaker.state is BreakerState.HALF_OPEN
+    breaker.record_success(probe)
+    assert breaker.state is BreakerState.CLOSED
+    breaker.record_failure(late_failure)
+    assert breaker.state is BreakerState.CLOSED
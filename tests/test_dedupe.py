@@ -0,0 +1,110 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, cast
+
+import pytest
+
+import core.webhook_receiver as webhook_receiver
+from core.dedupe import DedupeIndex
+from core.delivery_queue import DeliveryJob
+from core.endpoints import default_endpoint
+from core.kvstore import SqliteKVStore
+from core.routing import Recipient, Router, RoutingContext, RoutingRule
+from core.webhook_receiver import (
+    DiscordNotificationPayload,
+    WebhookEndpoint,
+    WebhookReceiver,
+    _dedupe_keys,
+)
+
+
+def test_dedupe_keys_use_item_id_and_price() -> None:
+    content = "Price: ¥888\nPC link: https://www.goofish.com/item?id=9876543210"
+    assert _dedupe_keys(content, content) == ["item:9876543210:888.00"]
+    assert _dedupe_keys(content, content, "abc") == ["idem:abc", "item:9876543210:888.00"]
+    assert _dedupe_keys("hello", "hello") == []
+
+
+def test_claim_suppresses_repeats_until_released() -> None:
+    async def scenario() -> list[bool]:
+        index = DedupeIndex(window=60)
+        results = [await index.claim(["item:1:10.00"]), await index.claim(["item:1:10.00"])]
+        index.release(["item:1:10.00"])
+        results.append(await index.claim(["item:1:10.00"]))
+        results.append(await index.claim(["item:1:9.00"]))
+        return results
+
+    assert asyncio.run(scenario()) == [False, True, False, False]
+
+
+def test_claim_is_bounded_and_expires() -> None:
+    async def scenario() -> tuple[int, bool]:
+        index = DedupeIndex(window=0.01, max_entries=3)
+        for i in range(10):
+            await index.claim([f"k{i}"])
+        size = len(index)
+        await asyncio.sleep(0.02)
+        return size, await index.claim(["k9"])
+
+    assert asyncio.run(scenario()) == (3, False)
+
+
+def test_claims_survive_restart(tmp_path: Path) -> None:
+    path = tmp_path / "dedupe.sqlite3"
+
+    async def first() -> None:
+        index = DedupeIndex(SqliteKVStore(path, table="dedupe"), window=60)
+        await index.claim(["idem:abc"])
+        await index.close()
+
+    async def second() -> bool:
+        index = DedupeIndex(SqliteKVStore(path, table="dedupe"), window=60)
+        try:
+            return await index.claim(["idem:abc"])
+        finally:
+            await index.close()
+
+    asyncio.run(first())
+    assert asyncio.run(second()) is True
+
+
+def test_deliver_sends_an_item_once_per_recipient(monkeypatch: pytest.MonkeyPatch) -> None:
+    link = "https://www.goofish.com/item?id=9876543210"
+    sent: list[str] = []
+
+    async def fake_build(title: str, content: str, raw: Any, services: Any, currency: str) -> Any:
+        return DiscordNotificationPayload(
+            embeds=[], view=None, routing=RoutingContext(task_name=raw["task_name"])
+        )
+
+    async def fake_send(
+        recipients: Any, dispatcher: Any, recipient: Recipient, embeds: Any, view: Any
+    ) -> None:
+        sent.append(recipient.key)
+
+    monkeypatch.setattr(webhook_receiver, "_build_discord_payload", fake_build)
+    monkeypatch.setattr(webhook_receiver, "_send_to_recipient", fake_send)
+
+    async def scenario() -> bool:
+        receiver = WebhookReceiver(
+            cast(Any, SimpleNamespace()), services=cast(Any, None), dispatcher=cast(Any, None)
+        )
+        endpoint = WebhookEndpoint(
+            default_endpoint("/hook", ""),
+            Router(
+                [RoutingRule(recipients=["user:7"], task_names=["other"])],
+                [Recipient("user", 5)],
+            ),
+        )
+        endpoint.dedupe = DedupeIndex(window=60)
+        for job_id, task in enumerate(("a", "b", "other"), start=1):
+            job_payload = {"task_name": task, "price": "888", "link": link}
+            await receiver._deliver(endpoint, DeliveryJob(job_id, "alert", "", job_payload, 0.0))
+        return await endpoint.dedupe.contains(
+            ["item:9876543210:888.00:user:5", "item:9876543210:888.00:user:7"]
+        )
+
+    assert asyncio.run(scenario())
+    # Tasks a and b both route to user:5, who is notified once; task "other" still reaches user:7.
+    assert sent == ["user:5", "user:7"]
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from core.delivery_queue import DeliveryJob, DeliveryJournal, DeliveryQueue, QueueFullError
+
+
+def test_journal_round_trip(tmp_path: Path) -> None:
+    journal = DeliveryJournal(tmp_path / "queue.sqlite3")
+    first = journal.append("t1", "c1", {"meta": {"price": 1}})
+    journal.append("t2", "c2", "raw text")
+
+    pending = journal.pending()
+    assert [job.title for job in pending] == ["t1", "t2"]
+    assert pending[0].payload == {"meta": {"price": 1}}
+    assert pending[1].payload == "raw text"
+
+    journal.remove(first.job_id)
+    assert [job.title for job in journal.pending()] == ["t2"]
+    journal.close()
+
+
+def test_queue_rejects_when_full(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        release = asyncio.Event()
+
+        async def handler(_: DeliveryJob) -> None:
+            await release.wait()
+
+        queue = DeliveryQueue(handler, DeliveryJournal(tmp_path / "q.sqlite3"), 2, 1)
+        await queue.start()
+        await queue.submit("a", "", {})
+        await queue.submit("b", "", {})
+        with pytest.raises(QueueFullError):
+            await queue.submit("c", "", {})
+        release.set()
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+
+def test_queue_replays_undelivered_jobs(tmp_path: Path) -> None:
+    path = tmp_path / "q.sqlite3"
+    journal = DeliveryJournal(path)
+    journal.append("left over", "", {"id": 1})
+    journal.close()
+
+    async def scenario() -> list[str]:
+        delivered: list[str] = []
+
+        async def handler(job: DeliveryJob) -> None:
+            delivered.append(job.title)
+
+        queue = DeliveryQueue(handler, DeliveryJournal(path), 10, 2)
+        await queue.start()
+        await asyncio.wait_for(queue.join(), timeout=5)
+        await queue.stop()
+        return delivered
+
+    assert asyncio.run(scenario()) == ["left over"]
+    assert DeliveryJournal(path).pending() == []
+
+
+def test_handed_off_jobs_stay_journaled_until_resolved(tmp_path: Path) -> None:
+    path = tmp_path / "q.sqlite3"
+
+    async def scenario() -> tuple[int, int]:
+        flushed = asyncio.get_running_loop().create_future()
+
+        async def handler(_: DeliveryJob) -> asyncio.Future[None]:
+            return flushed
+
+        queue = DeliveryQueue(handler, DeliveryJournal(path), 10, 1)
+        await queue.start()
+        await queue.submit("buffered", "", {})
+        await queue.submit("also buffered", "", {})
+        await asyncio.sleep(0.05)
+        held = queue.depth
+        flushed.set_result(None)
+        await asyncio.wait_for(queue.join(), timeout=5)
+        done = queue.depth
+        await queue.stop()
+        return held, done
+
+    assert asyncio.run(scenario()) == (2, 0)
+    assert DeliveryJournal(path).pending() == []
+
+    async def crash_before_flush() -> None:
+        async def handler(_: DeliveryJob) -> asyncio.Future[None]:
+            return asyncio.get_running_loop().create_future()
+
+        queue = DeliveryQueue(handler, DeliveryJournal(path), 10, 1)
+        await queue.start()
+        await queue.submit("lost digest", "", {})
+        await asyncio.sleep(0.05)
+        await queue.stop()
+
+    started = time.monotonic()
+    asyncio.run(crash_before_flush())
+    assert time.monotonic() - started < 3
+    assert [job.title for job in DeliveryJournal(path).pending()] == ["lost digest"]
@@ -0,0 +1,51 @@
+import asyncio
+
+import discord
+
+from core.digest import DigestBuffer, pack_by_size
+from core.webhook_receiver import DiscordNotificationPayload, _build_digest_messages
+
+
+def test_pack_by_size_respects_count_and_chars() -> None:
+    assert pack_by_size([10] * 12) == [list(range(10)), [10, 11]]
+    assert pack_by_size([3000, 2500, 1000, 7000]) == [[0, 1], [2], [3]]
+
+
+def test_digest_buffer_flushes_on_count_and_window() -> None:
+    flushed: list[tuple[str, list[int]]] = []
+
+    async def flush(key: str, items: list[int]) -> None:
+        flushed.append((key, items))
+
+    async def scenario() -> None:
+        buffer: DigestBuffer[int] = DigestBuffer(flush, window=0.02, max_items=3)
+        futures = [await buffer.add("user", i) for i in range(4)]
+        assert flushed == [("user", [0, 1, 2])]
+        assert futures[0].done() and not futures[3].done()
+        await asyncio.sleep(0.05)
+        assert futures[3].done()
+        await buffer.close()
+
+    asyncio.run(scenario())
+    assert flushed == [("user", [0, 1, 2]), ("user", [3])]
+
+
+def test_build_digest_messages_numbers_embeds_and_links() -> None:
+    async def scenario() -> list[tuple[list[discord.Embed], discord.ui.View | None]]:
+        payloads = [
+            DiscordNotificationPayload(
+                embeds=[discord.Embed(title=f"full {i}")],
+                view=None,
+                digest_embed=discord.Embed(title=f"item {i}"),
+                links=[("Goofish", f"https://www.goofish.com/item?id={i}")],
+            )
+            for i in range(12)
+        ]
+        return _build_digest_messages(payloads)
+
+    messages = asyncio.run(scenario())
+    assert [len(embeds) for embeds, _ in messages] == [10, 2]
+    first_embeds, first_view = messages[0]
+    assert first_embeds[0].title == "1. item 0"
+    assert first_view is not None
+    assert len(first_view.children) == 10
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, cast
+
+import discord
+import pytest
+
+from core.dm_dispatcher import DMDispatcher, RecipientCache, TokenBucket
+from core.routing import Recipient
+
+
+def _http_error(status: int, retry_after: str = "") -> discord.HTTPException:
+    response = SimpleNamespace(status=status, reason="", headers={"Retry-After": retry_after})
+    return discord.HTTPException(cast(Any, response), "error")
+
+
+class FakeTarget:
+    def __init__(self, failures: list[Exception] | None = None) -> None:
+        self.failures = list(failures or [])
+        self.sent: list[dict[str, Any]] = []
+
+    async def send(self, **kwargs: Any) -> str:
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append(kwargs)
+        return f"message-{len(self.sent)}"
+
+
+def test_token_bucket_paces_after_burst() -> None:
+    async def scenario() -> float:
+        bucket = TokenBucket(rate=20, burst=2)
+        started = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.09
+
+
+def test_dispatcher_sends_in_order() -> None:
+    target = FakeTarget()
+
+    async def scenario() -> list[Any]:
+        dispatcher = DMDispatcher(rate=100, burst=10)
+        results = await asyncio.gather(
+            *(dispatcher.send("user", cast(Any, target), content=str(i)) for i in range(3))
+        )
+        await dispatcher.close()
+        return results
+
+    assert asyncio.run(scenario()) == ["message-1", "message-2", "message-3"]
+    assert [m["content"] for m in target.sent] == ["0", "1", "2"]
+
+
+def test_dispatcher_retries_rate_limits() -> None:
+    target = FakeTarget([_http_error(429, "0.01"), _http_error(502)])
+
+    async def scenario() -> tuple[Any, int]:
+        dispatcher = DMDispatcher(rate=100, burst=10, base_backoff=0.01)
+        result = await dispatcher.send("user", cast(Any, target), content="hi")
+        await dispatcher.close()
+        return result, dispatcher.stats.retries
+
+    assert asyncio.run(scenario()) == ("message-1", 2)
+
+
+def test_dispatcher_does_not_retry_client_errors() -> None:
+    target = FakeTarget([_http_error(400), _http_error(400)])
+
+    async def scenario() -> None:
+        dispatcher = DMDispatcher(rate=100, burst=10, base_backoff=0.01)
+        try:
+            await dispatcher.send("user", cast(Any, target), content="hi")
+        finally:
+            await dispatcher.close()
+
+    with pytest.raises(discord.HTTPException):
+        asyncio.run(scenario())
+    assert len(target.failures) == 1
+
+
+class FakeUser:
+    def __init__(self, user_id: int) -> None:
+        self.id = user_id
+        self.dm_channel = None
+
+    async def create_dm(self) -> Any:
+        return SimpleNamespace(id=self.id * 10)
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.fetches = 0
+
+    def get_user(self, user_id: int) -> None:
+        return None
+
+    async def fetch_user(self, user_id: int) -> FakeUser:
+        self.fetches += 1
+        return FakeUser(user_id)
+
+
+def test_recipient_cache_resolves_once_until_invalidated() -> None:
+    client = FakeClient()
+
+    async def scenario() -> list[Any]:
+        cache = RecipientCache(cast(Any, client))
+        user = Recipient("user", 7)
+        first = await asyncio.gather(*(cache.resolve(user) for _ in range(3)))
+        cache.invalidate(user)
+        return [*first, await cache.resolve(user)]
+
+    channels = asyncio.run(scenario())
+    assert {channel.id for channel in channels} == {70}
+    assert client.fetches == 2
@@ -0,0 +1,123 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, cast
+
+import aiohttp
+import pytest
+
+from config import settings
+from core.delivery_queue import DeliveryJob
+from core.endpoints import default_endpoint, load_endpoints
+from core.routing import Recipient, Router
+from core.webhook_receiver import EnrichmentServices, WebhookEndpoint, WebhookReceiver
+
+
+def test_load_endpoints_inherits_globals_and_skips_invalid(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "discord_user_id", 9)
+    monkeypatch.setattr(settings, "webhook_queue_size", 42)
+    endpoints = load_endpoints(
+        [
+            {
+                "name": "switch",
+                "path": "/hooks/switch",
+                "recipients": ["channel:1"],
+                "routes": [{"recipients": ["user:2"], "keywords": ["oled"]}, {"recipients": []}],
+                "workers": 1,
+            },
+            {"name": "lego", "path": "/hooks/lego"},
+            {"name": "dup", "path": "/hooks/lego"},
+            {"name": "bad name", "path": "/x"},
+            {"name": "nopath", "path": "relative"},
+        ]
+    )
+    assert [e.name for e in endpoints] == ["switch", "lego"]
+    switch, lego = endpoints
+    assert (switch.queue_size, switch.workers) == (42, 1)
+    assert switch.build_router().all_recipients == [Recipient("channel", 1), Recipient("user", 2)]
+    assert lego.recipients == ["user:9"]
+    assert lego.queue_filename == "webhook_queue-lego.sqlite3"
+
+
+def test_endpoints_without_routes_inherit_discord_routes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        settings, "discord_routes", [{"recipients": ["channel:5"], "task_names": ["lego"]}]
+    )
+    inherited, own, cleared = load_endpoints(
+        [
+            {"name": "inherited", "path": "/a"},
+            {"name": "own", "path": "/b", "routes": [{"recipients": ["user:6"]}]},
+            {"name": "cleared", "path": "/c", "routes": []},
+        ]
+    )
+    assert [r.recipients for r in inherited.routes] == [["channel:5"]]
+    assert [r.recipients for r in own.routes] == [["user:6"]]
+    assert cleared.routes == []
+
+
+def test_invalid_global_display_currency_falls_back_to_eur(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "discord_display_currency", "EURO")
+    (loaded,) = load_endpoints([{"name": "a", "path": "/a"}])
+    endpoint = WebhookEndpoint(default_endpoint("/hook", ""), Router([], []))
+    assert (loaded.display_currency, endpoint.currencies.default) == ("EUR", "EUR")
+
+
+def test_endpoints_share_one_site_with_separate_secrets_and_queues(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    delivered: list[tuple[str, str]] = []
+
+    async def fake_deliver(self: Any, endpoint: WebhookEndpoint, job: DeliveryJob) -> None:
+        delivered.append((endpoint.name, job.title))
+
+    monkeypatch.setattr(WebhookReceiver, "_deliver", fake_deliver)
+
+    async def scenario() -> list[int]:
+        receiver = WebhookReceiver(
+            cast(Any, SimpleNamespace(add_dynamic_items=lambda *items: None)),
+            services=EnrichmentServices.from_settings(),
+            endpoint_configs=load_endpoints(
+                [
+                    {"name": "a", "path": "/a", "secret": "sa", "recipients": ["user:1"]},
+                    {"name": "b", "path": "/b", "secret": "sb", "recipients": ["user:2"]},
+                ]
+            ),
+        )
+        await receiver.start("127.0.0.1", 0, "/unused", "")
+        assert receiver._runner is not None
+        host, port = receiver._runner.addresses[0][:2]
+        base = f"http://{host}:{port}"
+
+        statuses: list[int] = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                for path, secret, title in (
+                    ("/a", "sa", "to a"),
+                    ("/b", "sa", "wrong secret"),
+                    ("/b", "sb", "to b"),
+                    ("/unused", "", "not served"),
+                ):
+                    async with session.post(
+                        base + path,
+                        json={"title": title, "content": title},
+                        headers={"X-Webhook-Secret": secret},
+                    ) as response:
+                        statuses.append(response.status)
+            for endpoint in receiver._endpoints:
+                assert endpoint.queue is not None
+                await endpoint.queue.join()
+        finally:
+            await receiver.stop()
+        return statuses
+
+    assert asyncio.run(scenario()) == [200, 401, 200, 404]
+    assert sorted(delivered) == [("a", "to a"), ("b", "to b")]
+    assert (tmp_path / "webhook_queue-a.sqlite3").exists()
+    assert (tmp_path / "webhook_queue-b.sqlite3").exists()
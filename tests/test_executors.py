@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.executors import BoundedExecutor, ExecutorFullError
+
+
+def test_saturated_pool_does_not_starve_another() -> None:
+    slow = BoundedExecutor("slow", max_workers=1, max_queue=2)
+    fast = BoundedExecutor("fast", max_workers=1)
+    release = threading.Event()
+
+    async def scenario() -> tuple[str, int, int]:
+        blocked = [asyncio.create_task(slow.run(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorFullError):
+            await slow.run(lambda: None)
+        result = await asyncio.wait_for(fast.run(str.upper, "ok"), timeout=1)
+        queued = slow.stats().queued
+
+        # A queued call that is cancelled never runs and leaves the queue.
+        blocked[-1].cancel()
+        await asyncio.gather(blocked[-1], return_exceptions=True)
+        release.set()
+        await asyncio.gather(*blocked[:-1])
+        return result, queued, slow.stats().completed
+
+    result, queued, completed = asyncio.run(scenario())
+    assert result == "OK"
+    assert queued == 2
+    assert completed == 2
+    stats = slow.stats()
+    assert (stats.queued, stats.running, stats.rejected) == (0, 0, 1)
+    assert stats.max_wait_seconds >= 0.05
+    slow.shutdown()
+    fast.shutdown()
@@ -0,0 +1,109 @@
+import asyncio
+from pathlib import Path
+from typing import Any, cast
+
+from core.fx import DisplayCurrencies, FxRefresher, RateTable, parse_ecb_rates
+from core.kvstore import SqliteKVStore
+from core.routing import Recipient
+
+_ECB_XML = (
+    '<gesmes:Envelope xmlns:gesmes="http://www.gesmes.org/xml/2002-08-01"'
+    ' xmlns="http://www.ecb.int/vocabulary/2002-08-01/eurofxref">'
+    '<Cube><Cube time="2024-01-02"><Cube currency="USD" rate="1.09"/>'
+    '<Cube currency="CNY" rate="8.0"/></Cube></Cube></gesmes:Envelope>'
+)
+
+
+class _FlakyHttp:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    async def get_text(self, url: str, **kwargs: Any) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OSError("ecb unreachable")
+        return _ECB_XML
+
+
+def test_refresher_serves_fallback_then_retries_with_backoff(tmp_path: Path) -> None:
+    http = _FlakyHttp(failures=2)
+
+    async def scenario() -> tuple[float | None, float, float | None, bool]:
+        fx = FxRefresher(
+            cast(Any, http),
+            SqliteKVStore(tmp_path / "cache.sqlite3", table="fx"),
+            fallback=0.2,
+            min_backoff=0.1,
+        )
+        await fx.start()
+        before = fx.table.rate("CNY", "EUR")
+        await asyncio.sleep(0.01)
+        backoff = fx.next_refresh_delay()
+        for _ in range(100):
+            if fx.table.as_of:
+                break
+            await asyncio.sleep(0.01)
+        fresh = fx.table.as_of == "2024-01-02"
+        after = fx.table.rate("CNY", "EUR")
+        await fx.close()
+        return before, backoff, after, fresh
+
+    before, backoff, after, fresh = asyncio.run(scenario())
+    assert before == 0.2
+    assert backoff == 0.1
+    assert fresh and after == 1 / 8.0
+    assert http.calls == 3
+
+
+def test_backoff_is_capped_after_a_long_outage(tmp_path: Path) -> None:
+    fx = FxRefresher(
+        cast(Any, _FlakyHttp(failures=0)),
+        SqliteKVStore(tmp_path / "cache.sqlite3", table="fx"),
+        min_backoff=60,
+        max_backoff=1800,
+    )
+    fx._failures = 1100
+    assert fx.next_refresh_delay() == 1800
+
+
+def test_persisted_rate_is_served_on_cold_start(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite3"
+
+    async def scenario() -> tuple[float | None, float]:
+        fx = FxRefresher(cast(Any, _FlakyHttp(0)), SqliteKVStore(path, table="fx"))
+        await fx.refresh()
+        await fx.close()
+
+        offline = _FlakyHttp(failures=100)
+        reopened = FxRefresher(cast(Any, offline), SqliteKVStore(path, table="fx"), fallback=0.2)
+        await reopened.start()
+        rate = reopened.table.rate("CNY", "EUR")
+        delay = reopened.next_refresh_delay()
+        await reopened.close()
+        return rate, delay
+
+    rate, delay = asyncio.run(scenario())
+    assert rate == 1 / 8.0
+    # Loaded rate is still fresh, so the next refresh is hours away.
+    assert delay > 60 * 60
+
+
+def test_rate_table_parses_every_currency_with_cross_rates() -> None:
+    table = parse_ecb_rates(_ECB_XML)
+    assert table.as_of == "2024-01-02"
+    assert set(table.per_eur) == {"EUR", "USD", "CNY"}
+    assert table.rate("CNY", "EUR") == 1 / 8.0
+    assert table.convert(800, "CNY", "USD") == 800 * 1.09 / 8.0
+    assert table.rate("CNY", "GBP") is None
+    assert RateTable.from_dict(table.to_dict()) == table
+    assert RateTable.fallback(0.125).rate("CNY", "EUR") == 0.125
+
+
+def test_display_currency_per_recipient() -> None:
+    currencies = DisplayCurrencies.from_config(
+        "eur", {"user:1": "usd", "channel:2": "GBP", "user:3": "dollars", "bogus": "USD"}
+    )
+    assert currencies.for_recipient(Recipient("user", 1)) == "USD"
+    assert currencies.for_recipient(Recipient("channel", 2)) == "GBP"
+    assert currencies.for_recipient(Recipient("user", 3)) == "EUR"
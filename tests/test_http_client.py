@@ -0,0 +1,73 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from core.circuit_breaker import BreakerRegistry, CircuitOpenError
+from core.http_client import HttpClient
+
+
+def test_http_client_reuses_one_session() -> None:
+    async def scenario() -> None:
+        async def handle(request: web.Request) -> web.Response:
+            if request.path == "/json":
+                return web.Response(text='[1, "x"]', content_type="text/plain")
+            return web.Response(text="héllo", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/{name}", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+
+        client = HttpClient()
+        try:
+            assert await client.get_text(f"http://127.0.0.1:{port}/text") == "héllo"
+            session = client.session
+            assert await client.get_json(f"http://127.0.0.1:{port}/json") == [1, "x"]
+            assert client.session is session
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_http_client_skips_host_once_its_breaker_opens() -> None:
+    hits: list[str] = []
+
+    async def scenario() -> None:
+        async def handle(request: web.Request) -> web.Response:
+            hits.append(request.path)
+            if request.path == "/missing":
+                raise web.HTTPNotFound()
+            raise web.HTTPServiceUnavailable()
+
+        app = web.Application()
+        app.router.add_get("/{name}", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+
+        client = HttpClient(breakers=BreakerRegistry(min_calls=3, failure_ratio=0.6))
+        try:
+            with pytest.raises(aiohttp.ClientResponseError):
+                await client.get_text(f"http://127.0.0.1:{port}/missing")
+            for _ in range(2):
+                with pytest.raises(aiohttp.ClientResponseError):
+                    await client.get_text(f"http://127.0.0.1:{port}/down")
+            with pytest.raises(CircuitOpenError):
+                async with client.stream(f"http://127.0.0.1:{port}/down"):
+                    pass
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+    # A 404 is a healthy answer; two 503s open the breaker before the third call.
+    assert hits == ["/missing", "/down", "/down"]
@@ -0,0 +1,29 @@
+import json
+from datetime import date
+
+import pytest
+
+from core import jsoncodec
+from core.webhook_receiver import MonitorPayload
+
+
+def test_backends_agree_with_stdlib() -> None:
+    value = {"title": "二手 Switch", "n": 1, "f": 1.5, "images": ["https://a/1.jpg"], 3: None}
+    encoded = jsoncodec.dumps(value)
+    assert b"\": " not in encoded and b", " not in encoded
+    assert "二手".encode() in encoded
+    assert jsoncodec.loads(encoded) == json.loads(jsoncodec._stdlib_dumps(value, False, None))
+    assert jsoncodec.loads(jsoncodec.dumps_text(value, indent=True)) == jsoncodec.loads(encoded)
+    assert jsoncodec.dumps_text({"d": date(2024, 1, 2)}, default=str) == '{"d":"2024-01-02"}'
+    assert jsoncodec.loads(jsoncodec.dumps(2**70)) == 2**70
+
+
+def test_loads_raises_value_error() -> None:
+    with pytest.raises(ValueError):
+        jsoncodec.loads(b"{not json")
+
+
+def test_monitor_payload_from_json() -> None:
+    monitor = MonitorPayload.from_json(b'{"title": "t", "message": "c", "meta": {"price": 1}}')
+    assert (monitor.title, monitor.content) == ("t", "c")
+    assert monitor.data["meta"] == {"price": 1}
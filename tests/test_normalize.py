@@ -0,0 +1,39 @@
+from core.normalize import (
+    DISCORD_MAX_BUTTON_URL_LEN,
+    contains_cjk,
+    fit_discord_button_url,
+    parse_cny_amount,
+    parse_goofish_link,
+)
+
+
+def test_parse_goofish_link_derives_all_urls_once() -> None:
+    url = "https://m.goofish.com/item?spm=x&id=812345"
+    link = parse_goofish_link(url)
+    assert link.item_id == "812345"
+    assert link.canonical_url == "https://www.goofish.com/item?id=812345"
+    assert link.short_url.startswith("https://pages.goofish.com/sharexy")
+    assert link.superbuy_url.endswith("https%3A%2F%2Fwww.goofish.com%2Fitem%3Fid%3D812345")
+    assert parse_goofish_link(url) is link
+
+    plain = parse_goofish_link(" https://example.com/x ")
+    assert plain.item_id == ""
+    assert plain.canonical_url == "https://example.com/x"
+
+
+def test_fit_discord_button_url_falls_back_to_canonical() -> None:
+    long_url = "https://www.goofish.com/item?" + "x=1&" * 200 + "id=42"
+    assert fit_discord_button_url(long_url) == "https://www.goofish.com/item?id=42"
+    assert fit_discord_button_url("https://example.com/" + "x" * DISCORD_MAX_BUTTON_URL_LEN) == ""
+
+
+def test_fast_paths_match_slow_paths() -> None:
+    assert not contains_cjk("Switch OLED")
+    assert contains_cjk("Switch 二手")
+    assert not contains_cjk("café")
+    assert parse_cny_amount("1299.50") == 1299.5
+    assert parse_cny_amount("12.") == 12
+    assert parse_cny_amount(".5") == 5
+    assert parse_cny_amount("1.2.3") == 1.2
+    assert parse_cny_amount("¥ 1,299") == 1299
+    assert parse_cny_amount("价格面议") is None
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from core.page_pool import PagePool
+
+
+class FakePage:
+    def __init__(self, number: int) -> None:
+        self.number = number
+        self.closed = False
+        self.crashed = False
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _pool(**kwargs) -> tuple[PagePool[FakePage], list[FakePage]]:
+    created: list[FakePage] = []
+
+    async def factory() -> FakePage:
+        page = FakePage(len(created))
+        created.append(page)
+        return page
+
+    async def healthy(page: FakePage) -> bool:
+        return not page.crashed
+
+    return PagePool(factory, health_check=healthy, **kwargs), created
+
+
+def test_concurrent_checkouts_get_separate_pages_up_to_size() -> None:
+    pool, created = _pool(size=2)
+
+    async def scenario() -> tuple[set[int], bool]:
+        in_use: set[int] = set()
+        overlap = False
+
+        async def job() -> None:
+            nonlocal overlap
+            async with pool.page() as page:
+                overlap = overlap or page.number in in_use
+                in_use.add(page.number)
+                await asyncio.sleep(0.02)
+                in_use.discard(page.number)
+
+        await asyncio.gather(*(job() for _ in range(5)))
+        return {p.number for p in created}, overlap
+
+    numbers, overlap = asyncio.run(scenario())
+    assert numbers == {0, 1}
+    assert not overlap
+    assert (pool.idle, pool.in_use) == (2, 0)
+
+
+def test_pages_are_recycled_after_max_uses_errors_and_crashes() -> None:
+    pool, created = _pool(size=1, max_uses=2)
+
+    async def scenario() -> None:
+        for _ in range(3):
+            async with pool.page():
+                pass
+        # Two uses retired page 0; page 1 has been used once.
+        assert [p.closed for p in created] == [True, False]
+
+        with pytest.raises(RuntimeError):
+            async with pool.page():
+                raise RuntimeError("navigation failed")
+        assert created[1].closed
+
+        async with pool.page() as page:
+            pass
+        page.crashed = True
+        async with pool.page() as replacement:
+            assert replacement is not page
+        assert page.closed
+
+    asyncio.run(scenario())
+    assert len(created) == 4
+
+
+def test_reset_retires_idle_and_checked_out_pages() -> None:
+    pool, created = _pool(size=2)
+
+    async def scenario() -> None:
+        held = await pool.checkout()
+        async with pool.page():
+            pass
+        await pool.reset()
+        await pool.checkin(held)
+        async with pool.page() as page:
+            assert page.number == 2
+
+    asyncio.run(scenario())
+    assert [p.closed for p in created] == [True, True, False]
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+from core.http_client import HttpClient
+from core.kvstore import SqliteKVStore
+from core.preview import (
+    HeadMetaParser,
+    Preview,
+    PreviewCache,
+    extract_preview_meta,
+    fetch_listing_preview,
+)
+
+_PAGE_HEAD = (
+    "<html><head>"
+    '<meta name="description" content="Like new &amp; boxed">'
+    '<meta property="og:title" content="PS5 Slim"/>'
+    '<meta property="og:image" content="https://img.example/1.jpg">'
+    '<meta property="og:title" content="ignored duplicate">'
+    "</head>"
+)
+
+
+def test_concurrent_lookups_share_one_fetch() -> None:
+    calls = 0
+
+    async def fetch() -> Preview:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"title": "PS5"}
+
+    async def scenario() -> list[Preview]:
+        cache = PreviewCache()
+        results = await asyncio.gather(*(cache.get_or_fetch("123", fetch) for _ in range(5)))
+        results.append(await cache.get_or_fetch("123", fetch))
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(r == {"title": "PS5"} for r in results)
+    assert calls == 1
+
+
+def test_failed_fetch_is_not_cached() -> None:
+    calls = 0
+
+    async def fetch() -> Preview:
+        nonlocal calls
+        calls += 1
+        return {}
+
+    async def scenario() -> None:
+        cache = PreviewCache()
+        await cache.get_or_fetch("123", fetch)
+        await cache.get_or_fetch("123", fetch)
+
+    asyncio.run(scenario())
+    assert calls == 2
+
+
+def test_disk_tier_survives_restart(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite3"
+
+    async def fetch() -> Preview:
+        return {"title": "PS5", "image": "https://img.example/1.jpg"}
+
+    async def never() -> Preview:
+        raise AssertionError("should be served from disk")
+
+    async def scenario() -> Preview:
+        first = PreviewCache(SqliteKVStore(path, table="previews"))
+        await first.get_or_fetch("123", fetch)
+        await first.close()
+
+        second = PreviewCache(SqliteKVStore(path, table="previews"))
+        try:
+            return await second.get_or_fetch("123", never)
+        finally:
+            await second.close()
+
+    assert asyncio.run(scenario())["title"] == "PS5"
+
+
+def test_extract_preview_meta_first_match_wins() -> None:
+    preview = extract_preview_meta(_PAGE_HEAD + "<body></body></html>")
+    assert preview == {
+        "title": "PS5 Slim",
+        "description": "Like new & boxed",
+        "image": "https://img.example/1.jpg",
+    }
+
+
+def test_head_parser_stops_at_end_of_head() -> None:
+    parser = HeadMetaParser()
+    parser.feed("<html><head><title>x</title></head>")
+    assert parser.done
+    parser.feed('<body><meta property="og:title" content="too late"></body>')
+    assert "title" not in parser.values
+
+
+def test_fetch_listing_preview_stops_reading_after_head() -> None:
+    async def scenario() -> Preview:
+        async def handle(request: web.Request) -> web.StreamResponse:
+            response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8"})
+            await response.prepare(request)
+            await response.write(_PAGE_HEAD.encode())
+            await asyncio.sleep(1)
+            return response
+
+        app = web.Application()
+        app.router.add_get("/item", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+
+        http = HttpClient()
+        try:
+            started = time.monotonic()
+            preview = await fetch_listing_preview(f"http://127.0.0.1:{port}/item", http)
+            assert time.monotonic() - started < 0.9
+            return preview
+        finally:
+            await http.close()
+            await runner.cleanup()
+
+    assert asyncio.run(scenario())["title"] == "PS5 Slim"
@@ -0,0 +1,136 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, cast
+
+import pytest
+
+import core.webhook_receiver as webhook_receiver
+from core.delivery_queue import DeliveryJob
+from core.endpoints import default_endpoint
+from core.routing import Recipient, Router, RoutingContext, RoutingRule
+from core.webhook_receiver import DiscordNotificationPayload, WebhookEndpoint, WebhookReceiver
+
+
+def test_recipient_parse() -> None:
+    assert Recipient.parse("channel:42") == Recipient("channel", 42)
+    assert Recipient.parse("user:7").key == "user:7"
+    assert Recipient.parse(7) == Recipient("user", 7)
+    with pytest.raises(ValueError):
+        Recipient.parse("role:1")
+
+
+def test_router_matches_all_criteria_and_falls_back() -> None:
+    router = Router(
+        [
+            RoutingRule(recipients=["channel:1"], task_names=["Switch"], max_price=500),
+            RoutingRule(recipients=["user:2", "channel:1"], keywords=["lego"]),
+            RoutingRule(recipients=["user:3"], item_ids=["99"]),
+        ],
+        [Recipient("user", 9)],
+    )
+
+    assert router.route(RoutingContext(task_name="switch", price_cny=400)) == [
+        Recipient("channel", 1)
+    ]
+    assert router.route(RoutingContext(task_name="switch", price_cny=900)) == [
+        Recipient("user", 9)
+    ]
+    assert router.route(RoutingContext(task_name="Switch", keyword="Lego Technic")) == [
+        Recipient("user", 2),
+        Recipient("channel", 1),
+    ]
+    assert router.route(RoutingContext(item_id="99")) == [Recipient("user", 3)]
+    assert {r.key for r in router.all_recipients} == {"user:9", "channel:1", "user:2", "user:3"}
+
+
+def test_router_from_config_skips_invalid_rules() -> None:
+    router = Router.from_config(
+        [{"recipients": ["nope:1"]}, {"recipients": ["channel:5"], "keywords": ["ps5"]}], 9
+    )
+    assert router.route(RoutingContext(keyword="ps5 slim")) == [Recipient("channel", 5)]
+
+
+def test_deliver_enriches_once_and_fans_out(monkeypatch: pytest.MonkeyPatch) -> None:
+    builds: list[str] = []
+    sent: list[str] = []
+
+    async def fake_build(
+        title: str, content: str, raw: Any, services: Any, currency: str
+    ) -> Any:
+        builds.append(title)
+        return DiscordNotificationPayload(
+            embeds=[], view=None, routing=RoutingContext(keyword="switch oled")
+        )
+
+    async def fake_send(
+        recipients: Any, dispatcher: Any, recipient: Recipient, embeds: Any, view: Any
+    ) -> None:
+        await asyncio.sleep(0.05)
+        if recipient.key == "user:2":
+            raise OSError("connection reset")
+        sent.append(recipient.key)
+
+    monkeypatch.setattr(webhook_receiver, "_build_discord_payload", fake_build)
+    monkeypatch.setattr(webhook_receiver, "_send_to_recipient", fake_send)
+
+    async def scenario() -> float:
+        receiver = WebhookReceiver(
+            cast(Any, SimpleNamespace()),
+            services=cast(Any, None),
+            dispatcher=cast(Any, None),
+        )
+        endpoint = WebhookEndpoint(
+            default_endpoint("/hook", ""),
+            Router(
+                [RoutingRule(recipients=["user:1", "user:2", "channel:3"], keywords=["switch"])],
+                [Recipient("user", 9)],
+            ),
+        )
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await receiver._deliver(endpoint, DeliveryJob(1, "alert", "", {}, 0.0))
+        return loop.time() - started
+
+    elapsed = asyncio.run(scenario())
+    assert builds == ["alert"]
+    # user:2 failing does not fail the job for the others.
+    assert sorted(sent) == ["channel:3", "user:1"]
+    assert elapsed < 0.12
+
+
+def test_deliver_warns_when_no_recipient_matches(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    sent: list[str] = []
+
+    async def fake_build(
+        title: str, content: str, raw: Any, services: Any, currency: str
+    ) -> Any:
+        return DiscordNotificationPayload(
+            embeds=[], view=None, routing=RoutingContext(keyword="ps5")
+        )
+
+    async def fake_send(
+        recipients: Any, dispatcher: Any, recipient: Recipient, embeds: Any, view: Any
+    ) -> None:
+        sent.append(recipient.key)
+
+    monkeypatch.setattr(webhook_receiver, "_build_discord_payload", fake_build)
+    monkeypatch.setattr(webhook_receiver, "_send_to_recipient", fake_send)
+
+    async def scenario() -> Any:
+        receiver = WebhookReceiver(
+            cast(Any, SimpleNamespace()),
+            services=cast(Any, None),
+            dispatcher=cast(Any, None),
+        )
+        endpoint = WebhookEndpoint(
+            default_endpoint("/hook", ""),
+            Router([RoutingRule(recipients=["user:1"], keywords=["switch"])], []),
+        )
+        return await receiver._deliver(endpoint, DeliveryJob(1, "alert", "", {}, 0.0))
+
+    with caplog.at_level("WARNING", logger=webhook_receiver.__name__):
+        assert asyncio.run(scenario()) is None
+    assert sent == []
+    assert "No routing rule or default recipient matched" in caplog.text
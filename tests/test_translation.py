@@ -0,0 +1,117 @@
+import asyncio
+from pathlib import Path
+from typing import Any, cast
+
+from core.http_client import HttpClient
+from core.kvstore import SqliteKVStore
+from core.translation import (
+    TranslationBatcher,
+    TranslationCache,
+    Translator,
+    _plan_batches,
+    contains_cjk,
+)
+
+
+class FakeTranslateHttp:
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+
+    async def get_json(self, url: str, *, params: dict[str, str], **_: Any) -> Any:
+        query = params["q"]
+        self.queries.append(query)
+        return [[[query.replace("手机", "phone").replace("便宜", "cheap"), query]]]
+
+
+def test_contains_cjk() -> None:
+    assert contains_cjk("二手手机")
+    assert not contains_cjk("iPhone 15")
+
+
+def test_plan_batches_respects_query_limit() -> None:
+    sources = ["手机" * 10, "便宜" * 10, "手机" * 200]
+    batches = _plan_batches(sources, max_query_chars=500)
+    assert len(batches) == 2
+    assert [sources[0], sources[1]] in batches
+    assert [sources[2]] in batches
+
+
+def test_batcher_coalesces_concurrent_requests() -> None:
+    fake = FakeTranslateHttp()
+
+    async def scenario() -> list[str | None]:
+        batcher = TranslationBatcher(cast(HttpClient, fake), window_seconds=0.01)
+        return await asyncio.gather(
+            batcher.translate("手机"),
+            batcher.translate("便宜"),
+            batcher.translate("手机"),
+            batcher.translate("plain"),
+        )
+
+    assert asyncio.run(scenario()) == ["phone", "cheap", "phone", "plain"]
+    assert len(fake.queries) == 1
+
+
+def test_empty_translation_is_a_failure_not_a_cached_result() -> None:
+    class EmptyTranslateHttp:
+        async def get_json(self, url: str, **_: Any) -> Any:
+            return [[["", url]]]
+
+    cache = TranslationCache(negative_ttl=60)
+
+    async def scenario() -> tuple[str | None, str]:
+        batcher = TranslationBatcher(cast(HttpClient, EmptyTranslateHttp()), window_seconds=0)
+        raw = await batcher.translate("手机")
+        return raw, await Translator(batcher, cache).translate("手机")
+
+    assert asyncio.run(scenario()) == (None, "手机")
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = TranslationCache(max_entries=2)
+    cache._insert("a", "A")
+    cache._insert("b", "B")
+    assert cache.get("a") == "A"
+    cache._insert("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+def test_cache_respects_byte_budget() -> None:
+    cache = TranslationCache(max_bytes=20)
+    cache._insert("aaaa", "AAAA")
+    cache._insert("bbbb", "BBBB")
+    cache._insert("cccc", "CCCC")
+    assert len(cache) == 2
+    assert cache.size_bytes <= 20
+    assert cache.get("aaaa") is None
+
+
+def test_cache_negative_entries_expire() -> None:
+    cache = TranslationCache(negative_ttl=0.01)
+    cache.put_failure("手机")
+    assert cache.get("手机") == "手机"
+    asyncio.run(asyncio.sleep(0.02))
+    assert cache.get("手机") is None
+
+
+def test_cache_persists_across_instances(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite3"
+
+    async def write() -> None:
+        cache = TranslationCache(SqliteKVStore(path, table="translations"))
+        await cache.ensure_loaded()
+        cache.put("手机", "phone")
+        await cache.close()
+
+    async def read() -> str | None:
+        cache = TranslationCache(SqliteKVStore(path, table="translations"))
+        await cache.ensure_loaded()
+        result = cache.get("手机")
+        await cache.close()
+        return result
+
+    asyncio.run(write())
+    assert asyncio.run(read()) == "phone"
@@ -1,9 +1,22 @@
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, cast
+
+import pytest
+
+import core.webhook_receiver as webhook_receiver
+from core.fx import RateTable
+from core.http_client import HttpClient
+from core.normalize import parse_cny_amount, parse_goofish_link
 from core.webhook_receiver import (
-    _build_superbuy_url,
-    _convert_goofish_short_url,
+    EnrichmentServices,
+    _enrich_listing_notification,
     _extract_listing_notification,
     _extract_title_content,
-    _parse_cny_amount,
+    _localize_payload,
+    _merge_listing_preview,
     _should_drop_notification,
 )
 
@@ -41,21 +54,21 @@ def test_should_not_drop_normal_notification() -> None:
 
 
 def test_parse_cny_amount() -> None:
-    assert _parse_cny_amount("¥1,299") == 1299
-    assert _parse_cny_amount("1.2万") == 12000
-    assert _parse_cny_amount(None) is None
+    assert parse_cny_amount("¥1,299") == 1299
+    assert parse_cny_amount("1.2万") == 12000
+    assert parse_cny_amount(None) is None
 
 
 def test_convert_goofish_short_url() -> None:
     source = "https://www.goofish.com/item?id=9282837465&foo=bar"
-    short = _convert_goofish_short_url(source)
+    short = parse_goofish_link(source).short_url
     assert short.startswith("https://pages.goofish.com/sharexy")
     assert "bfp=%7B%22id%22%3A9282837465%7D" in short
 
 
 def test_build_superbuy_url_contains_encoded_source() -> None:
     source = "https://www.goofish.com/item?id=9282837465&foo=bar"
-    result = _build_superbuy_url(source)
+    result = parse_goofish_link(source).superbuy_url
     assert "superbuy.com" in result
     assert "https%3A%2F%2Fwww.goofish.com%2Fitem%3Fid%3D9282837465" in result
 
@@ -86,6 +99,54 @@ def test_extract_listing_notification_from_structured_payload() -> None:
     assert parsed.image_url == "https://img.example/1.jpg"
 
 
+def test_extract_listing_notification_normalises_image_urls() -> None:
+    payload = {
+        "listing_title": "Lego",
+        "listing_main_image": "//img.alicdn.com/main.jpg",
+        "listing_images": [
+            "https://img.alicdn.com/main.jpg",
+            "javascript:alert(1)",
+            " https://img.alicdn.com/2.jpg ",
+            "https://img.alicdn.com/2.jpg",
+        ],
+    }
+
+    parsed = _extract_listing_notification(payload, "")
+    assert parsed is not None
+    assert parsed.image_url == "https://img.alicdn.com/main.jpg"
+    assert parsed.image_urls == ["https://img.alicdn.com/main.jpg", "https://img.alicdn.com/2.jpg"]
+
+    merged = _merge_listing_preview(parsed, {"image": "https://img.alicdn.com/og.jpg"})
+    assert merged.image_urls[:2] == ["https://img.alicdn.com/main.jpg", "https://img.alicdn.com/og.jpg"]
+
+
+def test_extract_listing_notification_field_precedence() -> None:
+    payload = {
+        "reason": "",
+        "ai_reason": "top-level fallback",
+        "meta": {"reason": "meta reason", "listing_title": "meta title", "price": "¥10"},
+        "meta_listing_title": "form meta title",
+        "meta_listing_images": '["https://img.example/a.jpg"]',
+        "meta_price_cny_value": "12.5",
+    }
+    content = (
+        "Description: first\n"
+        "  描述: second\n"
+        "old https://www.goofish.com/item?id=1\n"
+        "new https://www.goofish.com/item?id=2."
+    )
+
+    parsed = _extract_listing_notification(payload, content)
+    assert parsed is not None
+    assert parsed.reason == "meta reason"
+    assert parsed.listing_title == "form meta title"
+    assert parsed.price_raw == "¥10"
+    assert parsed.price_cny == 12.5
+    assert parsed.description == "first"
+    assert parsed.goofish_url.endswith("id=2")
+    assert parsed.image_urls == ["https://img.example/a.jpg"]
+
+
 def test_extract_listing_notification_from_plain_content() -> None:
     content = (
         "Price: ¥888\n"
@@ -101,3 +162,66 @@ def test_extract_listing_notification_from_plain_content() -> None:
     assert parsed.description == "Used for 2 months, no repairs"
     assert parsed.goofish_url.endswith("id=9876543210")
     assert parsed.goofish_short_url.startswith("https://pages.goofish.com/sharexy")
+
+
+def test_enrich_listing_notification_respects_deadline(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(webhook_receiver.settings, "data_dir", tmp_path)
+
+    async def slow_preview(url: str, http: HttpClient) -> dict[str, str]:
+        await asyncio.sleep(5)
+        return {"title": "late title"}
+
+    monkeypatch.setattr(webhook_receiver, "fetch_listing_preview", slow_preview)
+
+    content = "Reason: cheap\nPC link: https://www.goofish.com/item?id=1"
+    listing = _extract_listing_notification(content, content)
+    assert listing is not None
+    assert listing.goofish_url
+
+    async def scenario() -> Any:
+        services = EnrichmentServices.from_settings()
+        try:
+            return await _enrich_listing_notification(listing, services, timeout=0.1)
+        finally:
+            await services.close()
+
+    started = time.monotonic()
+    enriched = asyncio.run(scenario())
+    assert time.monotonic() - started < 2
+    assert enriched.reason == "cheap"
+    assert enriched.listing_title == ""
+
+
+def test_localize_payload_rerenders_price_only_for_other_currencies(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    payload = {
+        "meta": {
+            "listing_title": "PS5 Slim",
+            "price_cny_text": "¥800",
+            "listing_link_pc": "https://www.goofish.com/item?id=42",
+            "listing_images": ["https://img.example/1.jpg"],
+        },
+    }
+    services = cast(
+        Any, SimpleNamespace(fx=SimpleNamespace(table=RateTable({"CNY": 8.0, "USD": 1.1})))
+    )
+
+    async def no_enrichment(listing: Any, services: Any, timeout: float) -> Any:
+        return listing
+
+    monkeypatch.setattr(webhook_receiver, "_enrich_listing_notification", no_enrichment)
+
+    base = asyncio.run(
+        webhook_receiver._build_discord_payload("Alert", "", payload, services, "EUR")
+    )
+    usd = _localize_payload(base, "USD", services)
+    assert _localize_payload(base, "EUR", services) is base
+    assert base.embeds[0].fields[0].value == "¥800.00 (~EUR 100.00)"
+    assert usd.embeds[0].fields[0].value == "¥800.00 (~USD 110.00)"
+    assert base.carousel is not None and usd.carousel is not None
+    assert base.carousel[0].startswith("42-") and usd.carousel[0].startswith("42-")
+    assert base.carousel[0] != usd.carousel[0]
+    assert _localize_payload(base, "CNY", services).embeds[0].fields[0].value == "¥800.00"
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import hmac
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, cast
+
+import aiohttp
+import pytest
+
+import core.webhook_receiver as webhook_receiver
+from config import settings
+from core.routing import Router
+from core.webhook_receiver import EnrichmentServices, WebhookReceiver, _decode_webhook_body
+
+
+def test_decode_webhook_body_rejects_malformed_declared_types() -> None:
+    assert _decode_webhook_body("application/json", None, b'{"title": "t"}').title == "t"
+    with pytest.raises(ValueError):
+        _decode_webhook_body("application/json", None, b"{oops")
+    with pytest.raises(ValueError):
+        _decode_webhook_body("application/x-www-form-urlencoded", None, b"title=\xff")
+    assert _decode_webhook_body("text/plain", None, b"{oops").content == "{oops"
+    form = _decode_webhook_body(
+        "application/x-www-form-urlencoded", None, b"title=%E4%BA%8C&content=c&content=d"
+    )
+    assert (form.title, form.content) == ("二", "c")
+
+
+def test_oversized_and_malformed_requests(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "webhook_max_body_bytes", 2048)
+
+    async def scenario() -> list[int]:
+        receiver = WebhookReceiver(
+            cast(Any, SimpleNamespace(add_dynamic_items=lambda *items: None)),
+            services=EnrichmentServices.from_settings(),
+            router=Router([], []),
+        )
+        await receiver.start("127.0.0.1", 0, "/hook", "")
+        assert receiver._runner is not None
+        host, port = receiver._runner.addresses[0][:2]
+        url = f"http://{host}:{port}/hook"
+
+        async def chunks() -> Any:
+            for _ in range(8):
+                yield b"x" * 1024
+
+        statuses: list[int] = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                for kwargs in (
+                    {"data": b"x" * 4096, "headers": {"Content-Type": "text/plain"}},
+                    {"data": chunks(), "headers": {"Content-Type": "text/plain"}},
+                    {"data": b"{broken", "headers": {"Content-Type": "application/json"}},
+                ):
+                    async with session.post(url, **kwargs) as response:
+                        statuses.append(response.status)
+        finally:
+            await receiver.stop()
+        return statuses
+
+    assert asyncio.run(scenario()) == [413, 413, 400]
+
+
+def test_auth_middleware_checks_secret_and_signature(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "webhook_allow_query_secret", False)
+    body = b'{"title": "t", "content": "c"}'
+    signature = hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+    parsed: list[str] = []
+
+    async def scenario() -> list[int]:
+        receiver = WebhookReceiver(
+            cast(Any, SimpleNamespace(add_dynamic_items=lambda *items: None)),
+            services=EnrichmentServices.from_settings(),
+            router=Router([], []),
+        )
+        original = webhook_receiver._decode_webhook_body
+
+        def spy(*args: Any) -> Any:
+            parsed.append("parsed")
+            return original(*args)
+
+        monkeypatch.setattr(webhook_receiver, "_decode_webhook_body", spy)
+        await receiver.start("127.0.0.1", 0, "/hook", "s3cret")
+        assert receiver._runner is not None
+        host, port = receiver._runner.addresses[0][:2]
+        url = f"http://{host}:{port}/hook"
+        json_headers = {"Content-Type": "application/json"}
+
+        statuses: list[int] = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                for extra_headers, query in (
+                    ({}, ""),
+                    ({"X-Webhook-Secret": "wrong"}, ""),
+                    ({}, "?secret=s3cret"),
+                    ({"X-Webhook-Signature": "sha256=" + "0" * 64}, ""),
+                    ({"X-Webhook-Secret": "s3cret"}, ""),
+                    ({"X-Webhook-Signature": f"sha256={signature}"}, ""),
+                ):
+                    async with session.post(
+                        url + query, data=body, headers={**json_headers, **extra_headers}
+                    ) as response:
+                        statuses.append(response.status)
+        finally:
+            await receiver.stop()
+        return statuses
+
+    assert asyncio.run(scenario()) == [401, 401, 401, 401, 200, 200]
+    assert parsed == ["parsed", "parsed"]
+
+
+def test_health_route_reports_metrics(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(settings, "webhook_health_path", "/health")
+
+    async def scenario() -> tuple[int, dict[str, Any]]:
+        receiver = WebhookReceiver(
+            cast(Any, SimpleNamespace(add_dynamic_items=lambda *items: None)),
+            services=EnrichmentServices.from_settings(),
+            router=Router([], []),
+        )
+        await receiver.start("127.0.0.1", 0, "/hook", "s3cret")
+        assert receiver._runner is not None
+        host, port = receiver._runner.addresses[0][:2]
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://{host}:{port}/health") as response:
+                    return response.status, await response.json()
+        finally:
+            await receiver.stop()
+
+    status, body = asyncio.run(scenario())
+    assert status == 200
+    assert body["endpoints"] == {"default": {"queue_depth": 0, "digest_buffered": 0}}
+    assert body["discord"]["sent"] == 0
+    assert {"executors", "breakers"} <= body.keys()
+
+
+def test_health_route_is_off_by_default(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    default = type(settings).model_fields["webhook_health_path"].default
+    monkeypatch.setattr(settings, "webhook_health_path", default)
+
+    async def scenario() -> int:
+        receiver = WebhookReceiver(
+            cast(Any, SimpleNamespace(add_dynamic_items=lambda *items: None)),
+            services=EnrichmentServices.from_settings(),
+            router=Router([], []),
+        )
+        await receiver.start("127.0.0.1", 0, "/hook", "s3cret")
+        assert receiver._runner is not None
+        host, port = receiver._runner.addresses[0][:2]
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://{host}:{port}/health") as response:
+                    return response.status
+        finally:
+            await receiver.stop()
+
+    assert asyncio.run(scenario()) == 404